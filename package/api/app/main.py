@@ -4,17 +4,53 @@ from aws_lambda_powertools import Logger
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
-from routers.videos import router as videos_router  # type: ignore
+from middleware.compression import CompressionMiddleware  # type: ignore
+from middleware.conditional import ConditionalGetMiddleware  # type: ignore
+from middleware.metrics import (  # type: ignore
+    MemorySink,
+    MetricsMiddleware,
+    StdoutSink,
+)
+from middleware.server_timing import ServerTimingMiddleware  # type: ignore
+from routers.videos import (  # type: ignore
+    CACHE_POLICIES,
+    catalog_cache,
+    get_catalog_version,
+)
+from routers.videos import router as videos_router
+
+# Interactive docs and the OpenAPI schema can be turned off in production
+docs_enabled = os.getenv("API_DOCS_ENABLED", "true").lower() == "true"
 
 # Create FastAPI application
 app = FastAPI(
     title="Diopside API",
     description="Backend API for diopside",
     version=os.environ["PROJECT_SEMANTIC_VERSION"],
-    docs_url="/docs",
+    docs_url="/docs" if docs_enabled else None,
+    redoc_url="/redoc" if docs_enabled else None,
+    openapi_url="/openapi.json" if docs_enabled else None,
     openapi_prefix=f"/{os.environ['PROJECT_MAJOR_VERSION']}/",
 )
 
+# Answer unchanged catalog reads with 304 (added first so CORS wraps it)
+app.add_middleware(
+    ConditionalGetMiddleware,
+    policies=CACHE_POLICIES,
+    version=get_catalog_version,
+)
+
+# Compress large JSON bodies (wraps the 304 handling to weaken its ETags)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+)
+
+# Per-phase Server-Timing headers, off unless enabled (infra enables them
+# outside production). Wraps compression so that it is timed too.
+if os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true":
+    app.add_middleware(ServerTimingMiddleware)
+
 # Configure CORS for frontend access
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +60,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, DynamoDB cost and catalog cache use as EMF log lines
+# (outermost, so the latency covers every other middleware). METRICS_SINK=memory
+# keeps the records in memory instead, for tests and local runs.
+metrics_sink = MemorySink() if os.getenv("METRICS_SINK") == "memory" else StdoutSink()
+app.add_middleware(
+    MetricsMiddleware,
+    namespace=os.getenv("POWERTOOLS_METRICS_NAMESPACE", "diopside"),
+    service=os.getenv("POWERTOOLS_SERVICE_NAME", "diopside"),
+    sink=metrics_sink,
+    routes=CACHE_POLICIES,
+    cache_stats=catalog_cache.stats,
+)
+
 # Include routers
 app.include_router(videos_router)
 
@@ -43,8 +92,12 @@ async def health_check() -> dict[str, str]:
 # Initialize AWS Lambda Powertools logger
 logger = Logger(service="diopside")
 
+# Built once per container and reused by warm invocations. The app has no
+# startup or shutdown events, so the lifespan protocol is not run per call.
+lambda_adapter = Mangum(app, lifespan="off")
+
 
 @logger.inject_lambda_context(log_event=True)
 def handler(event, context):  # type: ignore
     """Lambda handler function."""
-    return Mangum(app)(event, context)
+    return lambda_adapter(event, context)
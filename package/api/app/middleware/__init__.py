@@ -0,0 +1,16 @@
+"""ASGI middleware for the Diopside backend."""
+
+from .compression import CompressionMiddleware
+from .conditional import CachePolicy, ConditionalGetMiddleware
+from .metrics import MemorySink, MetricsMiddleware, StdoutSink
+from .server_timing import ServerTimingMiddleware
+
+__all__ = [
+    "CachePolicy",
+    "CompressionMiddleware",
+    "ConditionalGetMiddleware",
+    "MemorySink",
+    "MetricsMiddleware",
+    "ServerTimingMiddleware",
+    "StdoutSink",
+]
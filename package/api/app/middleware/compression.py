@@ -0,0 +1,191 @@
+"""Negotiated gzip/brotli compression of response bodies."""
+
+import gzip
+import importlib
+from types import ModuleType
+
+from services.timing import span  # type: ignore
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def _load_brotli() -> ModuleType | None:
+    """Import the optional brotli module.
+
+    Returns:
+        The brotli module, or None when it is not installed
+    """
+    try:
+        return importlib.import_module("brotli")
+    except ImportError:
+        return None
+
+
+brotli = _load_brotli()
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def choose_encoding(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """Pick the content coding to use from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Accept-Encoding request header
+        available: Supported codings, most preferred first
+
+    Returns:
+        The coding with the highest q-value (ties go to the earlier entry of
+        available), or None to send the body uncompressed
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """Mark a strong ETag weak, as the encoded body is not byte-identical.
+
+    Args:
+        headers: Headers of a response with a Content-Encoding
+    """
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Compress JSON and text responses with brotli or gzip.
+
+    Unlike Starlette's GZipMiddleware this negotiates brotli when the
+    optional brotli package is installed, and keeps conditional requests
+    working: when the client accepts an encoding, strong ETags of JSON and
+    text responses (and of 304s) are downgraded to weak ones, since the
+    encoded bytes differ from the identity representation while staying
+    semantically equivalent. Bodies smaller than minimum_size are
+    sent as is, as the framing overhead outweighs the saving. Responses the
+    route already encoded are passed through with their ETag weakened.
+
+    Responses sent in several body messages (streaming) are passed through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            minimum_size: Smallest body size in bytes worth compressing
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        start: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                content_type = headers.get("content-type", "")
+                if message["status"] == 304 or content_type.startswith(
+                    COMPRESSIBLE_TYPES
+                ):
+                    # The body depends on Accept-Encoding even when a given
+                    # response happens to be too small to compress
+                    headers.add_vary_header("Accept-Encoding")
+                    if encoding is not None:
+                        # A 304 cannot tell whether the 200 was compressed, so
+                        # every response that may be is sent a weak ETag and
+                        # the validators of both agree
+                        _weaken_etag(headers)
+                if "content-encoding" in headers:
+                    # Encoded by the route itself (the stored gzip tag tree)
+                    _weaken_etag(headers)
+                message = {**message, "headers": headers.raw}
+                if (
+                    encoding is None
+                    or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the start until the body size is known
+                start = message
+                return
+
+            body: bytes = message.get("body", b"")
+            if start is None or encoding is None:
+                await send(message)
+                return
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            with span("compress"):
+                compressed = self._compress(body, encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a response body.
+
+        Args:
+            body: Response body
+            encoding: Negotiated content coding ("br" or "gzip")
+
+        Returns:
+            Encoded body
+        """
+        if encoding == "br" and brotli is not None:
+            return bytes(brotli.compress(body, quality=self.brotli_quality))
+        # mtime=0 keeps the output stable for identical bodies
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -0,0 +1,149 @@
+"""Conditional GET support: ETags, 304 responses and Cache-Control."""
+
+import hashlib
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+
+from aws_lambda_powertools import Logger
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .routing import RouteResolver
+
+logger = Logger(service="diopside", child=True)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching rules for one route.
+
+    Attributes:
+        cache_control: Cache-Control header sent with successful responses
+        etag: Whether responses are validated against the catalog version
+            (only for routes whose output is fixed by the catalog contents)
+    """
+
+    cache_control: str
+    etag: bool = False
+
+
+class ConditionalGetMiddleware:
+    """Answer repeat GET requests with 304 before the route does any work.
+
+    Every response of a route with an ETag policy depends only on the
+    catalog and the request URL, so the ETag is a hash of the catalog
+    version and the URL. When If-None-Match carries that ETag, a 304 is
+    returned without calling the route, and so without reading DynamoDB.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        policies: Mapping[str, CachePolicy],
+        version: Callable[[], Awaitable[str | None]],
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            policies: Cache policies keyed by route path template
+            version: Returns the current catalog version (None if unknown)
+        """
+        self.app = app
+        self.version = version
+        self._policies = dict(policies)
+        self._routes = RouteResolver(self._policies)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        policy = self._find_policy(scope)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {"Cache-Control": policy.cache_control}
+        if policy.etag:
+            etag = await self._etag(scope)
+            if etag is not None:
+                headers["ETag"] = etag
+                if_none_match = Headers(scope=scope).get("if-none-match")
+                if if_none_match and self._etag_matches(if_none_match, etag):
+                    response = Response(status_code=304, headers=headers)
+                    await response(scope, receive, send)
+                    return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in (b"cache-control", b"etag")
+                ]
+                response_headers.extend(
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers.items()
+                )
+                message = {**message, "headers": response_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+    def _find_policy(self, scope: Scope) -> CachePolicy | None:
+        """Find the cache policy of the route that will handle the request.
+
+        Args:
+            scope: ASGI connection scope
+
+        Returns:
+            Cache policy, or None for routes without one
+        """
+        template = self._routes.resolve(scope)
+        return None if template is None else self._policies[template]
+
+    async def _etag(self, scope: Scope) -> str | None:
+        """Build the strong ETag of a request from the catalog version.
+
+        Args:
+            scope: ASGI connection scope
+
+        Returns:
+            Quoted ETag, or None when no catalog version is available
+        """
+        try:
+            version = await self.version()
+        except Exception:
+            # Validators are an optimization; never fail a read because of them
+            logger.warning("Failed to get catalog version", exc_info=True)
+            return None
+
+        if version is None:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(version.encode())
+        digest.update(scope["path"].encode())
+        digest.update(b"?" + scope.get("query_string", b""))
+        return f'"{digest.hexdigest()[:32]}"'
+
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        """Check If-None-Match with the weak comparison RFC 9110 requires.
+
+        Args:
+            if_none_match: If-None-Match request header
+            etag: Current ETag of the resource
+
+        Returns:
+            True if the client's copy is current
+        """
+        if if_none_match.strip() == "*":
+            return True
+        candidates = (
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        )
+        return etag in candidates
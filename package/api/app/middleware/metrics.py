@@ -0,0 +1,193 @@
+"""Per-route latency and DynamoDB cost metrics in CloudWatch embedded metric format."""
+
+import json
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, Protocol, cast
+
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+from services.request_metrics import DynamoDBUsage, track_dynamodb_usage  # type: ignore
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .routing import RouteResolver
+
+# Route label of requests that match no route (keeps the dimension bounded)
+UNMATCHED_ROUTE = "UNMATCHED"
+
+# Catalog cache counters reported per request, by their CatalogCache.stats key
+CACHE_COUNTERS = {
+    "hits": "CatalogCacheHits",
+    "misses": "CatalogCacheMisses",
+    "bypasses": "CatalogCacheBypasses",
+}
+
+
+class MetricsSink(Protocol):
+    """Destination of EMF records."""
+
+    def emit(self, record: dict[str, Any]) -> None:
+        """Write one EMF record."""
+
+
+class StdoutSink:
+    """Print EMF records, which Lambda forwards to CloudWatch Logs."""
+
+    def emit(self, record: dict[str, Any]) -> None:
+        """Write one EMF record as a single log line."""
+        print(json.dumps(record, separators=(",", ":")))
+
+
+class MemorySink:
+    """Keep EMF records in memory, for tests and local runs."""
+
+    def __init__(self) -> None:
+        """Initialize an empty sink."""
+        self.records: list[dict[str, Any]] = []
+
+    def emit(self, record: dict[str, Any]) -> None:
+        """Keep one EMF record."""
+        self.records.append(record)
+
+    def clear(self) -> None:
+        """Drop the records kept so far."""
+        self.records.clear()
+
+
+class MetricsMiddleware:
+    """Emit one EMF record per request with its latency and DynamoDB cost.
+
+    Each record has the route template and whether the request was the
+    first one served by the container (cold start) as dimensions, and the
+    handler latency, the number of DynamoDB calls, the items they scanned
+    and returned, and the read capacity they consumed as metrics. Summing
+    the capacity by route shows which endpoint drives the bill; a high
+    scanned to returned ratio points at filters doing the work of keys.
+
+    When given the catalog cache's stats, each record also has the cache
+    hits, misses (loads) and bypasses of the request, taken as the change
+    in the cache's counters while it was served (exact on Lambda, which
+    serves one request at a time per container), and the cached item count.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        namespace: str,
+        service: str,
+        sink: MetricsSink,
+        routes: Iterable[str] = (),
+        cache_stats: Callable[[], Mapping[str, Any]] | None = None,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            namespace: CloudWatch metric namespace
+            service: Value of the service dimension
+            sink: Destination of the EMF records
+            routes: Route path templates used to label requests answered
+                before routing (such as 304s from ConditionalGetMiddleware)
+            cache_stats: Counters of the catalog cache (CatalogCache.stats)
+        """
+        self.app = app
+        self.namespace = namespace
+        self.service = service
+        self.sink = sink
+        self.cache_stats = cache_stats
+        self._cold_start = True
+        self._routes = RouteResolver(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cold_start, self._cold_start = self._cold_start, False
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        cache_before = self.cache_stats() if self.cache_stats else None
+        started = time.perf_counter()
+        with track_dynamodb_usage() as usage:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                latency_ms = (time.perf_counter() - started) * 1000
+                record = self._record(
+                    scope, status_code, cold_start, latency_ms, usage, cache_before
+                )
+                self.sink.emit(record)
+
+    def _record(
+        self,
+        scope: Scope,
+        status_code: int,
+        cold_start: bool,
+        latency_ms: float,
+        usage: DynamoDBUsage,
+        cache_before: Mapping[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Build the EMF record of a request.
+
+        Args:
+            scope: ASGI connection scope
+            status_code: Response status (500 if the app failed)
+            cold_start: Whether this was the container's first request
+            latency_ms: Time spent in the application
+            usage: DynamoDB calls made for the request
+            cache_before: Catalog cache counters when the request started
+
+        Returns:
+            EMF record
+        """
+        route = self._route(scope)
+        metrics = EphemeralMetrics(namespace=self.namespace, service=self.service)
+        # One dimension set: service (added by EphemeralMetrics), route and
+        # cold start
+        metrics.add_dimension("route", route)
+        metrics.add_dimension("cold_start", str(cold_start).lower())
+        metrics.add_metric("Latency", MetricUnit.Milliseconds, latency_ms)
+        metrics.add_metric("DynamoDBCalls", MetricUnit.Count, usage.calls)
+        metrics.add_metric(
+            "DynamoDBScannedCount", MetricUnit.Count, usage.scanned_count
+        )
+        metrics.add_metric("DynamoDBCount", MetricUnit.Count, usage.count)
+        metrics.add_metric(
+            "DynamoDBConsumedCapacity", MetricUnit.Count, usage.consumed_capacity
+        )
+        if self.cache_stats is not None and cache_before is not None:
+            cache_after = self.cache_stats()
+            for key, name in CACHE_COUNTERS.items():
+                change = cache_after[key] - cache_before[key]
+                metrics.add_metric(name, MetricUnit.Count, change)
+            metrics.add_metric(
+                "CatalogCachedItems", MetricUnit.Count, cache_after["cached_items"]
+            )
+        metrics.add_metadata("method", scope["method"])
+        metrics.add_metadata("status_code", status_code)
+        context = scope.get("aws.context")
+        if context is not None:
+            metrics.add_metadata("request_id", context.aws_request_id)
+        return cast("dict[str, Any]", metrics.serialize_metric_set())
+
+    def _route(self, scope: Scope) -> str:
+        """Get the path template of the route that handled a request.
+
+        Args:
+            scope: ASGI connection scope, after the application ran
+
+        Returns:
+            Route path template, or UNMATCHED_ROUTE
+        """
+        # Set by the router when it dispatches to a route
+        route = scope.get("route")
+        if route is not None:
+            return cast("str", route.path)
+
+        return self._routes.resolve(scope) or UNMATCHED_ROUTE
@@ -0,0 +1,49 @@
+"""Route matching for middleware that runs before the router."""
+
+from collections.abc import Iterable
+
+from starlette.routing import compile_path
+from starlette.types import Scope
+
+
+class RouteResolver:
+    """Find the route path template a request path matches.
+
+    Middleware outside the router (cache policies, metrics labels of
+    requests answered early) needs the route of a request before or
+    without routing it. Literal paths win over templates, as
+    "/videos/latest" must over "/videos/{video_id}".
+    """
+
+    def __init__(self, templates: Iterable[str]) -> None:
+        """Initialize the resolver.
+
+        Args:
+            templates: Route path templates, such as "/api/videos/{video_id}"
+        """
+        templates = list(templates)
+        self._exact = {path for path in templates if "{" not in path}
+        self._templated = [
+            (compile_path(path)[0], path) for path in templates if "{" in path
+        ]
+
+    def resolve(self, scope: Scope) -> str | None:
+        """Get the path template of the route that handles a request.
+
+        Args:
+            scope: ASGI connection scope
+
+        Returns:
+            Route path template, or None when no template matches
+        """
+        # Routes match against the path below the mount point, as in Starlette
+        path: str = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :] or "/"
+        if path in self._exact:
+            return path
+        for pattern, template in self._templated:
+            if pattern.match(path):
+                return template
+        return None
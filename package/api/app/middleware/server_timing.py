@@ -0,0 +1,62 @@
+"""Server-Timing headers breaking response time down by phase."""
+
+import time
+
+from aws_lambda_powertools import Logger
+from services.timing import track_server_timing  # type: ignore
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = Logger(service="diopside", child=True)
+
+
+class ServerTimingMiddleware:
+    """Report where the time of each request went.
+
+    Phases marked with services.timing.span (DynamoDB calls, item
+    conversion, tag tree building, encoding, compression) are sent in a
+    Server-Timing header, which browser developer tools display next to the
+    request, and logged as a debug record, together with the total time
+    until the response started. Meant for non-production environments: the
+    header discloses internals, and without this middleware the spans are
+    no-ops.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        with track_server_timing() as timing:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    timing.add("total", (time.perf_counter() - started) * 1000)
+                    header = timing.header()
+                    headers = MutableHeaders(raw=list(message.get("headers", [])))
+                    headers.append("Server-Timing", header)
+                    # Lets cross-origin pages read the timings as well
+                    headers["Timing-Allow-Origin"] = "*"
+                    message = {**message, "headers": headers.raw}
+                    logger.debug(
+                        "Server timing",
+                        extra={
+                            "path": scope["path"],
+                            "status_code": message["status"],
+                            "server_timing": timing.durations(),
+                        },
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -1,14 +1,102 @@
 import os
+from datetime import datetime
+from typing import Any, cast
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from middleware.compression import choose_encoding  # type: ignore
+from middleware.conditional import CachePolicy  # type: ignore
 from models.video import TagNode, Video  # type: ignore
 from pydantic import BaseModel
+from services.catalog_cache import CatalogCache  # type: ignore
 from services.dynamodb_service import DynamoDBService  # type: ignore
+from services.serialization import dumps  # type: ignore
+from services.timing import span  # type: ignore
 
 router = APIRouter(prefix="/api", tags=["videos"])
 
+# Largest number of IDs accepted by /videos/batch
+MAX_BATCH_VIDEO_IDS = 200
+
+# Catalog cache kept at module level so it survives warm Lambda invocations
+catalog_cache = CatalogCache(
+    ttl_seconds=float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300")),
+    max_items=int(os.getenv("CATALOG_CACHE_MAX_ITEMS", "50000")),
+    warm_after=int(os.getenv("CATALOG_CACHE_WARM_AFTER", "20")),
+)
+
+
+def _storage() -> Any:
+    """Get the storage backend selected by STORAGE_BACKEND.
+
+    Returns:
+        None for DynamoDB (the default), or a local SQLite stand-in for
+        "local", seeded from LOCAL_METADATA_DIR when its database is empty
+
+    Raises:
+        ValueError: If STORAGE_BACKEND names an unknown backend
+    """
+    backend = os.getenv("STORAGE_BACKEND", "dynamodb")
+    if backend == "dynamodb":
+        return None
+    if backend == "local":
+        # Imported only when selected, keeping SQLite out of Lambda init
+        from services.local_storage import open_local_storage  # type: ignore
+
+        return open_local_storage(
+            os.getenv("DYNAMODB_TABLE_NAME", "videos"),
+            path=os.getenv("LOCAL_DB_PATH", ":memory:"),
+            metadata_dir=os.getenv("LOCAL_METADATA_DIR"),
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
 # Initialize DynamoDB service
-db_service = DynamoDBService(os.getenv("DYNAMODB_TABLE_NAME", "videos"))
+db_service = DynamoDBService(
+    os.getenv("DYNAMODB_TABLE_NAME", "videos"),
+    scan_segments=int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "4")),
+    cache=catalog_cache,
+    max_workers=int(os.getenv("DYNAMODB_MAX_WORKERS", "8")),
+    call_timeout=float(os.getenv("DYNAMODB_CALL_TIMEOUT_SECONDS", "10")),
+    version_ttl_seconds=float(os.getenv("CATALOG_VERSION_TTL_SECONDS", "60")),
+    resource=_storage(),
+)
+
+# HTTP caching per route (see ConditionalGetMiddleware). Catalog reads change
+# only on import, so they carry ETags; random picks must never be reused.
+CACHE_POLICIES = {
+    "/api/tags": CachePolicy("public, max-age=300", etag=True),
+    "/api/videos": CachePolicy("public, max-age=300", etag=True),
+    "/api/videos/latest": CachePolicy("public, max-age=60", etag=True),
+    "/api/videos/by-tag": CachePolicy("public, max-age=300", etag=True),
+    "/api/videos/search": CachePolicy("public, max-age=300", etag=True),
+    "/api/videos/batch": CachePolicy("public, max-age=300", etag=True),
+    "/api/videos/random": CachePolicy("no-store"),
+    "/api/videos/memory": CachePolicy("no-store"),
+    "/api/videos/{video_id}": CachePolicy("public, max-age=3600", etag=True),
+}
+
+
+async def get_catalog_version() -> str | None:
+    """Get the catalog version that ETags are derived from."""
+    return cast("str | None", await db_service.get_catalog_version())
+
+
+def _json_response(payload: Any) -> Response:
+    """Serialize a payload built from our own table.
+
+    Returning a Response skips FastAPI's response_model validation and
+    serialization, which would re-check every Video the service already
+    built; the response_model of each route still documents the schema.
+
+    Args:
+        payload: Response body made of dicts, lists and models
+
+    Returns:
+        JSON response
+    """
+    with span("encode"):
+        content = dumps(payload)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/health")
@@ -34,6 +122,16 @@ class VideosByTagResponse(BaseModel):
     """Response model for videos filtered by tag."""
 
     items: list[Video]
+    last_key: str | None = None
+    total: int | None = None
+
+
+class VideoSearchResponse(BaseModel):
+    """Response model for title search results."""
+
+    items: list[Video]
+    last_key: str | None = None
+    total: int
 
 
 class RandomVideosResponse(BaseModel):
@@ -48,6 +146,12 @@ class MemoryThumbnailsResponse(BaseModel):
     thumbnails: list[str]
 
 
+class VideosBatchResponse(BaseModel):
+    """Response model for videos looked up by ID."""
+
+    items: list[Video]
+
+
 @router.get("/videos", response_model=VideosResponse)
 async def get_videos_by_year(
     year: int = Query(..., description="Year to filter videos (YYYY format)"),
@@ -55,35 +159,90 @@ async def get_videos_by_year(
         50, ge=1, le=100, description="Maximum number of videos to return"
     ),
     last_key: str | None = Query(None, description="Last key for pagination"),
-) -> VideosResponse:
+    date_from: datetime | None = Query(
+        None, alias="from", description="Earliest publish time (inclusive)"
+    ),
+    date_to: datetime | None = Query(
+        None, alias="to", description="Latest publish time (inclusive)"
+    ),
+) -> Response:
     """Get videos by year with pagination support.
 
     This endpoint supports infinite scroll by using the lastKey parameter
-    for pagination through large result sets.
+    for pagination through large result sets. The optional from/to bounds
+    narrow the listing to a month or day without reading the whole year.
     """
     try:
         videos, next_last_key = await db_service.get_videos_by_year(
             year=year,
             limit=limit,
             last_key=last_key,
+            date_from=date_from,
+            date_to=date_to,
         )
 
-        return VideosResponse(items=videos, last_key=next_last_key)
+        return _json_response({"items": videos, "last_key": next_last_key})
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/videos/latest", response_model=VideosResponse)
+async def get_latest_videos(
+    limit: int = Query(
+        50, ge=1, le=100, description="Maximum number of videos to return"
+    ),
+    last_key: str | None = Query(
+        None, description="Cursor returned with the previous page"
+    ),
+) -> Response:
+    """Get the newest videos across all years.
+
+    Videos from every year are merged by publish date, newest first. The
+    returned last_key is an opaque cursor for the next page.
+    """
+    try:
+        videos, next_last_key = await db_service.get_latest_videos(
+            limit=limit,
+            cursor=last_key,
+        )
+
+        return _json_response({"items": videos, "last_key": next_last_key})
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @router.get("/tags", response_model=TagsResponse)
-async def get_tag_tree() -> TagsResponse:
+async def get_tag_tree(request: Request) -> Response:
     """Get hierarchical tag tree structure.
 
     Returns a tree structure of all tags with their counts,
     enabling hierarchical navigation through video archives.
     """
     try:
+        # Serve the tree precomputed at import time when it is available,
+        # in the gzip encoding it is stored in when the client accepts it
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if choose_encoding(accept_encoding, ("gzip",)) == "gzip":
+            tree_gzip = await db_service.get_tag_tree_gzip()
+            if tree_gzip is not None:
+                return Response(
+                    content=tree_gzip,
+                    media_type="application/json",
+                    headers={"Content-Encoding": "gzip"},
+                )
+
+        tree_json = await db_service.get_tag_tree_json()
+        if tree_json is not None:
+            return Response(content=tree_json, media_type="application/json")
+
         tag_tree = await db_service.build_tag_tree()
-        return TagsResponse(tree=tag_tree)
+        return _json_response({"tree": tag_tree})
 
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -94,16 +253,65 @@ async def get_videos_by_tag(
     path: str = Query(
         ..., description="Tag path (e.g., 'ゲーム実況/ホラー/Cry of Fear')"
     ),
-) -> VideosByTagResponse:
+    limit: int = Query(
+        50, ge=1, le=100, description="Maximum number of videos to return"
+    ),
+    last_key: str | None = Query(None, description="Last key for pagination"),
+    include_total: bool = Query(
+        False, description="Also return the number of matching videos"
+    ),
+) -> Response:
     """Get videos filtered by hierarchical tag path.
 
     Supports filtering videos by a specific tag path in the hierarchy.
     The path should be slash-separated (e.g., 'ゲーム実況/ホラー/Cry of Fear').
+    Videos are returned newest first, one page at a time, with the same
+    lastKey pagination as the year listing. The total is read from a count
+    precomputed at import time, and is null when it is not available.
     """
     try:
-        videos = await db_service.get_videos_by_tag_path(path)
-        return VideosByTagResponse(items=videos)
+        videos, next_last_key = await db_service.get_videos_by_tag_path(
+            path, limit=limit, last_key=last_key
+        )
+        payload: dict[str, Any] = {"items": videos, "last_key": next_last_key}
+        if include_total:
+            payload["total"] = await db_service.count_videos_by_tag_path(path)
+
+        return _json_response(payload)
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/videos/search", response_model=VideoSearchResponse)
+async def search_videos(
+    q: str = Query(
+        ..., min_length=1, max_length=100, description="Search terms (e.g., 'マリカ')"
+    ),
+    limit: int = Query(
+        50, ge=1, le=100, description="Maximum number of videos to return"
+    ),
+    last_key: str | None = Query(None, description="Last key for pagination"),
+) -> Response:
+    """Search video titles.
+
+    Every space-separated term must appear in the title. Matching ignores
+    full/half width, case and hiragana/katakana differences, so 'ＡＳＭＲ'
+    finds 'ASMR' and 'まりか' finds 'マリカ'. Titles the terms cover the
+    most of come first; total is the number of matches.
+    """
+    try:
+        videos, next_last_key, total = await db_service.search_videos(
+            q, limit=limit, last_key=last_key
+        )
+        return _json_response(
+            {"items": videos, "last_key": next_last_key, "total": total}
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -111,14 +319,14 @@ async def get_videos_by_tag(
 @router.get("/videos/random", response_model=RandomVideosResponse)
 async def get_random_videos(
     count: int = Query(1, ge=1, le=20, description="Number of random videos to return"),
-) -> RandomVideosResponse:
+) -> Response:
     """Get random videos for discovery.
 
     Returns a random selection of videos for the random discovery feature.
     """
     try:
         videos = await db_service.get_random_videos(count)
-        return RandomVideosResponse(items=videos)
+        return _json_response({"items": videos})
 
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -127,7 +335,7 @@ async def get_random_videos(
 @router.get("/videos/memory", response_model=MemoryThumbnailsResponse)
 async def get_memory_thumbnails(
     pairs: int = Query(8, ge=2, le=20, description="Number of pairs for memory game"),
-) -> MemoryThumbnailsResponse:
+) -> Response:
     """Get thumbnail pairs for memory game.
 
     Returns thumbnail URLs arranged in pairs for the memory game feature.
@@ -135,7 +343,36 @@ async def get_memory_thumbnails(
     """
     try:
         thumbnails = await db_service.get_memory_thumbnails(pairs)
-        return MemoryThumbnailsResponse(thumbnails=thumbnails)
+        return _json_response({"thumbnails": thumbnails})
+
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/videos/batch", response_model=VideosBatchResponse)
+async def get_videos_by_ids(
+    ids: str = Query(
+        ...,
+        description=f"Comma-separated video IDs (up to {MAX_BATCH_VIDEO_IDS})",
+    ),
+) -> Response:
+    """Get several videos by ID in one request.
+
+    Videos are returned in the requested order. IDs that do not exist are
+    left out of the response.
+    """
+    video_ids = [video_id.strip() for video_id in ids.split(",") if video_id.strip()]
+    if not video_ids:
+        raise HTTPException(status_code=400, detail="No video IDs given")
+    if len(video_ids) > MAX_BATCH_VIDEO_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_VIDEO_IDS} video IDs can be requested",
+        )
+
+    try:
+        videos = await db_service.get_videos_by_ids(video_ids)
+        return _json_response({"items": videos})
 
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -144,7 +381,7 @@ async def get_memory_thumbnails(
 @router.get("/videos/{video_id}", response_model=Video)
 async def get_video_by_id(
     video_id: str,
-) -> Video:
+) -> Response:
     """Get a single video by its ID.
 
     Returns detailed information about a specific video.
@@ -155,7 +392,7 @@ async def get_video_by_id(
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
 
-        return video
+        return _json_response(video)
 
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
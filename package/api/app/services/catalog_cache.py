@@ -0,0 +1,189 @@
+"""In-memory catalog cache shared across warm Lambda invocations."""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, cast
+
+from models.video import TagNode, Video  # type: ignore
+from services.catalog_layout import tag_sub_paths  # type: ignore
+from services.search_index import TitleIndex  # type: ignore
+
+
+class CatalogSnapshot:
+    """Immutable view of the whole catalog with derived lookup indexes."""
+
+    def __init__(self, videos: list[Video], tag_tree: list[TagNode]) -> None:
+        """Build the lookup indexes for a list of videos.
+
+        Args:
+            videos: Every video in the catalog
+            tag_tree: Tag tree built from the same videos
+        """
+        self.videos = videos
+        self.tag_tree = tag_tree
+        self.videos_by_id: dict[str, Video] = {}
+        self.videos_by_tag_path: dict[str, list[Video]] = {}
+        self.thumbnail_pool: list[str] = []
+
+        seen_thumbnails: set[str] = set()
+        for video in videos:
+            self.videos_by_id[video.video_id] = video
+
+            for path in tag_sub_paths(video.tags):
+                self.videos_by_tag_path.setdefault(path, []).append(video)
+
+            if video.thumbnail_url and video.thumbnail_url not in seen_thumbnails:
+                seen_thumbnails.add(video.thumbnail_url)
+                self.thumbnail_pool.append(video.thumbnail_url)
+
+        # Newest first with ties broken by ID, matching the ByTagDate index so
+        # that paginated tag listings can resume from a DynamoDB cursor
+        self.videos_newest_first = sorted(videos, key=self._date_order, reverse=True)
+        for path_videos in self.videos_by_tag_path.values():
+            path_videos.sort(key=self._date_order, reverse=True)
+
+        # Built on the first search only, then kept with the snapshot
+        self._title_index: TitleIndex | None = None
+        self._title_index_lock = threading.Lock()
+
+    @property
+    def title_index(self) -> TitleIndex:
+        """Title search index over the videos, newest first on ties."""
+        if self._title_index is None:
+            # Concurrent first searches build the index once
+            with self._title_index_lock:
+                if self._title_index is None:
+                    self._title_index = TitleIndex(self.videos_newest_first)
+        return cast("TitleIndex", self._title_index)
+
+    @staticmethod
+    def _date_order(video: Video) -> tuple[str, str]:
+        """Sort key ordering videos by publish date, then by ID."""
+        return video.created_at or "", video.video_id
+
+
+class CatalogCache:
+    """Time-bounded cache holding a single catalog snapshot.
+
+    The catalog only changes when the import script runs, so warm containers
+    can answer catalog-wide reads from memory until the TTL expires.
+
+    Most reads have a cheaper targeted query to fall back on, so they only
+    load the catalog when should_load says the container has earned it:
+    when it held a snapshot before (which expired or was invalidated), or
+    when warm_after such reads have gone without one since the container
+    started. Reads with no cheaper path (building the tag tree or the title
+    index) load it on any miss.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        max_items: int = 50_000,
+        warm_after: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the catalog cache.
+
+        Args:
+            ttl_seconds: Seconds a snapshot stays valid (0 disables caching)
+            max_items: Largest catalog that will be kept in memory
+            warm_after: Reads falling back to targeted queries after which
+                the catalog is loaded
+            clock: Monotonic time source
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.warm_after = warm_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot: CatalogSnapshot | None = None
+        self._expires_at = 0.0
+        # Whether a snapshot was ever kept, and whether the last load was
+        # too large to keep (loading it again would only repeat the scan)
+        self._loaded = False
+        self._too_large = False
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def get(self) -> CatalogSnapshot | None:
+        """Get the cached snapshot if it is still valid.
+
+        Only lookups served from the snapshot are counted (as hits); misses
+        are counted when the catalog is loaded (see put).
+
+        Returns:
+            Cached snapshot, or None if there is no valid one
+        """
+        with self._lock:
+            if self._snapshot is not None and self._clock() < self._expires_at:
+                self.hits += 1
+                return self._snapshot
+
+            self._snapshot = None
+            return None
+
+    def should_load(self) -> bool:
+        """Decide whether a read with a targeted fallback loads the catalog.
+
+        A read told not to load is counted as a bypass.
+
+        Returns:
+            True if the catalog is stale or the container is warm
+        """
+        with self._lock:
+            if self.ttl_seconds <= 0 or self._too_large:
+                load = False
+            else:
+                load = self._loaded or self.bypasses + 1 >= self.warm_after
+            if not load:
+                self.bypasses += 1
+            return load
+
+    def put(self, videos: list[Video], tag_tree: list[TagNode]) -> CatalogSnapshot:
+        """Build a snapshot and cache it when it fits within the bounds.
+
+        Each call is a load of the catalog, and is counted as a miss.
+
+        Args:
+            videos: Every video in the catalog
+            tag_tree: Tag tree built from the same videos
+
+        Returns:
+            The new snapshot (returned even when it was too large to cache)
+        """
+        snapshot = CatalogSnapshot(videos, tag_tree)
+
+        with self._lock:
+            self.misses += 1
+            self._too_large = len(videos) > self.max_items
+            if self.ttl_seconds > 0 and not self._too_large:
+                self._snapshot = snapshot
+                self._expires_at = self._clock() + self.ttl_seconds
+                self._loaded = True
+
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot."""
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get the cache counters for monitoring.
+
+        Returns:
+            Dictionary with hits, misses (loads), bypasses (reads answered
+            by targeted queries), hit ratio and cached item count
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "cached_items": len(self._snapshot.videos) if self._snapshot else 0,
+            }
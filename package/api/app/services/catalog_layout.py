@@ -0,0 +1,104 @@
+"""Derived parts of the catalog the import script writes.
+
+The import script (import_json_to_dynamodb.py) stores, next to every video,
+one index item per tag path, the precomputed tag tree and a catalog version
+hashed from the videos. The catalog cache, the tag tree fallback of
+DynamoDBService and the seeding of local storage derive the same values
+here, so they agree with each other and with the imported table.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+from models.video import TagNode  # type: ignore
+
+
+def tag_sub_paths(tags: list[str]) -> set[str]:
+    """List every contiguous tag sequence as a slash-separated path.
+
+    Args:
+        tags: Hierarchical tags of a video
+
+    Returns:
+        Set of tag paths the video matches
+    """
+    return {
+        "/".join(tags[start:end])
+        for start in range(len(tags))
+        for end in range(start + 1, len(tags) + 1)
+    }
+
+
+def add_tags_to_tree(tree: dict[str, Any], tags: list[str]) -> None:
+    """Add a tag path to the tree structure.
+
+    Args:
+        tree: Current tree dictionary
+        tags: List of tags representing a path
+    """
+    current = tree
+
+    for tag in tags:
+        if tag not in current:
+            current[tag] = {"children": {}, "count": 0}
+        current[tag]["count"] += 1
+        current = current[tag]["children"]
+
+
+def tag_tree_nodes(tree: dict[str, Any]) -> list[TagNode]:
+    """Convert tree dictionary to TagNode objects.
+
+    Args:
+        tree: Tree dictionary structure
+
+    Returns:
+        List of TagNode objects, sorted by name at every level
+    """
+    nodes = []
+
+    for tag_name, tag_data in tree.items():
+        children_dict = tag_data["children"]
+        children = None
+
+        if children_dict:
+            children = tag_tree_nodes(children_dict)
+
+        node = TagNode(
+            name=tag_name,
+            children=children,
+            count=tag_data["count"],
+        )
+        nodes.append(node)
+
+    return sorted(nodes, key=lambda x: x.name)
+
+
+def video_fingerprint(video: dict[str, Any]) -> str:
+    """Hash the attributes of a video the API returns.
+
+    Args:
+        video: Video attributes (video_id, title, tags, year, thumbnail_url,
+            created_at)
+
+    Returns:
+        Hex digest of the attributes
+    """
+    body = json.dumps(video, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def catalog_version(fingerprints: list[str]) -> str:
+    """Compute the catalog version from the fingerprints of its videos.
+
+    The version does not depend on the order of the videos, so importing
+    the same videos again keeps it (and the ETag of the API) unchanged.
+
+    Args:
+        fingerprints: video_fingerprint of every video
+
+    Returns:
+        Catalog version
+    """
+    digest = hashlib.sha256("\n".join(sorted(fingerprints)).encode("utf-8"))
+    return digest.hexdigest()[:16]
@@ -0,0 +1,123 @@
+"""Asyncio helpers for issuing data-access calls in parallel and sharing them."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Coroutine, Hashable, Iterable
+from functools import partial
+from typing import Any, TypeVar, cast
+
+T = TypeVar("T")
+
+
+async def fan_out(
+    calls: Iterable[Callable[[], Awaitable[T]]],
+    limit: int | None = None,
+) -> list[T]:
+    """Run independent async calls concurrently and collect their results.
+
+    Calls are passed as zero-argument factories so that a call is only
+    started once a concurrency slot is free. If any call fails, the others
+    are cancelled and the first error is raised as is, so callers handle it
+    exactly as they would a single sequential call.
+
+    Args:
+        calls: Factories returning the awaitables to run
+        limit: Maximum number of calls in flight (unbounded if omitted)
+
+    Returns:
+        Results in the same order as the calls
+    """
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(call: Callable[[], Awaitable[T]]) -> T:
+        if semaphore is None:
+            return await call()
+        async with semaphore:
+            return await call()
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(run(call)) for call in calls]
+    except ExceptionGroup as e:
+        raise e.exceptions[0] from None
+
+    return [task.result() for task in tasks]
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers asking for the same thing.
+
+    The first caller for a key starts the call; callers arriving while it
+    runs await the same result instead of repeating the work. The key is
+    forgotten as soon as the call finishes, so results are never cached and
+    a failed call is retried by the next caller. Errors reach every caller.
+
+    A cancelled caller stops waiting without affecting the others; the call
+    itself is only cancelled once every caller waiting for it is gone. The
+    call runs in the context of the caller that started it, so per-request
+    accounting attributes its work to that request only.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._calls: dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        """Run a call, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the call, such as the operation and its arguments
+            call: Factory returning the coroutine to run when none is in flight
+
+        Returns:
+            Result of the shared call (the same object for every caller, so
+            it must not be mutated)
+        """
+        loop = asyncio.get_running_loop()
+        flight = self._calls.get(key)
+        # Lambda may run each invocation on a new event loop; a call left on
+        # a previous loop cannot be awaited from this one
+        if flight is None or flight.task.get_loop() is not loop:
+            flight = _Flight(loop.create_task(call()))
+            self._calls[key] = flight
+            flight.task.add_done_callback(partial(self._forget, key))
+
+        flight.waiters += 1
+        try:
+            return cast("T", await asyncio.shield(flight.task))
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Last one waiting: later callers must start afresh rather
+                # than join a call that is being cancelled
+                if self._calls.get(key) is flight:
+                    del self._calls[key]
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self) -> int:
+        """Get the number of distinct calls currently running.
+
+        Returns:
+            Number of keys with a call in flight
+        """
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        """Drop a finished call so the next caller starts a new one."""
+        flight = self._calls.get(key)
+        if flight is not None and flight.task is task:
+            del self._calls[key]
+        # Nobody may be left to retrieve the outcome of a cancelled call
+        if not task.cancelled():
+            task.exception()
+
+
+class _Flight:
+    """A shared call and the number of callers waiting for it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
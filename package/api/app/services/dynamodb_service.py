@@ -1,14 +1,83 @@
 """DynamoDB service for video data operations."""
 
+import asyncio
+import base64
+import binascii
+import bisect
+import contextvars
+import gzip
+import heapq
 import json
+import queue
 import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
 from decimal import Decimal
-from typing import Any, cast
+from functools import partial
+from typing import TYPE_CHECKING, Any, SupportsBytes, TypeVar, cast
 
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, ConditionBase, Key
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from models.video import TagNode, Video  # type: ignore
+from services.catalog_cache import CatalogCache, CatalogSnapshot  # type: ignore
+from services.catalog_layout import add_tags_to_tree, tag_tree_nodes  # type: ignore
+from services.concurrency import SingleFlight, fan_out  # type: ignore
+from services.request_metrics import instrument_client  # type: ignore
+from services.search_index import TitleIndex  # type: ignore
+from services.timing import span, time_client_calls  # type: ignore
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
+
+T = TypeVar("T")
+
+# Attributes needed to build a Video model from a table item
+VIDEO_ATTRIBUTES = (
+    "video_id",
+    "title",
+    "tags",
+    "year",
+    "thumbnail_url",
+    "created_at",
+)
+
+# Video items live under YEAR# partitions; other partitions hold metadata.
+# Only video items carry both year and created_at, so scanning the sparse
+# ByYearDate index reads them alone; the filter is kept as a safety net.
+VIDEO_SCAN_INDEX = "ByYearDate"
+VIDEO_ITEM_FILTER = Attr("PK").begins_with("YEAR#")
+
+# Tag tree materialized by the import script (see import_json_to_dynamodb.py)
+TAG_TREE_KEY = "META#TAG_TREE"
+TAG_TREE_FORMAT_VERSION = 1
+
+# Catalog summary written by the import script (see import_json_to_dynamodb.py)
+CATALOG_KEY = "META#CATALOG"
+
+# Ordinals tried per requested video before random sampling settles for fewer
+SAMPLE_DRAWS_PER_VIDEO = 4
+
+# Tag path index items and their video counts (see import_json_to_dynamodb.py)
+TAG_PATH_PREFIX = "TAGPATH#"
+TAG_COUNT_KEY = "META#COUNT"
+
+# ID-keyed video copies written by the import script for BatchGetItem
+VIDEO_LOOKUP_PREFIX = "VIDEO#"
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 6
+BATCH_GET_BACKOFF_SECONDS = 0.05
+
+# Version of the opaque cursor returned by the cross-year feed
+FEED_CURSOR_VERSION = 1
+
+# Marker a scan worker puts on the page queue once its segment is exhausted
+_SEGMENT_DONE = object()
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -32,18 +101,350 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class _FeedPartition:
+    """Read position and buffered items of one year in the cross-year feed."""
+
+    def __init__(self, year: int, start_key: dict[str, Any] | None) -> None:
+        """Initialize the partition state.
+
+        Args:
+            year: Year partition of the ByYearDate index
+            start_key: Key of the last item served from this partition
+        """
+        self.year = year
+        # Position after the last item served; this is what the cursor keeps
+        self.start_key = start_key
+        # Position after the last item read, which may be further ahead
+        self.fetch_key = start_key
+        self.buffer: deque[dict[str, Any]] = deque()
+        self.has_more = True
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether every item of the partition has been served."""
+        return not self.buffer and not self.has_more
+
+    def rank(self) -> float:
+        """Heap rank of the buffered head item (newest ranks lowest)."""
+        created_at = str(self.buffer[0]["created_at"])
+        return -datetime.fromisoformat(created_at).timestamp()
+
+    def pop(self) -> dict[str, Any]:
+        """Serve the head item and advance the cursor position past it."""
+        item = self.buffer.popleft()
+        self.start_key = {
+            name: item[name] for name in ("PK", "SK", "year", "created_at")
+        }
+        return item
+
+
 class DynamoDBService:
     """Service class for DynamoDB operations."""
 
-    def __init__(self, table_name: str) -> None:
+    def __init__(
+        self,
+        table_name: str,
+        scan_segments: int = 4,
+        cache: CatalogCache | None = None,
+        max_workers: int = 8,
+        call_timeout: float | None = 10.0,
+        version_ttl_seconds: float = 60,
+        resource: "DynamoDBServiceResource | None" = None,
+    ) -> None:
         """Initialize DynamoDB service.
 
         Args:
             table_name: Name of the DynamoDB table
+            scan_segments: Number of parallel segments used for full-table scans
+            cache: Catalog cache for catalog-wide reads (disabled if omitted)
+            max_workers: Number of threads running blocking boto3 calls
+            call_timeout: Seconds a service call may take before it fails
+                (no limit if None)
+            version_ttl_seconds: Seconds the catalog version is reused before
+                it is read again
+            resource: DynamoDB resource to use instead of a boto3 one (such
+                as local_storage.LocalDynamoDB)
         """
         self.table_name = table_name
-        self.dynamodb = boto3.resource("dynamodb")
-        self.table = self.dynamodb.Table(table_name)
+        self.scan_segments = max(1, scan_segments)
+        self.cache = cache
+        self.call_timeout = call_timeout
+        self.version_ttl_seconds = version_ttl_seconds
+        self._catalog_version: str | None = None
+        self._version_read_at: float | None = None
+        # Title index built when the catalog snapshot is not cached, kept with
+        # the catalog version it was built for (see _title_index)
+        self._search_index: tuple[str, TitleIndex] | None = None
+        # boto3 is blocking, so calls run on a bounded pool of worker threads.
+        # The pool is not tied to an event loop, which keeps it usable across
+        # the per-invocation loops Mangum runs on Lambda.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="dynamodb"
+        )
+        # One connection per worker and scan segment it may run
+        self._max_pool_connections = max(10, max_workers * self.scan_segments)
+        # Concurrent requests share expensive reads instead of repeating them
+        self._flights = SingleFlight()
+        # Created on first use: building the resource loads botocore's service
+        # model, which would otherwise add ~0.1 s to every Lambda cold start
+        self._resource_lock = threading.Lock()
+        self._dynamodb: DynamoDBServiceResource | None = resource
+        self._table: Table | None = None
+
+    @property
+    def dynamodb(self) -> "DynamoDBServiceResource":
+        """boto3 DynamoDB resource, created on first use."""
+        if self._dynamodb is None:
+            # Scan workers may race for the first access
+            with self._resource_lock:
+                if self._dynamodb is None:
+                    resource = boto3.resource(
+                        "dynamodb",
+                        config=Config(max_pool_connections=self._max_pool_connections),
+                    )
+                    instrument_client(resource.meta.client)
+                    time_client_calls(resource.meta.client)
+                    self._dynamodb = resource
+        return self._dynamodb
+
+    @dynamodb.setter
+    def dynamodb(self, resource: "DynamoDBServiceResource") -> None:
+        self._dynamodb = resource
+
+    @property
+    def table(self) -> "Table":
+        """Table resource of the service's table, created on first use."""
+        if self._table is None:
+            self._table = self.dynamodb.Table(self.table_name)
+        return self._table
+
+    @table.setter
+    def table(self, table: "Table") -> None:
+        self._table = table
+
+    async def _run(self, func: Callable[[], T]) -> T:
+        """Run a blocking call on the worker pool without blocking the loop.
+
+        On timeout the caller gets an error straight away; the worker thread
+        finishes the call in the background and is then reused.
+
+        Args:
+            func: Zero-argument callable doing the blocking work
+
+        Returns:
+            Result of the callable
+
+        Raises:
+            RuntimeError: If the call exceeds call_timeout
+        """
+        # Run in a copy of the caller's context so that the call is counted
+        # against the request being served (see request_metrics)
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, context.run, func
+        )
+        try:
+            return await asyncio.wait_for(future, self.call_timeout)
+        except TimeoutError as e:
+            raise RuntimeError(
+                f"DynamoDB call timed out after {self.call_timeout} seconds"
+            ) from e
+
+    async def _run_shared(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run a blocking read, sharing it with identical reads in flight.
+
+        Requests arriving together after a deploy or a cache expiry would
+        otherwise each scan the whole table. The result is handed to every
+        waiting caller as is, so it must not be mutated.
+
+        Args:
+            key: Operation and arguments identifying the read
+            func: Zero-argument callable doing the blocking work
+
+        Returns:
+            Result of the callable
+        """
+        return cast("T", await self._flights.do(key, partial(self._run, func)))
+
+    async def _scan_all(self, projection: Sequence[str]) -> list[dict[str, Any]]:
+        """Read every video item, sharing the scan with concurrent callers.
+
+        Args:
+            projection: Attribute names to read
+
+        Returns:
+            DynamoDB item dictionaries (shared, must not be mutated)
+        """
+        return await self._run_shared(
+            ("scan", tuple(projection)), lambda: list(self._scan_items(projection))
+        )
+
+    def _scan_items(
+        self,
+        projection: Sequence[str] | None = None,
+        segments: int | None = None,
+        filter_expression: ConditionBase | None = VIDEO_ITEM_FILTER,
+        index_name: str | None = VIDEO_SCAN_INDEX,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream every item in the table or one of its indexes.
+
+        Each segment follows LastEvaluatedKey until exhausted, so the result
+        is complete regardless of table size. With more than one segment the
+        segments are scanned concurrently and their pages are yielded as they
+        arrive, in no particular order.
+
+        Args:
+            projection: Attribute names to read (all attributes if omitted)
+            segments: Number of parallel segments (defaults to scan_segments)
+            filter_expression: Condition items must match (video items only
+                by default)
+            index_name: Index to scan (the sparse video index by default,
+                None for the base table)
+
+        Yields:
+            DynamoDB item dictionaries
+        """
+        scan_kwargs: dict[str, Any] = {}
+        if index_name is not None:
+            scan_kwargs["IndexName"] = index_name
+        if projection:
+            names = {f"#p{i}": name for i, name in enumerate(projection)}
+            scan_kwargs["ProjectionExpression"] = ", ".join(names)
+            scan_kwargs["ExpressionAttributeNames"] = names
+        if filter_expression is not None:
+            scan_kwargs["FilterExpression"] = filter_expression
+
+        total_segments = segments or self.scan_segments
+        if total_segments <= 1:
+            for page in self._scan_pages(scan_kwargs):
+                yield from page
+            return
+
+        pages: queue.Queue[Any] = queue.Queue()
+        stop = threading.Event()
+
+        def scan_segment(segment: int) -> None:
+            try:
+                segment_kwargs = {
+                    **scan_kwargs,
+                    "Segment": segment,
+                    "TotalSegments": total_segments,
+                }
+                for page in self._scan_pages(segment_kwargs, stop):
+                    pages.put(page)
+            except Exception as e:
+                pages.put(e)
+            finally:
+                pages.put(_SEGMENT_DONE)
+
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            for segment in range(total_segments):
+                executor.submit(contextvars.copy_context().run, scan_segment, segment)
+
+            try:
+                remaining = total_segments
+                while remaining:
+                    page = pages.get()
+                    if page is _SEGMENT_DONE:
+                        remaining -= 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield from page
+            finally:
+                # Let the remaining workers finish early if the consumer stops
+                stop.set()
+
+    def _scan_pages(
+        self,
+        scan_kwargs: dict[str, Any],
+        stop: threading.Event | None = None,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Scan pages one at a time, following LastEvaluatedKey.
+
+        Args:
+            scan_kwargs: Keyword arguments passed to every scan call
+            stop: Event that ends pagination after the current page when set
+
+        Yields:
+            Lists of items, one per scan page
+        """
+        kwargs = dict(scan_kwargs)
+        while True:
+            response = self.table.scan(**kwargs)
+            yield response.get("Items", [])
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key or (stop is not None and stop.is_set()):
+                return
+            kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+    async def _catalog(self) -> CatalogSnapshot | None:
+        """Get the cached catalog for a read that has a targeted fallback.
+
+        The catalog is loaded (on a worker, sharing the scan with concurrent
+        callers) only when the cache asks for it, see CatalogCache. Loading
+        is opportunistic: if it fails, the caller uses its targeted read.
+
+        Returns:
+            Catalog snapshot, or None when the caller should read DynamoDB
+        """
+        if self.cache is None:
+            return None
+
+        snapshot = self.cache.get()
+        if snapshot is None and self.cache.should_load():
+            try:
+                snapshot = await self._run_shared(("catalog",), self._get_catalog)
+            except (ClientError, RuntimeError):
+                return None
+        return cast("CatalogSnapshot | None", snapshot)
+
+    def _get_catalog(self) -> CatalogSnapshot | None:
+        """Get the whole catalog from the cache, loading it on a miss.
+
+        Returns:
+            Catalog snapshot, or None when caching is disabled
+        """
+        if self.cache is None:
+            return None
+
+        snapshot = self.cache.get()
+        if snapshot is None:
+            # Items are converted as scan pages arrive, so this phase includes
+            # the scan; its dynamodb calls are timed separately as well
+            with span("catalog"):
+                videos = [
+                    self._convert_dynamodb_item_to_video(item)
+                    for item in self._scan_items(VIDEO_ATTRIBUTES)
+                ]
+
+                with span("tree"):
+                    tag_tree: dict[str, Any] = {}
+                    for video in videos:
+                        add_tags_to_tree(tag_tree, video.tags)
+                    tag_nodes = tag_tree_nodes(tag_tree)
+
+                snapshot = self.cache.put(videos, tag_nodes)
+
+        return cast("CatalogSnapshot", snapshot)
+
+    def _query_items(self, **query_kwargs: Any) -> Iterator[dict[str, Any]]:
+        """Stream every item matching a query, following LastEvaluatedKey.
+
+        Args:
+            **query_kwargs: Keyword arguments passed to every query call
+
+        Yields:
+            DynamoDB item dictionaries
+        """
+        while True:
+            response = self.table.query(**query_kwargs)
+            yield from response.get("Items", [])
+
+            if "LastEvaluatedKey" not in response:
+                return
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
     def _convert_dynamodb_item_to_video(self, item: dict[str, Any]) -> Video:
         """Convert DynamoDB item to Video model.
@@ -70,34 +471,59 @@ class DynamoDBService:
         year: int,
         limit: int = 50,
         last_key: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
     ) -> tuple[list[Video], str | None]:
         """Get videos by year with pagination, sorted by date (newest first).
 
+        The date bounds are part of the key condition on the ByYearDate index,
+        so a month or day view reads only the videos it returns.
+
         Args:
             year: Year to filter by
             limit: Maximum number of items to return
             last_key: Last evaluated key for pagination
+            date_from: Earliest publish time to include (inclusive)
+            date_to: Latest publish time to include (inclusive)
 
         Returns:
             Tuple of (videos list, next last_key)
+
+        Raises:
+            ValueError: If date_from is later than date_to, or last_key is
+                malformed
         """
+        start_key = self._decode_year_cursor(last_key, year)
+        key_condition: ConditionBase = Key("year").eq(year)
+        lower = self._format_timestamp(date_from) if date_from else None
+        upper = self._format_timestamp(date_to) if date_to else None
+        if lower and upper:
+            if lower > upper:
+                raise ValueError("'from' must not be later than 'to'")
+            key_condition &= Key("created_at").between(lower, upper)
+        elif lower:
+            key_condition &= Key("created_at").gte(lower)
+        elif upper:
+            key_condition &= Key("created_at").lte(upper)
+
         try:
             query_kwargs: dict[str, Any] = {
-                "IndexName": "GSI1",
-                "KeyConditionExpression": Key("year").eq(year),
+                "IndexName": "ByYearDate",
+                "KeyConditionExpression": key_condition,
                 "Limit": limit,
                 "ScanIndexForward": False,  # Sort by created_at in descending order
             }
 
-            if last_key:
-                query_kwargs["ExclusiveStartKey"] = json.loads(last_key)
+            if start_key:
+                query_kwargs["ExclusiveStartKey"] = start_key
 
-            response = self.table.query(**query_kwargs)
+            response = await self._run(partial(self.table.query, **query_kwargs))
 
-            videos = [
-                self._convert_dynamodb_item_to_video(item)
-                for item in response.get("Items", [])
-            ]
+            with span("convert"):
+                videos = [
+                    self._convert_dynamodb_item_to_video(item)
+                    for item in response.get("Items", [])
+                ]
 
             next_last_key = None
             if "LastEvaluatedKey" in response:
@@ -110,6 +536,223 @@ class DynamoDBService:
         except ClientError as e:
             raise RuntimeError(f"Failed to query videos by year: {e}") from e
 
+    @staticmethod
+    def _format_timestamp(value: datetime) -> str:
+        """Format a datetime like the stored created_at values.
+
+        Args:
+            value: Datetime to format (naive values are taken as UTC)
+
+        Returns:
+            UTC timestamp such as "2024-01-15T14:30:00Z"
+        """
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    async def get_latest_videos(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> tuple[list[Video], str | None]:
+        """Get videos across all years, newest first, with cursor pagination.
+
+        Every year partition of the ByYearDate index is queried concurrently
+        and the partitions are k-way merged by publish date with a heap. The
+        cursor keeps the position in each partition, so deep pages cost the
+        same as the first one. The first read is split evenly across the
+        partitions and a partition that runs dry is refilled with only as
+        many items as the page still needs.
+
+        Args:
+            limit: Maximum number of items to return
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple of (videos list, cursor for the next page or None at the end)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        positions, done = self._decode_feed_cursor(cursor)
+
+        try:
+            years = await self._run_shared(("catalog_years",), self._catalog_years)
+            partitions = [
+                _FeedPartition(year, positions.get(year))
+                for year in years
+                if year not in done
+            ]
+            if not partitions:
+                return [], None
+
+            first_read = -(-limit // len(partitions))
+            await fan_out(
+                partial(self._fetch_feed_partition, partition, first_read)
+                for partition in partitions
+            )
+
+            heap = [(p.rank(), i) for i, p in enumerate(partitions) if p.buffer]
+            heapq.heapify(heap)
+
+            videos: list[Video] = []
+            while heap and len(videos) < limit:
+                _, index = heapq.heappop(heap)
+                partition = partitions[index]
+                videos.append(self._convert_dynamodb_item_to_video(partition.pop()))
+
+                # The next item of a drained partition may still be the newest
+                if not partition.buffer and partition.has_more and len(videos) < limit:
+                    await self._fetch_feed_partition(partition, limit - len(videos))
+                if partition.buffer:
+                    heapq.heappush(heap, (partition.rank(), index))
+
+        except ClientError as e:
+            raise RuntimeError(f"Failed to get latest videos: {e}") from e
+
+        done |= {p.year for p in partitions if p.exhausted}
+        if all(p.exhausted for p in partitions):
+            return videos, None
+
+        return videos, self._encode_feed_cursor(
+            {p.year: p.start_key for p in partitions if not p.exhausted}, done
+        )
+
+    async def _fetch_feed_partition(
+        self, partition: _FeedPartition, limit: int
+    ) -> None:
+        """Read the next items of a feed partition into its buffer.
+
+        Args:
+            partition: Partition to read
+            limit: Maximum number of items to read
+        """
+        query_kwargs: dict[str, Any] = {
+            "IndexName": "ByYearDate",
+            "KeyConditionExpression": Key("year").eq(partition.year),
+            "ScanIndexForward": False,  # Newest first
+            "Limit": limit,
+        }
+        if partition.fetch_key:
+            query_kwargs["ExclusiveStartKey"] = partition.fetch_key
+
+        response = await self._run(partial(self.table.query, **query_kwargs))
+        partition.buffer.extend(response.get("Items", []))
+        partition.fetch_key = response.get("LastEvaluatedKey")
+        partition.has_more = partition.fetch_key is not None
+
+    def _catalog_years(self) -> list[int]:
+        """List the years that have videos, newest first.
+
+        Returns:
+            Years recorded in the catalog summary, or found by a scan when the
+            summary is missing
+        """
+        response = self.table.get_item(Key={"PK": CATALOG_KEY, "SK": CATALOG_KEY})
+        summary = response.get("Item")
+        if summary and "years" in summary:
+            return [int(year) for year in cast("list[Decimal]", summary["years"])]
+
+        years = {int(item["year"]) for item in self._scan_items(["year"])}
+        return sorted(years, reverse=True)
+
+    def _encode_feed_cursor(
+        self, positions: dict[int, dict[str, Any] | None], done: set[int]
+    ) -> str:
+        """Encode feed partition positions as an opaque URL-safe cursor.
+
+        Args:
+            positions: Key of the last item served per partition (None if no
+                item has been served yet)
+            done: Years whose partitions are exhausted
+
+        Returns:
+            Cursor string
+        """
+        payload = {
+            "v": FEED_CURSOR_VERSION,
+            "after": {str(year): key for year, key in positions.items() if key},
+            "done": sorted(done),
+        }
+        body = json.dumps(payload, cls=DecimalEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(body.encode()).decode().rstrip("=")
+
+    def _decode_feed_cursor(
+        self, cursor: str | None
+    ) -> tuple[dict[int, dict[str, Any]], set[int]]:
+        """Decode a cursor created by _encode_feed_cursor.
+
+        Args:
+            cursor: Cursor string (None for the first page)
+
+        Returns:
+            Tuple of (positions per year, exhausted years)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        if not cursor:
+            return {}, set()
+
+        try:
+            body = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(body)
+            if payload["v"] != FEED_CURSOR_VERSION:
+                raise ValueError("unsupported version")
+            positions = {int(year): key for year, key in payload["after"].items()}
+            done = {int(year) for year in payload["done"]}
+        except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid last_key: {cursor}") from e
+        if not all(self._is_year_key(key, year) for year, key in positions.items()):
+            raise ValueError(f"Invalid last_key: {cursor}")
+
+        return positions, done
+
+    @staticmethod
+    def _is_year_key(key: Any, year: int) -> bool:
+        """Check a cursor position is a ByYearDate key within a year.
+
+        Args:
+            key: Decoded position (a LastEvaluatedKey of the ByYearDate index)
+            year: Year partition the position must belong to
+
+        Returns:
+            Whether the position can be sent as ExclusiveStartKey
+        """
+        return (
+            isinstance(key, dict)
+            and set(key) == {"PK", "SK", "year", "created_at"}
+            and all(isinstance(key[name], str) for name in ("PK", "SK", "created_at"))
+            and type(key["year"]) is int
+            and key["year"] == year
+        )
+
+    def _decode_year_cursor(
+        self, last_key: str | None, year: int
+    ) -> dict[str, Any] | None:
+        """Decode a last_key returned by get_videos_by_year.
+
+        Args:
+            last_key: Last key for pagination (None for the first page)
+            year: Year being listed
+
+        Returns:
+            Exclusive start key, or None for the first page
+
+        Raises:
+            ValueError: If last_key is malformed or belongs to another year
+        """
+        if not last_key:
+            return None
+
+        try:
+            start_key = json.loads(last_key)
+        except ValueError as e:
+            raise ValueError(f"Invalid last_key: {last_key}") from e
+        if not self._is_year_key(start_key, year):
+            raise ValueError(f"Invalid last_key: {last_key}")
+        return cast("dict[str, Any]", start_key)
+
     async def get_video_by_id(self, video_id: str) -> Video | None:
         """Get a single video by ID.
 
@@ -120,11 +763,15 @@ class DynamoDBService:
             Video object or None if not found
         """
         try:
-            # Since we don't know the year, we need to scan for the video
-            # This is not optimal but necessary given the current schema
-            response = self.table.scan(
-                FilterExpression="video_id = :video_id",
-                ExpressionAttributeValues={":video_id": video_id},
+            # The primary key is partitioned by year, so look the video up
+            # through the ByVideoId index instead of scanning the table
+            response = await self._run(
+                partial(
+                    self.table.query,
+                    IndexName="ByVideoId",
+                    KeyConditionExpression=Key("video_id").eq(video_id),
+                    Limit=1,
+                )
             )
 
             items = response.get("Items", [])
@@ -136,54 +783,383 @@ class DynamoDBService:
         except ClientError as e:
             raise RuntimeError(f"Failed to get video by ID: {e}") from e
 
-    async def get_videos_by_tag_path(self, tag_path: str) -> list[Video]:
-        """Get videos that match a specific tag path.
+    async def get_videos_by_ids(self, video_ids: Sequence[str]) -> list[Video]:
+        """Get several videos by ID in as few round trips as possible.
+
+        Args:
+            video_ids: Video IDs to retrieve (duplicates are ignored)
+
+        Returns:
+            Videos in the requested order; unknown IDs are left out
+        """
+        requested = list(dict.fromkeys(video_ids))
+
+        catalog = await self._catalog()
+        if catalog is not None:
+            by_id = cast("dict[str, Video]", catalog.videos_by_id)
+            return [by_id[video_id] for video_id in requested if video_id in by_id]
+
+        chunks = [
+            requested[start : start + BATCH_GET_MAX_KEYS]
+            for start in range(0, len(requested), BATCH_GET_MAX_KEYS)
+        ]
+        try:
+            results = await fan_out(
+                partial(self._run, partial(self._batch_get_videos, chunk))
+                for chunk in chunks
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Failed to get videos by IDs: {e}") from e
+
+        found = {video.video_id: video for videos in results for video in videos}
+        return [found[video_id] for video_id in requested if video_id in found]
+
+    def _batch_get_videos(self, video_ids: Sequence[str]) -> list[Video]:
+        """Read up to BATCH_GET_MAX_KEYS lookup items with BatchGetItem.
+
+        Keys DynamoDB leaves unprocessed (under throttling or the 16 MB
+        response limit) are retried with exponential backoff and jitter.
+
+        Args:
+            video_ids: Video IDs to retrieve
+
+        Returns:
+            Videos found, in no particular order
+
+        Raises:
+            RuntimeError: If keys are still unprocessed after the last attempt
+        """
+        keys = [f"{VIDEO_LOOKUP_PREFIX}{video_id}" for video_id in video_ids]
+        request: dict[str, Any] = {
+            self.table_name: {
+                "Keys": [{"PK": key, "SK": key} for key in keys],
+                "ProjectionExpression": "video",
+            }
+        }
+
+        videos: list[Video] = []
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            if attempt:
+                backoff = BATCH_GET_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                time.sleep(random.uniform(0, backoff))
+
+            response = self.dynamodb.batch_get_item(RequestItems=request)
+            with span("convert"):
+                videos.extend(
+                    self._convert_dynamodb_item_to_video(
+                        cast("dict[str, Any]", item["video"])
+                    )
+                    for item in response.get("Responses", {}).get(self.table_name, [])
+                )
+
+            request = cast("dict[str, Any]", response.get("UnprocessedKeys") or {})
+            if not request:
+                return videos
+
+        raise RuntimeError(
+            f"Failed to get videos by IDs: keys still unprocessed after "
+            f"{BATCH_GET_MAX_ATTEMPTS} attempts"
+        )
+
+    async def get_videos_by_tag_path(
+        self, tag_path: str, limit: int = 50, last_key: str | None = None
+    ) -> tuple[list[Video], str | None]:
+        """Get a page of videos that match a specific tag path, newest first.
 
         Args:
             tag_path: Tag path like "ゲーム実況/ホラー/Cry of Fear"
+            limit: Maximum number of videos to return
+            last_key: Last key for pagination
 
         Returns:
-            List of matching videos
+            Tuple of (videos list, next last_key)
+
+        Raises:
+            ValueError: If last_key is malformed
         """
+        # Split the tag path into individual tags
+        tags = [tag.strip() for tag in tag_path.split("/") if tag.strip()]
+        path = "/".join(tags)
+        start_key = self._decode_tag_cursor(last_key, path)
+
         try:
-            # Split the tag path into individual tags
-            tags = [tag.strip() for tag in tag_path.split("/") if tag.strip()]
+            catalog = await self._catalog()
+            if catalog is not None:
+                # Slice the snapshot's sorted list without copying it
+                videos = cast(
+                    "list[Video]",
+                    catalog.videos_by_tag_path.get(path, [])
+                    if tags
+                    else catalog.videos_newest_first,
+                )
+                return self._tag_page(path, videos, limit, start_key)
+
+            if not tags:
+                # An empty path matches every video
+                items = await self._scan_all(VIDEO_ATTRIBUTES)
+                with span("convert"):
+                    videos = [
+                        self._convert_dynamodb_item_to_video(item) for item in items
+                    ]
+                videos.sort(key=self._tag_sort_key, reverse=True)
+                return self._tag_page(path, videos, limit, start_key)
+
+            # The importer writes one index item per tag path of a video, with
+            # the publish date as the ByTagDate sort key
+            query_kwargs: dict[str, Any] = {
+                "IndexName": "ByTagDate",
+                "KeyConditionExpression": Key("Tag").eq(path),
+                "ProjectionExpression": "video",
+                "Limit": limit,
+                "ScanIndexForward": False,  # Sort by created_at in descending order
+            }
+            if start_key:
+                query_kwargs["ExclusiveStartKey"] = start_key
 
-            # Scan all items and filter by tag path
-            response = self.table.scan()
-            videos = []
+            response = await self._run(partial(self.table.query, **query_kwargs))
 
-            for item in response.get("Items", []):
-                item_tags = cast("list[str]", item.get("tags", []))
+            with span("convert"):
+                videos = [
+                    self._convert_dynamodb_item_to_video(
+                        cast("dict[str, Any]", item["video"])
+                    )
+                    for item in response.get("Items", [])
+                ]
 
-                # Check if all tags in the path exist in the item's tags
-                if self._tags_match_path(item_tags, tags):
-                    videos.append(self._convert_dynamodb_item_to_video(item))
+            next_last_key = None
+            if "LastEvaluatedKey" in response:
+                next_last_key = json.dumps(
+                    response["LastEvaluatedKey"], cls=DecimalEncoder
+                )
 
-            return videos
+            return videos, next_last_key
 
         except ClientError as e:
             raise RuntimeError(f"Failed to get videos by tag path: {e}") from e
 
-    def _tags_match_path(self, item_tags: list[str], path_tags: list[str]) -> bool:
-        """Check if item tags match the given path.
+    @staticmethod
+    def _tag_sort_key(video: Video) -> tuple[str, str]:
+        """Order videos within a tag path like the ByTagDate index.
+
+        Args:
+            video: Video to order
+
+        Returns:
+            Tuple of (created_at, index item SK)
+        """
+        return video.created_at or "", f"{VIDEO_LOOKUP_PREFIX}{video.video_id}"
+
+    @staticmethod
+    def _decode_tag_cursor(last_key: str | None, path: str) -> dict[str, Any] | None:
+        """Decode a last_key returned by get_videos_by_tag_path.
+
+        Args:
+            last_key: Last key for pagination (None for the first page)
+            path: Normalized tag path being listed
+
+        Returns:
+            Exclusive start key, or None for the first page
+
+        Raises:
+            ValueError: If last_key is malformed or belongs to another tag path
+        """
+        if not last_key:
+            return None
+
+        try:
+            start_key = json.loads(last_key)
+        except ValueError as e:
+            raise ValueError(f"Invalid last_key: {last_key}") from e
+        # A ByTagDate key of this path's index items, as the importer writes
+        # them and as _tag_page builds them
+        if (
+            not isinstance(start_key, dict)
+            or set(start_key) != {"PK", "SK", "Tag", "created_at"}
+            or not all(isinstance(value, str) for value in start_key.values())
+            or start_key["PK"] != f"{TAG_PATH_PREFIX}{path}"
+            or start_key["Tag"] != path
+            or not start_key["SK"].startswith(VIDEO_LOOKUP_PREFIX)
+        ):
+            raise ValueError(f"Invalid last_key: {last_key}")
+        return start_key
+
+    def _tag_page(
+        self,
+        path: str,
+        videos: list[Video],
+        limit: int,
+        start_key: dict[str, Any] | None,
+    ) -> tuple[list[Video], str | None]:
+        """Slice one page out of videos already in memory.
+
+        The returned last_key has the shape of a ByTagDate LastEvaluatedKey,
+        so a cursor stays valid whether the next page is served from the
+        catalog cache or from DynamoDB.
+
+        Args:
+            path: Normalized tag path
+            videos: Matching videos, newest first
+            limit: Maximum number of videos to return
+            start_key: Decoded last_key of the previous page
+
+        Returns:
+            Tuple of (videos list, next last_key)
+        """
+        start = 0
+        if start_key:
+            after = (start_key["created_at"], start_key["SK"])
+            start = bisect.bisect_left(
+                videos, True, key=lambda video: self._tag_sort_key(video) < after
+            )
+
+        page = videos[start : start + limit]
+        next_last_key = None
+        if page and start + limit < len(videos):
+            created_at, sort_key = self._tag_sort_key(page[-1])
+            next_last_key = json.dumps(
+                {
+                    "PK": f"{TAG_PATH_PREFIX}{path}",
+                    "SK": sort_key,
+                    "Tag": path,
+                    "created_at": created_at,
+                }
+            )
+
+        return page, next_last_key
+
+    async def count_videos_by_tag_path(self, tag_path: str) -> int | None:
+        """Count the videos that match a tag path without reading them.
+
+        Args:
+            tag_path: Tag path like "ゲーム実況/ホラー/Cry of Fear"
+
+        Returns:
+            Number of matching videos, or None when neither the catalog cache
+            nor a count written by the import script is available
+        """
+        tags = [tag.strip() for tag in tag_path.split("/") if tag.strip()]
+        path = "/".join(tags)
+
+        try:
+            catalog = await self._catalog()
+            if catalog is not None:
+                if not tags:
+                    return len(catalog.videos)
+                return len(catalog.videos_by_tag_path.get(path, []))
+
+            if tags:
+                key = {"PK": f"{TAG_PATH_PREFIX}{path}", "SK": TAG_COUNT_KEY}
+            else:
+                key = {"PK": CATALOG_KEY, "SK": CATALOG_KEY}
+            response = await self._run(partial(self.table.get_item, Key=key))
+            item = response.get("Item")
+            if not item or "video_count" not in item:
+                return None
+            return int(cast("Decimal", item["video_count"]))
+
+        except ClientError as e:
+            raise RuntimeError(f"Failed to count videos by tag path: {e}") from e
+
+    async def search_videos(
+        self, query: str, limit: int = 50, last_key: str | None = None
+    ) -> tuple[list[Video], str | None, int]:
+        """Search video titles, best match first.
+
+        Titles are matched through a bigram index built from the whole
+        catalog (see search_index), which is kept with the cached catalog
+        snapshot, or on its own for as long as the catalog version stays
+        the same, and reused by later searches in a warm container.
 
         Args:
-            item_tags: Tags from the video item
-            path_tags: Tags from the search path
+            query: Space-separated search terms, all of which must match
+            limit: Maximum number of videos to return
+            last_key: Last key returned with the previous page
 
         Returns:
-            True if all path tags are found in item tags in order
+            Tuple of (videos list, next last_key, number of matches)
+
+        Raises:
+            ValueError: If last_key is malformed
         """
-        if not path_tags:
-            return True
+        offset = self._decode_search_cursor(last_key)
+
+        version = await self.get_catalog_version()
+        try:
+            index = await self._run_shared(
+                ("title_index", version), partial(self._title_index, version)
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Failed to search videos: {e}") from e
+
+        with span("search"):
+            matches = index.search(query)
+
+        page = cast("list[Video]", matches[offset : offset + limit])
+        next_last_key = None
+        if offset + limit < len(matches):
+            next_last_key = json.dumps({"offset": offset + limit})
+        return page, next_last_key, len(matches)
+
+    def _title_index(self, version: str | None) -> TitleIndex:
+        """Get the title index of the catalog, building it when needed.
+
+        The index is kept with the cached snapshot, and also on its own
+        with the catalog version it was built for, so that catalogs too
+        large for the catalog cache (or any catalog when the cache is
+        disabled) are not scanned again until the version changes.
+
+        Args:
+            version: Current catalog version (None if the import wrote none,
+                in which case the index is not kept)
+
+        Returns:
+            Index over every video, newest first on ties
+        """
+        with span("index"):
+            catalog = self.cache.get() if self.cache is not None else None
+            if catalog is not None:
+                return cast("TitleIndex", catalog.title_index)
+
+            kept = self._search_index
+            if kept is not None and version is not None and kept[0] == version:
+                return kept[1]
+
+            catalog = self._get_catalog()
+            if catalog is not None:
+                index = cast("TitleIndex", catalog.title_index)
+            else:
+                videos = [
+                    self._convert_dynamodb_item_to_video(item)
+                    for item in self._scan_items(VIDEO_ATTRIBUTES)
+                ]
+                videos.sort(key=self._tag_sort_key, reverse=True)
+                index = TitleIndex(videos)
+            self._search_index = (version, index) if version is not None else None
+            return index
+
+    @staticmethod
+    def _decode_search_cursor(last_key: str | None) -> int:
+        """Decode a last_key returned by search_videos.
+
+        Args:
+            last_key: Last key for pagination (None for the first page)
+
+        Returns:
+            Number of matches already returned
 
-        # Find the starting position of the path in item tags
-        for i in range(len(item_tags) - len(path_tags) + 1):
-            if item_tags[i : i + len(path_tags)] == path_tags:
-                return True
+        Raises:
+            ValueError: If last_key is malformed
+        """
+        if not last_key:
+            return 0
 
-        return False
+        try:
+            offset = json.loads(last_key)["offset"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid last_key: {last_key}") from e
+        if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+            raise ValueError(f"Invalid last_key: {last_key}")
+        return offset
 
     async def get_random_videos(self, count: int = 1) -> list[Video]:
         """Get random videos.
@@ -195,9 +1171,17 @@ class DynamoDBService:
             List of random videos
         """
         try:
+            catalog = await self._catalog()
+            if catalog is not None:
+                videos = cast("list[Video]", catalog.videos)
+                return random.sample(videos, min(count, len(videos)))
+
+            sampled = await self._sample_videos(count)
+            if sampled is not None:
+                return sampled
+
             # Scan all items (not efficient for large datasets, but works for MVP)
-            response = self.table.scan()
-            items = response.get("Items", [])
+            items = await self._scan_all(VIDEO_ATTRIBUTES)
 
             if not items:
                 return []
@@ -206,11 +1190,96 @@ class DynamoDBService:
             sample_size = min(count, len(items))
             random_items = random.sample(items, sample_size)
 
-            return [self._convert_dynamodb_item_to_video(item) for item in random_items]
+            with span("convert"):
+                return [
+                    self._convert_dynamodb_item_to_video(item) for item in random_items
+                ]
 
         except ClientError as e:
             raise RuntimeError(f"Failed to get random videos: {e}") from e
 
+    async def _sample_videos(
+        self, count: int, accept: Callable[[Video], bool] | None = None
+    ) -> list[Video] | None:
+        """Sample videos uniformly through the ordinals assigned at import.
+
+        The importer gives every video an ordinal below the summary's
+        ordinal_limit and keeps it across imports, so a uniform sample of
+        ordinals is a uniform sample of videos and costs one GetItem plus
+        one ByOrdinal query per video. The queries for a sample are issued
+        concurrently. Ordinals without an item (left by deleted videos or
+        failed writes) and videos rejected by accept are replaced by further
+        draws, until enough videos are found, every ordinal was tried, or
+        SAMPLE_DRAWS_PER_VIDEO draws per requested video were made.
+
+        Args:
+            count: Number of videos to sample
+            accept: Predicate sampled videos must satisfy (all if omitted)
+
+        Returns:
+            Sampled videos, or None when the catalog summary is missing
+        """
+        response = await self._run_shared(
+            ("get_item", CATALOG_KEY),
+            partial(self.table.get_item, Key={"PK": CATALOG_KEY, "SK": CATALOG_KEY}),
+        )
+        summary = response.get("Item")
+        if not summary:
+            return None
+
+        # Summaries written before the ordinal counter have no gaps
+        limit = int(
+            cast("Decimal", summary.get("ordinal_limit", summary["video_count"]))
+        )
+        budget = min(limit, count * SAMPLE_DRAWS_PER_VIDEO)
+        drawn: set[int] = set()
+
+        videos: list[Video] = []
+        while len(videos) < count and len(drawn) < budget:
+            wave_size = min(count - len(videos), budget - len(drawn))
+            wave = self._draw_ordinals(limit, wave_size, drawn)
+
+            responses = await fan_out(
+                partial(
+                    self._run,
+                    partial(
+                        self.table.query,
+                        IndexName="ByOrdinal",
+                        KeyConditionExpression=Key("ordinal").eq(ordinal),
+                        Limit=1,
+                    ),
+                )
+                for ordinal in wave
+            )
+            for wave_response in responses:
+                items = wave_response.get("Items", [])
+                if items:
+                    video = self._convert_dynamodb_item_to_video(items[0])
+                    if accept is None or accept(video):
+                        videos.append(video)
+
+        return videos
+
+    @staticmethod
+    def _draw_ordinals(limit: int, count: int, drawn: set[int]) -> list[int]:
+        """Draw ordinals below limit that were not drawn before.
+
+        Args:
+            limit: Upper bound (exclusive) of the ordinals
+            count: Number of ordinals to draw (at most limit - len(drawn))
+            drawn: Ordinals drawn so far, updated with the new ones
+
+        Returns:
+            Newly drawn ordinals
+        """
+        wave: list[int] = []
+        while len(wave) < count:
+            ordinal = random.randrange(limit)
+            if ordinal not in drawn:
+                drawn.add(ordinal)
+                wave.append(ordinal)
+        return wave
+
     async def get_memory_thumbnails(self, pairs: int = 8) -> list[str]:
         """Get thumbnail URLs for memory game.
 
@@ -221,10 +1290,26 @@ class DynamoDBService:
             List of thumbnail URLs (duplicated for pairs)
         """
         try:
+            catalog = await self._catalog()
+            if catalog is not None:
+                pool = cast("list[str]", catalog.thumbnail_pool)
+                cards = random.sample(pool, min(pairs, len(pool))) * 2
+                random.shuffle(cards)
+                return cards
+
+            sampled = await self._sample_videos(
+                pairs, accept=lambda video: bool(video.thumbnail_url)
+            )
+            if sampled is not None:
+                cards = [cast("str", v.thumbnail_url) for v in sampled] * 2
+                random.shuffle(cards)
+                return cards
+
             # Get random videos with thumbnails
-            response = self.table.scan()
             items = [
-                item for item in response.get("Items", []) if item.get("thumbnail_url")
+                item
+                for item in await self._scan_all(["thumbnail_url"])
+                if item.get("thumbnail_url")
             ]
 
             if not items:
@@ -250,68 +1335,125 @@ class DynamoDBService:
         except ClientError as e:
             raise RuntimeError(f"Failed to get memory thumbnails: {e}") from e
 
-    async def build_tag_tree(self) -> list[TagNode]:
-        """Build hierarchical tag tree from all videos.
+    async def get_catalog_version(self) -> str | None:
+        """Get the catalog version written by the last import.
+
+        The version is reused for version_ttl_seconds, so conditional
+        requests are usually answered without calling DynamoDB. When a new
+        version is seen, the catalog cache is dropped so that it reloads.
 
         Returns:
-            List of root tag nodes
+            Catalog version, or None when the catalog summary has none
         """
+        now = time.monotonic()
+        if (
+            self._version_read_at is not None
+            and now - self._version_read_at < self.version_ttl_seconds
+        ):
+            return self._catalog_version
+
         try:
-            # Scan all items to collect tags
-            response = self.table.scan()
-            items = response.get("Items", [])
+            response = await self._run_shared(
+                ("get_item", CATALOG_KEY, "catalog_version"),
+                partial(
+                    self.table.get_item,
+                    Key={"PK": CATALOG_KEY, "SK": CATALOG_KEY},
+                    ProjectionExpression="catalog_version",
+                ),
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Failed to get catalog version: {e}") from e
 
-            # Build tag hierarchy
-            tag_tree: dict[str, Any] = {}
+        item = response.get("Item") or {}
+        version = str(item["catalog_version"]) if item.get("catalog_version") else None
 
-            for item in items:
-                tags = cast("list[str]", item.get("tags", []))
-                self._add_tags_to_tree(tag_tree, tags)
+        changed = self._version_read_at is not None and version != self._catalog_version
+        if changed and self.cache is not None:
+            self.cache.invalidate()
+        self._catalog_version = version
+        self._version_read_at = now
+        return version
 
-            # Convert to TagNode objects
-            return self._dict_to_tag_nodes(tag_tree)
+    async def _get_tag_tree_item(self) -> dict[str, Any] | None:
+        """Read the tag tree item materialized by the import script.
 
+        Returns:
+            The item, or None when it is missing or was written in an
+            unsupported format
+        """
+        try:
+            response = await self._run_shared(
+                ("get_item", TAG_TREE_KEY),
+                partial(
+                    self.table.get_item, Key={"PK": TAG_TREE_KEY, "SK": TAG_TREE_KEY}
+                ),
+            )
         except ClientError as e:
-            raise RuntimeError(f"Failed to build tag tree: {e}") from e
+            raise RuntimeError(f"Failed to get tag tree: {e}") from e
 
-    def _add_tags_to_tree(self, tree: dict[str, Any], tags: list[str]) -> None:
-        """Add a tag path to the tree structure.
+        item = cast("dict[str, Any] | None", response.get("Item"))
+        if not item or item.get("format_version") != TAG_TREE_FORMAT_VERSION:
+            return None
+        return item
 
-        Args:
-            tree: Current tree dictionary
-            tags: List of tags representing a path
+    async def get_tag_tree_json(self) -> bytes | None:
+        """Get the tag tree materialized by the import script.
+
+        Returns:
+            Ready-to-serve TagsResponse JSON body, or None when the item is
+            missing or was written in an unsupported format
         """
-        current = tree
+        item = await self._get_tag_tree_item()
+        if item is None:
+            return None
 
-        for tag in tags:
-            if tag not in current:
-                current[tag] = {"children": {}, "count": 0}
-            current[tag]["count"] += 1
-            current = current[tag]["children"]
+        # Binary attributes come back as boto3 Binary wrappers
+        body = bytes(cast("SupportsBytes", item["tree"]))
+        if item.get("content_encoding") == "gzip":
+            with span("decompress"):
+                body = gzip.decompress(body)
+        return body
 
-    def _dict_to_tag_nodes(self, tree: dict[str, Any]) -> list[TagNode]:
-        """Convert tree dictionary to TagNode objects.
+    async def get_tag_tree_gzip(self) -> bytes | None:
+        """Get the materialized tag tree as the gzip stream it is stored as.
 
-        Args:
-            tree: Tree dictionary structure
+        Clients accepting gzip are sent these bytes as they are, without
+        decompressing and compressing the tree again.
 
         Returns:
-            List of TagNode objects
+            gzip-compressed TagsResponse JSON body, or None when the item is
+            missing, unsupported or stored uncompressed
         """
-        nodes = []
+        item = await self._get_tag_tree_item()
+        if item is None or item.get("content_encoding") != "gzip":
+            return None
+        return bytes(cast("SupportsBytes", item["tree"]))
 
-        for tag_name, tag_data in tree.items():
-            children_dict = tag_data["children"]
-            children = None
+    async def build_tag_tree(self) -> list[TagNode]:
+        """Build hierarchical tag tree from all videos.
 
-            if children_dict:
-                children = self._dict_to_tag_nodes(children_dict)
+        This is the fallback used when the materialized tag tree is missing.
 
-            node = TagNode(
-                name=tag_name,
-                children=children,
-                count=tag_data["count"],
-            )
-            nodes.append(node)
+        Returns:
+            List of root tag nodes
+        """
+        try:
+            catalog = await self._run_shared(("catalog",), self._get_catalog)
+            if catalog is not None:
+                return cast("list[TagNode]", catalog.tag_tree)
+
+            items = await self._scan_all(["tags"])
+
+            with span("tree"):
+                # Build tag hierarchy from the tags of every item
+                tag_tree: dict[str, Any] = {}
 
-        return sorted(nodes, key=lambda x: x.name)
+                for item in items:
+                    tags = cast("list[str]", item.get("tags", []))
+                    add_tags_to_tree(tag_tree, tags)
+
+                # Convert to TagNode objects
+                return cast("list[TagNode]", tag_tree_nodes(tag_tree))
+
+        except ClientError as e:
+            raise RuntimeError(f"Failed to build tag tree: {e}") from e
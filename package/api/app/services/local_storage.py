@@ -0,0 +1,961 @@
+"""Local stand-in for the DynamoDB table, stored in SQLite.
+
+LocalTable answers the boto3 Table calls DynamoDBService makes (queries on
+the table and its global secondary indexes, segmented and paginated scans,
+GetItem) and LocalDynamoDB the resource-level BatchGetItem, with the same
+request and response shapes, so the service runs unchanged against it.
+Items are stored in DynamoDB JSON and keep their DynamoDB types: numbers
+come back as Decimal and binary values as Binary.
+
+Every key attribute of the table and its indexes is a SQLite column with an
+index, so key conditions are answered by index range reads. Like DynamoDB,
+a page ends at Limit items or after 1 MB, indexes are sparse, and responses
+carry Count, ScannedCount and the read capacity the call would consume, so
+the per-request metrics of a local run are those the same requests would
+have against DynamoDB.
+
+seed_videos writes a catalog in the layout of the import script (see
+import_json_to_dynamodb.py and catalog_layout), and load_metadata_dir reads
+it from a metadata/ directory.
+"""
+
+import base64
+import gzip
+import json
+import math
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from decimal import Decimal
+from pathlib import Path
+from types import TracebackType
+from typing import Any, SupportsBytes, cast
+
+from boto3.dynamodb.conditions import ConditionBase
+from boto3.dynamodb.types import Binary
+from botocore.exceptions import ClientError
+from services.catalog_layout import (  # type: ignore
+    add_tags_to_tree,
+    catalog_version,
+    tag_sub_paths,
+    tag_tree_nodes,
+    video_fingerprint,
+)
+from services.dynamodb_service import (  # type: ignore
+    CATALOG_KEY,
+    TAG_COUNT_KEY,
+    TAG_PATH_PREFIX,
+    TAG_TREE_FORMAT_VERSION,
+    TAG_TREE_KEY,
+    VIDEO_LOOKUP_PREFIX,
+)
+from services.request_metrics import record_response  # type: ignore
+from services.serialization import dumps  # type: ignore
+from services.timing import span  # type: ignore
+
+# Key attributes of the table (None) and of its global secondary indexes,
+# as defined in package/infra/src/construct/resource/table.py
+KEY_SCHEMAS: dict[str | None, tuple[str, str | None]] = {
+    None: ("PK", "SK"),
+    "ByTag": ("Tag", "SK"),
+    "GSI1": ("year", "SK"),
+    "ByVideoId": ("video_id", None),
+    "ByOrdinal": ("ordinal", None),
+    "ByYearDate": ("year", "created_at"),
+    "ByTagDate": ("Tag", "created_at"),
+}
+
+# SQLite column of each key attribute, and the key attributes of type Number
+_COLUMNS = {
+    "PK": "pk",
+    "SK": "sk",
+    "Tag": "tag",
+    "year": "year",
+    "created_at": "created_at",
+    "video_id": "video_id",
+    "ordinal": "ordinal",
+}
+_ATTRIBUTES = {column: name for name, column in _COLUMNS.items()}
+_NUMBER_KEYS = {"year", "ordinal"}
+
+# DynamoDB's limits and read capacity accounting (eventually consistent reads)
+PAGE_BYTES = 1024 * 1024
+READ_UNIT_BYTES = 4 * 1024
+BATCH_GET_MAX_KEYS = 100
+
+# Items seed_videos buffers before writing them in one transaction
+SEED_BATCH_ITEMS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "{table}" (
+    pk TEXT NOT NULL,
+    sk TEXT NOT NULL,
+    tag TEXT,
+    year NUMERIC,
+    created_at TEXT,
+    video_id TEXT,
+    ordinal NUMERIC,
+    segment_hash INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    item BLOB NOT NULL,
+    PRIMARY KEY (pk, sk)
+);
+CREATE INDEX IF NOT EXISTS "{table}.ByTag" ON "{table}" (tag, sk, pk)
+    WHERE tag IS NOT NULL AND sk IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "{table}.GSI1" ON "{table}" (year, sk, pk)
+    WHERE year IS NOT NULL AND sk IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "{table}.ByVideoId" ON "{table}" (video_id, pk, sk)
+    WHERE video_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "{table}.ByOrdinal" ON "{table}" (ordinal, pk, sk)
+    WHERE ordinal IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "{table}.ByYearDate" ON "{table}" (year, created_at, pk, sk)
+    WHERE year IS NOT NULL AND created_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS "{table}.ByTagDate" ON "{table}" (tag, created_at, pk, sk)
+    WHERE tag IS NOT NULL AND created_at IS NOT NULL;
+"""
+
+
+def _validation_error(operation: str, message: str) -> ClientError:
+    """Build the error DynamoDB returns for an invalid request."""
+    return ClientError(
+        {"Error": {"Code": "ValidationException", "Message": message}}, operation
+    )
+
+
+def _to_dynamodb(value: Any) -> Any:
+    """Convert a Python value to the types boto3 reads back from DynamoDB."""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, bytes | bytearray):
+        return Binary(bytes(value))
+    if isinstance(value, dict):
+        return {key: _to_dynamodb(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_to_dynamodb(item) for item in value]
+    if isinstance(value, set | frozenset):
+        return {_to_dynamodb(item) for item in value}
+    return value
+
+
+def _to_typed(value: Any) -> dict[str, Any]:
+    """Write an attribute value in DynamoDB JSON, as in the low-level API.
+
+    Numbers are kept as their decimal strings and binary values as base64,
+    so every value reads back with the type and precision it was stored with.
+    """
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, Decimal):
+        return {"N": str(value)}
+    if isinstance(value, Binary):
+        return {"B": base64.b64encode(bytes(cast("SupportsBytes", value))).decode()}
+    if isinstance(value, dict):
+        return {"M": {key: _to_typed(item) for key, item in value.items()}}
+    if isinstance(value, list):
+        return {"L": [_to_typed(item) for item in value]}
+    if isinstance(value, set | frozenset):
+        members = [_to_typed(item) for item in value]
+        kind = next(iter(members[0])) if members else "S"
+        return {f"{kind}S": [member[kind] for member in members]}
+    raise TypeError(f"Unsupported DynamoDB value: {type(value).__name__}")
+
+
+def _from_typed(value: dict[str, Any]) -> Any:
+    """Read an attribute value written by _to_typed."""
+    ((kind, data),) = value.items()
+    if kind == "S" or kind == "BOOL":
+        return data
+    if kind == "N":
+        return Decimal(data)
+    if kind == "M":
+        return {key: _from_typed(item) for key, item in data.items()}
+    if kind == "L":
+        return [_from_typed(item) for item in data]
+    if kind == "B":
+        return Binary(base64.b64decode(data))
+    if kind == "SS":
+        return set(data)
+    if kind == "NS":
+        return {Decimal(item) for item in data}
+    if kind == "BS":
+        return {Binary(base64.b64decode(item)) for item in data}
+    return None
+
+
+def _encode_item(item: dict[str, Any]) -> bytes:
+    """Serialize an item for the item column."""
+    return cast(
+        "bytes", dumps({name: _to_typed(value) for name, value in item.items()})
+    )
+
+
+def _decode_item(blob: bytes) -> dict[str, Any]:
+    """Deserialize an item written by _encode_item."""
+    typed = cast("dict[str, dict[str, Any]]", json.loads(blob))
+    return {name: _from_typed(value) for name, value in typed.items()}
+
+
+def _value_size(value: Any) -> int:
+    """Approximate the stored size of an attribute value as DynamoDB does."""
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, Decimal):
+        return len(value.as_tuple().digits) // 2 + 2
+    if isinstance(value, Binary):
+        return len(bytes(cast("SupportsBytes", value)))
+    if isinstance(value, dict):
+        return 3 + sum(
+            len(key.encode()) + _value_size(item) + 1 for key, item in value.items()
+        )
+    if isinstance(value, list | set | frozenset):
+        return 3 + sum(_value_size(item) + 1 for item in value)
+    return 1
+
+
+def _item_size(item: dict[str, Any]) -> int:
+    """Approximate the stored size of an item in bytes."""
+    return sum(len(name.encode()) + _value_size(value) for name, value in item.items())
+
+
+def _read_units(size: int) -> float:
+    """Read capacity units of an eventually consistent read of size bytes."""
+    return max(1, math.ceil(size / READ_UNIT_BYTES)) * 0.5
+
+
+def _sql_value(value: Any) -> Any:
+    """Convert a DynamoDB value to a value SQLite can bind."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, Binary):
+        return bytes(cast("SupportsBytes", value))
+    return value
+
+
+def _prefix_end(prefix: str) -> str:
+    """Get the smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _compile(condition: ConditionBase) -> tuple[str, list[Any]] | None:
+    """Translate a condition on key attributes to a SQL expression.
+
+    Args:
+        condition: boto3 Key or Attr condition
+
+    Returns:
+        SQL expression and its parameters, or None when the condition uses
+        attributes or operators that have no column to compare
+    """
+    expression = condition.get_expression()
+    operator = expression["operator"]
+    values = expression["values"]
+
+    if operator in ("AND", "OR"):
+        left, right = _compile(values[0]), _compile(values[1])
+        if left is None or right is None:
+            return None
+        return f"({left[0]} {operator} {right[0]})", left[1] + right[1]
+    if operator == "NOT":
+        inner = _compile(values[0])
+        return None if inner is None else (f"(NOT {inner[0]})", inner[1])
+
+    column = _COLUMNS.get(values[0].name)
+    if column is None:
+        return None
+    operands = [_sql_value(value) for value in values[1:]]
+
+    if operator in ("=", "<>", "<", "<=", ">", ">="):
+        return f"{column} {operator} ?", operands
+    if operator == "BETWEEN":
+        return f"{column} BETWEEN ? AND ?", operands
+    if operator == "begins_with" and isinstance(operands[0], str) and operands[0]:
+        return f"({column} >= ? AND {column} < ?)", [
+            operands[0],
+            _prefix_end(operands[0]),
+        ]
+    if operator == "IN":
+        members = [_sql_value(value) for value in operands[0]]
+        return f"{column} IN ({', '.join('?' * len(members))})", members
+    if operator == "attribute_exists":
+        return f"{column} IS NOT NULL", []
+    if operator == "attribute_not_exists":
+        return f"{column} IS NULL", []
+    return None
+
+
+def _matches(condition: ConditionBase, item: dict[str, Any]) -> bool:
+    """Evaluate a filter condition against an item.
+
+    Args:
+        condition: boto3 Attr condition
+        item: Item to test
+
+    Returns:
+        True if the item matches (comparisons across types never match)
+
+    Raises:
+        ClientError: If the condition uses an unsupported operator
+    """
+    expression = condition.get_expression()
+    operator = expression["operator"]
+    values = expression["values"]
+
+    if operator == "AND":
+        return all(_matches(value, item) for value in values)
+    if operator == "OR":
+        return any(_matches(value, item) for value in values)
+    if operator == "NOT":
+        return not _matches(values[0], item)
+
+    name = values[0].name
+    if operator == "attribute_exists":
+        return name in item
+    if operator == "attribute_not_exists":
+        return name not in item
+    if name not in item:
+        return False
+
+    value = item[name]
+    operands = [_to_dynamodb(operand) for operand in values[1:]]
+    try:
+        if operator == "=":
+            return bool(value == operands[0])
+        if operator == "<>":
+            return bool(value != operands[0])
+        if operator == "<":
+            return bool(value < operands[0])
+        if operator == "<=":
+            return bool(value <= operands[0])
+        if operator == ">":
+            return bool(value > operands[0])
+        if operator == ">=":
+            return bool(value >= operands[0])
+        if operator == "BETWEEN":
+            return bool(operands[0] <= value <= operands[1])
+        if operator == "begins_with":
+            return isinstance(value, str) and value.startswith(operands[0])
+        if operator == "contains":
+            return bool(operands[0] in value)
+        if operator == "IN":
+            return value in operands[0]
+    except TypeError:
+        return False
+    raise _validation_error("Scan", f"Unsupported condition operator: {operator}")
+
+
+def _projection(kwargs: dict[str, Any]) -> list[str] | None:
+    """Get the attribute names a request projects (None for all)."""
+    expression = kwargs.get("ProjectionExpression")
+    if not expression:
+        return None
+    names = kwargs.get("ExpressionAttributeNames") or {}
+    return [names.get(part.strip(), part.strip()) for part in expression.split(",")]
+
+
+def _project(item: dict[str, Any], attributes: list[str] | None) -> dict[str, Any]:
+    """Keep the projected top-level attributes of an item."""
+    if attributes is None:
+        return item
+    return {name: item[name] for name in attributes if name in item}
+
+
+class _BatchWriter:
+    """Buffer of puts written in one transaction, like boto3's batch_writer."""
+
+    def __init__(self, table: "LocalTable") -> None:
+        self._table = table
+        self._items: list[dict[str, Any]] = []
+
+    def put_item(self, Item: dict[str, Any]) -> None:
+        """Queue an item to write."""
+        self._items.append(Item)
+
+    def __enter__(self) -> "_BatchWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._table.put_items(self._items)
+        self._items = []
+
+
+class LocalTable:
+    """A DynamoDB table kept in a SQLite table.
+
+    Created through LocalDynamoDB.Table, which owns the connection.
+    """
+
+    def __init__(
+        self, name: str, connection: sqlite3.Connection, lock: threading.Lock
+    ) -> None:
+        """Create the table and its indexes unless they exist.
+
+        Args:
+            name: Table name
+            connection: SQLite connection shared by the tables of a resource
+            lock: Lock serializing the use of the connection
+        """
+        self.name = name
+        self._db = connection
+        self._lock = lock
+        with self._lock:
+            self._db.executescript(_SCHEMA.format(table=name.replace('"', '""')))
+        self._sql_name = '"' + name.replace('"', '""') + '"'
+
+    @property
+    def item_count(self) -> int:
+        """Number of items in the table."""
+        with self._lock:
+            row = self._db.execute(f"SELECT COUNT(*) FROM {self._sql_name}").fetchone()
+        return int(row[0])
+
+    def put_item(self, Item: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        """Write an item, replacing the item with the same key.
+
+        Args:
+            Item: Item with string PK and SK attributes
+            **kwargs: Other PutItem parameters (ignored)
+
+        Returns:
+            Empty response
+        """
+        self.put_items([Item])
+        return {}
+
+    def put_items(self, items: Iterable[dict[str, Any]]) -> None:
+        """Write items in a single transaction.
+
+        Args:
+            items: Items with string PK and SK attributes
+
+        Raises:
+            ClientError: If an item lacks its key
+        """
+        rows = [self._row(item) for item in items]
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO {self._sql_name} "
+                "(pk, sk, tag, year, created_at, video_id, ordinal, segment_hash, "
+                "size, item) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete_item(self, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        """Delete one item by its key (a missing item is not an error).
+
+        Args:
+            Key: PK and SK of the item
+            **kwargs: Other DeleteItem parameters (ignored)
+
+        Returns:
+            Empty response
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                f"DELETE FROM {self._sql_name} WHERE pk = ? AND sk = ?",
+                (Key.get("PK"), Key.get("SK")),
+            )
+        return {}
+
+    def batch_writer(self) -> _BatchWriter:
+        """Get a context manager writing the items put into it on exit."""
+        return _BatchWriter(self)
+
+    @staticmethod
+    def _row(item: dict[str, Any]) -> tuple[Any, ...]:
+        """Build the SQLite row of an item."""
+        item = _to_dynamodb(item)
+        if not isinstance(item.get("PK"), str) or not isinstance(item.get("SK"), str):
+            raise _validation_error("PutItem", "Item must have string PK and SK")
+
+        keys = []
+        for name in ("Tag", "year", "created_at", "video_id", "ordinal"):
+            value = item.get(name)
+            # Attributes of the wrong type are not indexed (sparse indexes)
+            if name in _NUMBER_KEYS:
+                keys.append(_sql_value(value) if isinstance(value, Decimal) else None)
+            else:
+                keys.append(value if isinstance(value, str) else None)
+
+        return (
+            item["PK"],
+            item["SK"],
+            *keys,
+            zlib.crc32(item["PK"].encode()),
+            _item_size(item),
+            _encode_item(item),
+        )
+
+    def get_item(self, Key: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        """Read one item by its key.
+
+        Args:
+            Key: PK and SK of the item
+            **kwargs: ProjectionExpression and ExpressionAttributeNames
+
+        Returns:
+            Response with the item under "Item", or without it if missing
+        """
+        with span("dynamodb"):
+            with self._lock:
+                row = self._db.execute(
+                    f"SELECT size, item FROM {self._sql_name} WHERE pk = ? AND sk = ?",
+                    (Key.get("PK"), Key.get("SK")),
+                ).fetchone()
+
+            response: dict[str, Any] = {}
+            size = 0
+            if row is not None:
+                size = row[0]
+                response["Item"] = _project(_decode_item(row[1]), _projection(kwargs))
+            return self._respond(response, _read_units(size), kwargs)
+
+    def query(self, **kwargs: Any) -> dict[str, Any]:
+        """Read the items of one partition of the table or an index.
+
+        Args:
+            **kwargs: Query parameters (IndexName, KeyConditionExpression,
+                FilterExpression, ScanIndexForward, Limit, ExclusiveStartKey,
+                ProjectionExpression, ExpressionAttributeNames)
+
+        Returns:
+            Query response
+
+        Raises:
+            ClientError: If the index is unknown or the key condition does not
+                select a single partition of it
+        """
+        index_name = kwargs.get("IndexName")
+        if index_name not in KEY_SCHEMAS:
+            raise _validation_error("Query", f"Unknown index: {index_name}")
+        partition_key, sort_key = KEY_SCHEMAS[index_name]
+
+        key_condition = kwargs.get("KeyConditionExpression")
+        compiled = _compile(key_condition) if key_condition is not None else None
+        names = self._condition_names(key_condition) if key_condition else []
+        if (
+            compiled is None
+            or (partition_key, "=") not in names
+            or any(name not in (partition_key, sort_key) for name, _ in names)
+        ):
+            raise _validation_error("Query", "Invalid KeyConditionExpression")
+
+        # Items without the index's key attributes are not in the index
+        where = [compiled[0]]
+        where.extend(
+            f"{_COLUMNS[name]} IS NOT NULL"
+            for name in (partition_key, sort_key)
+            if name
+        )
+        order = list(dict.fromkeys([_COLUMNS[sort_key or "PK"], "pk", "sk"]))
+        forward = kwargs.get("ScanIndexForward", True)
+        return self._read(kwargs, where, compiled[1], order, forward, index_name)
+
+    def scan(self, **kwargs: Any) -> dict[str, Any]:
+        """Read the items of the whole table or index, or of one segment of it.
+
+        Args:
+            **kwargs: Scan parameters (IndexName, FilterExpression, Segment,
+                TotalSegments, Limit, ExclusiveStartKey, ProjectionExpression,
+                ExpressionAttributeNames)
+
+        Returns:
+            Scan response
+
+        Raises:
+            ClientError: If the index is unknown
+        """
+        index_name = kwargs.get("IndexName")
+        if index_name not in KEY_SCHEMAS:
+            raise _validation_error("Scan", f"Unknown index: {index_name}")
+        partition_key, sort_key = KEY_SCHEMAS[index_name]
+
+        # Items without the index's key attributes are not in the index, so
+        # scanning a sparse index reads only the items it holds
+        where = [
+            f"{_COLUMNS[name]} IS NOT NULL"
+            for name in (partition_key, sort_key)
+            if name and index_name is not None
+        ]
+        params: list[Any] = []
+        if "TotalSegments" in kwargs:
+            # Segments split the table by a hash of the partition key
+            where.append("segment_hash % ? = ?")
+            params += [kwargs["TotalSegments"], kwargs["Segment"]]
+        order = [
+            _COLUMNS[name]
+            for name in dict.fromkeys([partition_key, sort_key or "PK", "PK", "SK"])
+        ]
+        return self._read(kwargs, where, params, order, True, index_name)
+
+    def _read(
+        self,
+        kwargs: dict[str, Any],
+        where: list[str],
+        params: list[Any],
+        order: list[str],
+        forward: bool,
+        index_name: str | None,
+    ) -> dict[str, Any]:
+        """Read one page of items in key order.
+
+        Args:
+            kwargs: Request parameters
+            where: SQL conditions selecting the items
+            params: Parameters of the conditions
+            order: Columns the items are ordered by (ending with the table key)
+            forward: Ascending order if True
+            index_name: Index read (None for the table)
+
+        Returns:
+            Response with Items, Count, ScannedCount and, if the read stopped
+            at Limit or PAGE_BYTES, LastEvaluatedKey
+        """
+        with span("dynamodb"):
+            start_key = kwargs.get("ExclusiveStartKey")
+            if start_key:
+                columns = ", ".join(order)
+                marks = ", ".join("?" * len(order))
+                where = [*where, f"({columns}) {'>' if forward else '<'} ({marks})"]
+                params = [
+                    *params,
+                    *(_sql_value(start_key.get(_ATTRIBUTES[c])) for c in order),
+                ]
+
+            # Filters on key attributes are evaluated by SQLite, which then
+            # leaves the items filtered out undecoded
+            filter_condition = kwargs.get("FilterExpression")
+            sql_filter = _compile(filter_condition) if filter_condition else None
+            selected = "item"
+            select_params: list[Any] = []
+            if sql_filter is not None:
+                selected = f"CASE WHEN {sql_filter[0]} THEN item END"
+                select_params = sql_filter[1]
+
+            # LastEvaluatedKey holds the table key and the index key
+            partition_key, sort_key = KEY_SCHEMAS[index_name]
+            key_names = [
+                name
+                for name in dict.fromkeys(["PK", "SK", partition_key, sort_key])
+                if name
+            ]
+            key_columns = ", ".join(_COLUMNS[name] for name in key_names)
+
+            direction = "ASC" if forward else "DESC"
+            sql = (
+                f"SELECT {key_columns}, size, {selected} FROM {self._sql_name}"
+                + (f" WHERE {' AND '.join(where)}" if where else "")
+                + f" ORDER BY {', '.join(f'{c} {direction}' for c in order)}"
+            )
+
+            limit = kwargs.get("Limit")
+            projection = _projection(kwargs)
+            items: list[dict[str, Any]] = []
+            scanned = 0
+            page_size = 0
+            last_row: tuple[Any, ...] | None = None
+            with self._lock:
+                for row in self._db.execute(sql, [*select_params, *params]):
+                    scanned += 1
+                    page_size += row[-2]
+                    blob = row[-1]
+                    if blob is not None:
+                        item = _decode_item(blob)
+                        if filter_condition is None or sql_filter is not None:
+                            items.append(_project(item, projection))
+                        elif _matches(filter_condition, item):
+                            items.append(_project(item, projection))
+                    if scanned == limit or page_size >= PAGE_BYTES:
+                        last_row = row
+                        break
+
+            response: dict[str, Any] = {
+                "Items": items,
+                "Count": len(items),
+                "ScannedCount": scanned,
+            }
+            if last_row is not None:
+                response["LastEvaluatedKey"] = {
+                    name: Decimal(value) if name in _NUMBER_KEYS else value
+                    for name, value in zip(key_names, last_row, strict=False)
+                }
+            return self._respond(response, _read_units(page_size), kwargs)
+
+    @staticmethod
+    def _condition_names(condition: ConditionBase) -> list[tuple[str, str]]:
+        """List the attributes a condition compares and their operators."""
+        expression = condition.get_expression()
+        if expression["operator"] in ("AND", "OR", "NOT"):
+            return [
+                pair
+                for value in expression["values"]
+                for pair in LocalTable._condition_names(value)
+            ]
+        return [(expression["values"][0].name, expression["operator"])]
+
+    def _respond(
+        self, response: dict[str, Any], units: float, kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Account for a read and shape its response like DynamoDB's.
+
+        Args:
+            response: Response without consumed capacity
+            units: Read capacity units consumed
+            kwargs: Request parameters
+
+        Returns:
+            Response, with ConsumedCapacity if the request asked for it
+        """
+        capacity = {"TableName": self.name, "CapacityUnits": units}
+        # Counted against the current request like boto3 calls are
+        record_response({**response, "ConsumedCapacity": capacity})
+        if kwargs.get("ReturnConsumedCapacity", "NONE") != "NONE":
+            response["ConsumedCapacity"] = capacity
+        return response
+
+
+class LocalDynamoDB:
+    """Stand-in for a boto3 DynamoDB resource, stored in one SQLite database."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open the database.
+
+        Args:
+            path: SQLite database file (":memory:" keeps everything in memory)
+        """
+        # Shared by the worker threads of DynamoDBService and serialized by
+        # a lock, as SQLite connections are not safe for concurrent use
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._tables: dict[str, LocalTable] = {}
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def Table(self, name: str) -> LocalTable:
+        """Get a table, creating it when it does not exist.
+
+        Args:
+            name: Table name
+
+        Returns:
+            The table
+        """
+        if name not in self._tables:
+            self._tables[name] = LocalTable(name, self._db, self._lock)
+        return self._tables[name]
+
+    def batch_get_item(
+        self, RequestItems: dict[str, Any], **kwargs: Any
+    ) -> dict[str, Any]:
+        """Read items by key from one or more tables.
+
+        Args:
+            RequestItems: Keys and projection per table name
+            **kwargs: Other BatchGetItem parameters
+
+        Returns:
+            Response with the items under "Responses" and no unprocessed keys
+
+        Raises:
+            ClientError: If more than BATCH_GET_MAX_KEYS keys are requested
+        """
+        if sum(len(request["Keys"]) for request in RequestItems.values()) > (
+            BATCH_GET_MAX_KEYS
+        ):
+            raise _validation_error(
+                "BatchGetItem", f"Too many keys requested (max {BATCH_GET_MAX_KEYS})"
+            )
+
+        with span("dynamodb"):
+            responses: dict[str, list[dict[str, Any]]] = {}
+            capacity = []
+            for name, request in RequestItems.items():
+                table = self.Table(name)
+                projection = _projection(request)
+                items = []
+                units = 0.0
+                for key in request["Keys"]:
+                    with self._lock:
+                        row = self._db.execute(
+                            f"SELECT size, item FROM {table._sql_name} "
+                            "WHERE pk = ? AND sk = ?",
+                            (key.get("PK"), key.get("SK")),
+                        ).fetchone()
+                    if row is not None:
+                        units += _read_units(row[0])
+                        items.append(_project(_decode_item(row[1]), projection))
+                responses[name] = items
+                capacity.append({"TableName": name, "CapacityUnits": units})
+
+            response: dict[str, Any] = {"Responses": responses, "UnprocessedKeys": {}}
+            record_response({**response, "ConsumedCapacity": capacity})
+            if kwargs.get("ReturnConsumedCapacity", "NONE") != "NONE":
+                response["ConsumedCapacity"] = capacity
+            return response
+
+
+def seed_videos(table: LocalTable, records: Iterable[dict[str, Any]]) -> int:
+    """Write a catalog in the layout of the import script.
+
+    Every video gets its year partition item (with an ordinal), one tag
+    path index item per tag path and an ID lookup item; the tag path
+    counts, the precomputed tag tree and the catalog summary follow.
+
+    Args:
+        table: Table to write to
+        records: Videos in the schema of the metadata/ JSON files
+            (video_id, title, tags, published_at)
+
+    Returns:
+        Number of videos written
+    """
+    now = datetime.now(UTC).isoformat().replace("+00:00", "Z")
+    items: list[dict[str, Any]] = []
+    tag_tree: dict[str, Any] = {}
+    counts: Counter[str] = Counter()
+    years: set[int] = set()
+    fingerprints: list[str] = []
+    video_count = 0
+
+    for ordinal, record in enumerate(records):
+        video_id = record["video_id"]
+        published_at = record["published_at"]
+        year = datetime.fromisoformat(published_at).year
+        video = {
+            "video_id": video_id,
+            "title": record["title"],
+            "tags": list(record.get("tags", [])),
+            "year": year,
+            "thumbnail_url": f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
+            "created_at": published_at,
+        }
+        sort_key = f"VIDEO#{video_id}"
+        lookup_key = f"{VIDEO_LOOKUP_PREFIX}{video_id}"
+
+        items.append(
+            {
+                "PK": f"YEAR#{year}",
+                "SK": sort_key,
+                **video,
+                "updated_at": now,
+                "ordinal": ordinal,
+            }
+        )
+        items.extend(
+            {
+                "PK": f"{TAG_PATH_PREFIX}{path}",
+                "SK": sort_key,
+                "Tag": path,
+                "created_at": published_at,
+                "video": video,
+            }
+            for path in sorted(tag_sub_paths(video["tags"]))
+        )
+        items.append({"PK": lookup_key, "SK": lookup_key, "video": video})
+        if len(items) >= SEED_BATCH_ITEMS:
+            # Large synthetic catalogs are written as they are generated
+            table.put_items(items)
+            items = []
+
+        add_tags_to_tree(tag_tree, video["tags"])
+        counts.update(tag_sub_paths(video["tags"]))
+        years.add(year)
+        fingerprints.append(video_fingerprint(video))
+        video_count += 1
+
+    items.extend(
+        {"PK": f"{TAG_PATH_PREFIX}{path}", "SK": TAG_COUNT_KEY, "video_count": count}
+        for path, count in counts.items()
+    )
+    items.append(
+        {
+            "PK": TAG_TREE_KEY,
+            "SK": TAG_TREE_KEY,
+            "tree": gzip.compress(dumps({"tree": tag_tree_nodes(tag_tree)})),
+            "content_encoding": "gzip",
+            "format_version": TAG_TREE_FORMAT_VERSION,
+            "video_count": video_count,
+            "updated_at": now,
+        }
+    )
+    items.append(
+        {
+            "PK": CATALOG_KEY,
+            "SK": CATALOG_KEY,
+            "video_count": video_count,
+            "ordinal_limit": video_count,
+            "years": sorted(years, reverse=True),
+            "catalog_version": catalog_version(fingerprints),
+            "updated_at": now,
+        }
+    )
+
+    table.put_items(items)
+    return video_count
+
+
+def read_metadata_dir(metadata_dir: str | Path) -> Iterator[dict[str, Any]]:
+    """Read the videos of a metadata/ directory, oldest file first.
+
+    Args:
+        metadata_dir: Directory of YYYYMMDD-HHMMSS#<id>.json files, each
+            holding a list of videos
+
+    Yields:
+        Video records
+    """
+    for path in sorted(Path(metadata_dir).glob("*.json")):
+        yield from cast(
+            "list[dict[str, Any]]", json.loads(path.read_text(encoding="utf-8"))
+        )
+
+
+def load_metadata_dir(table: LocalTable, metadata_dir: str | Path) -> int:
+    """Seed a table with the videos of a metadata/ directory.
+
+    Args:
+        table: Table to write to
+        metadata_dir: Directory of metadata JSON files
+
+    Returns:
+        Number of videos written
+    """
+    return seed_videos(table, read_metadata_dir(metadata_dir))
+
+
+def open_local_storage(
+    table_name: str, path: str = ":memory:", metadata_dir: str | None = None
+) -> LocalDynamoDB:
+    """Open local storage, seeding it from a metadata/ directory when empty.
+
+    Args:
+        table_name: Name of the table the service reads
+        path: SQLite database file (":memory:" keeps everything in memory)
+        metadata_dir: Directory to load when the table is empty
+
+    Returns:
+        Resource to pass to DynamoDBService
+    """
+    resource = LocalDynamoDB(path)
+    table = resource.Table(table_name)
+    if metadata_dir and table.item_count == 0:
+        load_metadata_dir(table, metadata_dir)
+    return resource
@@ -0,0 +1,126 @@
+"""Per-request accounting of the DynamoDB calls made while serving a request.
+
+Handlers registered on the boto3 client add every read call to the tally of
+the request being served, which MetricsMiddleware starts and reports. The
+tally lives in a context variable, so calls run on worker threads must be
+started in a copy of the request's context (see DynamoDBService._run).
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+# Read operations the service issues
+TRACKED_OPERATIONS = ("Query", "Scan", "GetItem", "BatchGetItem")
+
+_current_usage: ContextVar["DynamoDBUsage | None"] = ContextVar(
+    "dynamodb_usage", default=None
+)
+
+
+class DynamoDBUsage:
+    """DynamoDB calls made while serving one request.
+
+    Attributes:
+        calls: Number of calls, including failed ones
+        count: Items returned
+        scanned_count: Items read before filtering (equal to count for
+            GetItem and BatchGetItem)
+        consumed_capacity: Read capacity units consumed
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tally."""
+        self.calls = 0
+        self.count = 0
+        self.scanned_count = 0
+        self.consumed_capacity = 0.0
+        # Scan segments record from several threads at once
+        self._lock = threading.Lock()
+
+    def record(self, response: dict[str, Any]) -> None:
+        """Add a parsed DynamoDB response to the tally.
+
+        Args:
+            response: Parsed response of a read call (an error response
+                counts as a call that read nothing)
+        """
+        capacity = response.get("ConsumedCapacity") or []
+        if isinstance(capacity, dict):
+            capacity = [capacity]
+        units = sum(float(entry.get("CapacityUnits", 0)) for entry in capacity)
+
+        if "Count" in response:
+            count = int(response["Count"])
+        elif "Responses" in response:
+            count = sum(len(items) for items in response["Responses"].values())
+        else:
+            count = 1 if "Item" in response else 0
+        scanned_count = int(response.get("ScannedCount", count))
+
+        with self._lock:
+            self.calls += 1
+            self.count += count
+            self.scanned_count += scanned_count
+            self.consumed_capacity += units
+
+
+@contextmanager
+def track_dynamodb_usage() -> Iterator[DynamoDBUsage]:
+    """Tally the DynamoDB calls made within the block.
+
+    Yields:
+        Usage of the calls made so far
+    """
+    usage = DynamoDBUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def _request_consumed_capacity(params: dict[str, Any], **kwargs: Any) -> None:
+    """Ask DynamoDB to report consumed capacity for tracked calls."""
+    if _current_usage.get() is not None:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+
+def record_response(response: dict[str, Any]) -> None:
+    """Add a finished call to the tally of the current request, if any.
+
+    Args:
+        response: Parsed response of a read call
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.record(response)
+
+
+def _record_call(parsed: dict[str, Any], **kwargs: Any) -> None:
+    """Add a finished call to the tally of the current request."""
+    record_response(parsed)
+
+
+def instrument_client(client: Any) -> None:
+    """Register the accounting handlers on a boto3 DynamoDB client.
+
+    Calls made outside track_dynamodb_usage are neither changed nor counted.
+
+    Args:
+        client: boto3 DynamoDB client (a resource's meta.client)
+    """
+    events = client.meta.events
+    for operation in TRACKED_OPERATIONS:
+        events.register(
+            f"provide-client-params.dynamodb.{operation}",
+            _request_consumed_capacity,
+            unique_id=f"request-metrics-params-{operation}",
+        )
+        events.register(
+            f"after-call.dynamodb.{operation}",
+            _record_call,
+            unique_id=f"request-metrics-record-{operation}",
+        )
@@ -0,0 +1,172 @@
+"""In-memory character bigram index for Japanese-aware title search."""
+
+import re
+import unicodedata
+from collections.abc import Sequence
+from itertools import chain
+
+from models.video import Video  # type: ignore
+
+# Hiragana (and its iteration marks) folded onto katakana, so that a query in
+# either script matches titles written in the other
+_KANA_TO_KATAKANA = {
+    **{code: code + 0x60 for code in range(0x3041, 0x3097)},
+    0x309D: 0x30FD,
+    0x309E: 0x30FE,
+}
+
+# Runs of anything but letters, digits and (combining) voiced sound marks:
+# spaces, brackets such as 【】 and punctuation separate terms
+_SEPARATORS = re.compile(r"(?:[^\w\u3099\u309a]|_)+")
+
+
+def normalize(text: str) -> str:
+    """Normalize text for matching.
+
+    NFKC folds full-width ASCII and half-width katakana onto their usual
+    forms (ＡＳＭＲ → ASMR, ﾏﾘｶ → マリカ), case is folded, and hiragana is
+    mapped onto katakana. Separators collapse into single spaces.
+
+    Args:
+        text: Title or query
+
+    Returns:
+        Normalized text
+    """
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    return _SEPARATORS.sub(" ", folded.translate(_KANA_TO_KATAKANA)).strip()
+
+
+def _bigrams(term: str) -> set[str]:
+    """Get the character bigrams of a term (none for a single character)."""
+    return {term[i : i + 2] for i in range(len(term) - 1)}
+
+
+class _NormalizedTerms(dict[str, tuple[str, ...]]):
+    """Normalized terms of each raw title term, computed once per term."""
+
+    def __missing__(self, raw: str) -> tuple[str, ...]:
+        terms = self[raw] = tuple(normalize(raw).split())
+        return terms
+
+
+class TitleIndex:
+    """Two-level inverted index over the terms of video titles.
+
+    Titles are split into terms at separators, and each distinct term is
+    normalized and indexed once: terms map to the videos whose titles
+    contain them, and character bigrams map to the terms containing them.
+    Titles of a channel share most of their terms, so building the index
+    touches far fewer strings than indexing every title's bigrams. The
+    build still grows with the number of distinct terms, and titles that
+    share none take several times as long.
+
+    A query matches the videos whose titles contain every query term. For
+    each query term the term postings of its bigrams are intersected,
+    starting from the shortest, the remaining terms are checked for the
+    query term itself (ruling out terms that merely contain the bigrams
+    apart), and the videos of those terms are intersected across query
+    terms. Like the bigrams, query terms never match across a separator.
+    """
+
+    def __init__(self, videos: Sequence[Video]) -> None:
+        """Build the index.
+
+        Args:
+            videos: Videos to index, in the order ties are ranked in
+        """
+        self.videos = list(videos)
+        self._titles: list[str] = []
+        self._term_videos: dict[str, list[int]] = {}
+        self._bigram_terms: dict[str, list[str]] = {}
+
+        normalized = _NormalizedTerms()
+        term_videos = self._term_videos
+        for position, video in enumerate(self.videos):
+            terms = list(
+                chain.from_iterable(
+                    map(normalized.__getitem__, _SEPARATORS.split(video.title))
+                )
+            )
+            self._titles.append(" ".join(terms))
+            for term in set(terms):
+                if term in term_videos:
+                    term_videos[term].append(position)
+                else:
+                    term_videos[term] = [position]
+
+        bigram_terms = self._bigram_terms
+        for term in term_videos:
+            for gram in _bigrams(term):
+                if gram in bigram_terms:
+                    bigram_terms[gram].append(term)
+                else:
+                    bigram_terms[gram] = [term]
+
+    def __len__(self) -> int:
+        """Get the number of indexed videos."""
+        return len(self.videos)
+
+    def search(self, query: str) -> list[Video]:
+        """Find the videos whose titles contain every term of a query.
+
+        Results are ranked by the share of the title the query terms cover
+        (an exact title first, a long title mentioning the terms in passing
+        last), then in index order.
+
+        Args:
+            query: Space-separated search terms
+
+        Returns:
+            Matching videos, best match first
+        """
+        terms = normalize(query).split()
+        if not terms:
+            return []
+
+        # Longer terms are usually rarer, so the set shrinks quickly
+        unique_terms = sorted(set(terms), key=len, reverse=True)
+        matched = self._positions_with(unique_terms[0])
+        for term in unique_terms[1:]:
+            if not matched:
+                return []
+            matched &= self._positions_with(term)
+
+        scored = []
+        for position in matched:
+            title = self._titles[position]
+            covered = sum(title.count(term) * len(term) for term in terms)
+            scored.append((-covered / len(title), position))
+        scored.sort()
+
+        return [self.videos[position] for _, position in scored]
+
+    def _positions_with(self, query_term: str) -> set[int]:
+        """Get the positions of the videos with a term containing query_term.
+
+        Args:
+            query_term: Normalized query term
+
+        Returns:
+            Positions in the video list
+        """
+        grams = _bigrams(query_term)
+        candidates: Sequence[str] | set[str]
+        if grams:
+            postings = sorted(
+                (self._bigram_terms.get(gram, []) for gram in grams), key=len
+            )
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+        else:
+            # A single character has no bigram; check every distinct term
+            candidates = list(self._term_videos)
+
+        positions: set[int] = set()
+        for term in candidates:
+            if query_term in term:
+                positions.update(self._term_videos[term])
+        return positions
@@ -0,0 +1,39 @@
+"""Fast JSON serialization of response payloads built from our own table."""
+
+from typing import Any
+
+import msgspec
+from pydantic import BaseModel
+
+
+def _encode_model(obj: Any) -> Any:
+    """Encode objects msgspec does not support natively.
+
+    Args:
+        obj: Object to encode
+
+    Returns:
+        The model's field values, which msgspec then encodes in field order
+
+    Raises:
+        TypeError: If the object is not a pydantic model
+    """
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+# Decimals (DynamoDB numbers) are written as JSON numbers, as DecimalEncoder does
+_encoder = msgspec.json.Encoder(enc_hook=_encode_model, decimal_format="number")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize a payload to compact UTF-8 JSON.
+
+    Args:
+        obj: Payload made of dicts, lists, scalars, Decimals and models
+
+    Returns:
+        JSON bytes
+    """
+    return _encoder.encode(obj)
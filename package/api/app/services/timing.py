@@ -0,0 +1,163 @@
+"""Low-overhead timing of the phases of a request, for Server-Timing.
+
+Code marks a phase with ``with span("name"):``. Durations add up per name
+for the request being served, which ServerTimingMiddleware starts and
+reports. Outside a tracked request span() returns a shared no-op context
+manager, so instrumented code costs a context variable lookup when the
+middleware is disabled. Like request_metrics, the collector lives in a
+context variable, so work run on worker threads must be started in a copy
+of the request's context.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any
+
+_current_timing: ContextVar["ServerTiming | None"] = ContextVar(
+    "server_timing", default=None
+)
+
+_NO_SPAN = nullcontext()
+
+# Key under which the start of a DynamoDB call is kept in botocore's
+# per-request context
+_CALL_STARTED = "server_timing_started"
+
+
+class ServerTiming:
+    """Time spent per phase while serving one request.
+
+    Attributes:
+        phases: Total milliseconds and number of spans per phase name, in
+            the order the phases first ran
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty collector."""
+        self.phases: dict[str, list[float]] = {}
+        # Scan segments add spans from several threads at once
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration_ms: float) -> None:
+        """Add one span to a phase.
+
+        Args:
+            name: Phase name (a Server-Timing metric name token)
+            duration_ms: Duration of the span in milliseconds
+        """
+        with self._lock:
+            phase = self.phases.setdefault(name, [0.0, 0])
+            phase[0] += duration_ms
+            phase[1] += 1
+
+    def durations(self) -> dict[str, float]:
+        """Get the total milliseconds per phase.
+
+        Returns:
+            Milliseconds keyed by phase name
+        """
+        with self._lock:
+            return {name: phase[0] for name, phase in self.phases.items()}
+
+    def header(self) -> str:
+        """Format the phases as a Server-Timing header value.
+
+        Returns:
+            Header value such as 'dynamodb;dur=12.5;desc="2 calls"'
+        """
+        with self._lock:
+            phases = list(self.phases.items())
+        entries = []
+        for name, (duration_ms, spans) in phases:
+            entry = f"{name};dur={duration_ms:.1f}"
+            if spans > 1:
+                entry += f';desc="{int(spans)} calls"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+class _Span:
+    """Context manager adding its duration to a phase."""
+
+    __slots__ = ("_name", "_started", "_timing")
+
+    def __init__(self, timing: ServerTiming, name: str) -> None:
+        self._timing = timing
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._timing.add(self._name, (time.perf_counter() - self._started) * 1000)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Time a block as part of a phase of the current request.
+
+    Args:
+        name: Phase name (a Server-Timing metric name token)
+
+    Returns:
+        Context manager timing the block (a no-op outside a tracked request)
+    """
+    timing = _current_timing.get()
+    if timing is None:
+        return _NO_SPAN
+    return _Span(timing, name)
+
+
+@contextmanager
+def track_server_timing() -> Iterator[ServerTiming]:
+    """Collect the spans of the phases run within the block.
+
+    Yields:
+        Phases timed so far
+    """
+    timing = ServerTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+
+
+def _start_call(context: dict[str, Any], **kwargs: Any) -> None:
+    """Note when a DynamoDB call of a tracked request starts."""
+    if _current_timing.get() is not None:
+        context[_CALL_STARTED] = time.perf_counter()
+
+
+def _finish_call(context: dict[str, Any], **kwargs: Any) -> None:
+    """Add a finished DynamoDB call to the dynamodb phase."""
+    timing = _current_timing.get()
+    started = context.get(_CALL_STARTED)
+    if timing is not None and started is not None:
+        timing.add("dynamodb", (time.perf_counter() - started) * 1000)
+
+
+def time_client_calls(client: Any) -> None:
+    """Register handlers timing every call of a boto3 DynamoDB client.
+
+    The dynamodb phase covers building and signing the request, the round
+    trip and parsing the response, but not the conversion of the items the
+    service does after.
+
+    Args:
+        client: boto3 DynamoDB client (a resource's meta.client)
+    """
+    events = client.meta.events
+    events.register(
+        "provide-client-params.dynamodb", _start_call, unique_id="timing-start"
+    )
+    events.register("after-call.dynamodb", _finish_call, unique_id="timing-finish")
@@ -0,0 +1,149 @@
+"""Measure payload size and latency of API responses with and without compression.
+
+The catalog is loaded from the ``metadata/`` corpus (optionally replicated to
+simulate a larger table) into an in-memory table behind the real application,
+and each route is called through the Lambda handler (Mangum) with
+``Accept-Encoding`` set to identity, gzip and br. For every combination the
+benchmark reports the body size API Gateway returns, the median handler time,
+and the time to transfer the body over a link of the given bandwidth, whose
+sum approximates the end-to-end latency a client sees.
+
+Usage:
+    python benchmarks/bench_compression.py [--scale N] [--runs N] [--mbps N]
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+os.environ.setdefault("PROJECT_SEMANTIC_VERSION", "0.0.0-bench")
+os.environ.setdefault("PROJECT_MAJOR_VERSION", "v1")
+os.environ.setdefault("METRICS_SINK", "memory")
+
+from bench_random_sampling import load_catalog  # noqa: E402
+from main import app  # noqa: E402
+from mangum import Mangum  # noqa: E402
+from middleware.compression import brotli  # noqa: E402
+from routers import videos  # noqa: E402
+
+
+class CatalogTable:
+    """Fake table serving the catalog from memory with a single scan page."""
+
+    def __init__(self, items: list[dict[str, Any]]) -> None:
+        self.items = items
+
+    def get_item(self, **kwargs: Any) -> dict[str, Any]:
+        # No precomputed tag tree or catalog version: routes build from scans
+        return {}
+
+    def query(self, **kwargs: Any) -> dict[str, Any]:
+        return {"Items": []}
+
+    def scan(self, **kwargs: Any) -> dict[str, Any]:
+        return {"Items": self.items}
+
+
+def lambda_event(path: str, query: dict[str, str], encoding: str) -> dict[str, Any]:
+    """Create an API Gateway REST API proxy event."""
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"Host": "api.example.com", "Accept-Encoding": encoding},
+        "multiValueHeaders": {},
+        "queryStringParameters": query or None,
+        "multiValueQueryStringParameters": (
+            {key: [value] for key, value in query.items()} or None
+        ),
+        "pathParameters": None,
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": path,
+            "stage": "v1",
+            "identity": {"sourceIp": "192.0.2.1"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def body_size(response: dict[str, Any]) -> int:
+    """Size in bytes of the body API Gateway sends to the client."""
+    if response["isBase64Encoded"]:
+        return len(base64.b64decode(response["body"]))
+    return len(response["body"].encode())
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="corpus copies")
+    parser.add_argument("--runs", type=int, default=20, help="calls per case")
+    parser.add_argument(
+        "--mbps", type=float, default=10.0, help="client bandwidth for transfer time"
+    )
+    args = parser.parse_args()
+
+    items = load_catalog(args.scale)
+    videos.db_service.table = CatalogTable(items)
+    videos.db_service.version_ttl_seconds = float("inf")
+
+    # The largest tag subtree makes the by-tag response a worst case
+    tag_counts: dict[str, int] = {}
+    for item in items:
+        for tag in item["tags"][:1]:
+            tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    top_tag = max(tag_counts, key=lambda tag: tag_counts[tag])
+
+    routes = [
+        ("/api/tags", {}),
+        ("/api/videos/by-tag", {"path": top_tag}),
+        ("/api/videos/random", {"count": "20"}),
+    ]
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+    handler = Mangum(app, lifespan="off")
+    context = MagicMock(aws_request_id="bench")
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+
+    print(f"catalog: {len(items)} videos, {args.runs} runs, {args.mbps} Mbps")
+    print(
+        f"{'route':<22} {'encoding':<9} {'bytes':>9} {'ratio':>6} "
+        f"{'handler ms':>11} {'transfer ms':>12} {'total ms':>9}"
+    )
+    for path, query in routes:
+        baseline = 0
+        for encoding in encodings:
+            event = lambda_event(path, query, encoding)
+            response = handler(event, context)  # warm the catalog cache
+            size = body_size(response)
+            baseline = baseline or size
+
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                handler(event, context)
+                timings.append((time.perf_counter() - started) * 1000)
+            handler_ms = statistics.median(timings)
+            transfer_ms = size / bytes_per_ms
+
+            print(
+                f"{path:<22} {encoding:<9} {size:>9} {size / baseline:>6.2f} "
+                f"{handler_ms:>11.2f} {transfer_ms:>12.2f} "
+                f"{handler_ms + transfer_ms:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Time the Lambda entry point in process, warm and from a cold start.
+
+main.handler is called directly with synthetic API Gateway REST proxy
+events and a Lambda context, without HTTP or uvicorn, so every sample
+covers the path a Lambda invocation takes: the powertools
+inject_lambda_context decorator (which logs the event), Mangum, the
+middleware stack and the route. The catalog is served by the SQLite
+stand-in of services.local_storage, seeded from ``metadata/`` into a
+temporary file before anything is timed, so no network call is made.
+
+Warm samples import the handler once and call each route repeatedly. With
+Server-Timing enabled (as in the dev environment) and an extra call of
+lambda_adapter alone, each route's median is split into:
+
+- decorator: handler minus lambda_adapter (context injection, event log)
+- adapter: lambda_adapter minus the Server-Timing total (Mangum's event
+  and response conversion, the metrics and CORS middleware)
+- app: the total minus the data phase (routing, validation, service
+  logic, item conversion, encoding, compression)
+- data: the dynamodb phase (storage calls)
+
+Cold samples start a fresh interpreter per run, which imports main (the
+init phase Lambda reports separately) and then calls the handler twice
+with the same event, timing the import, the first and the second
+invocation. The import also opens the SQLite file, a few milliseconds
+that Lambda spends creating the boto3 resource on the first call instead.
+
+Usage:
+    python benchmarks/bench_handler.py [--runs N] [--cold-runs N] [--routes ROUTE ...]
+    python benchmarks/bench_handler.py --metadata-dir DIR [--json FILE]
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+sys.path.insert(0, str(APP_DIR))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+
+from services.local_storage import (  # noqa: E402
+    open_local_storage,
+    read_metadata_dir,
+)
+
+METADATA_DIR = Path(__file__).resolve().parents[3] / "metadata"
+TABLE_NAME = "videos"
+
+# Configuration of the function in infra (memory size) and the dev stage
+LAMBDA_ENVIRONMENT = {
+    "DYNAMODB_TABLE_NAME": TABLE_NAME,
+    "PROJECT_SEMANTIC_VERSION": "0.0.0-bench",
+    "PROJECT_MAJOR_VERSION": "v1",
+    "STORAGE_BACKEND": "local",
+    "SERVER_TIMING_ENABLED": "true",
+    "API_DOCS_ENABLED": "true",
+}
+MEMORY_LIMIT_MB = 512
+
+# Run in a fresh interpreter: import main, then invoke it twice. Log lines
+# go to stdout before the result, which is printed last.
+COLD_START = """
+import json, sys, time
+from types import SimpleNamespace
+
+event = json.loads(sys.argv[1])
+context = SimpleNamespace(**json.loads(sys.argv[2]))
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+first = main.handler(event, context)
+invoked = time.perf_counter()
+second = main.handler(event, context)
+finished = time.perf_counter()
+print(json.dumps({
+    "init_ms": (imported - started) * 1000,
+    "first_ms": (invoked - imported) * 1000,
+    "second_ms": (finished - invoked) * 1000,
+    "status": [first["statusCode"], second["statusCode"]],
+}))
+"""
+
+
+def lambda_event(path: str, query: dict[str, str]) -> dict[str, Any]:
+    """Create an API Gateway REST API proxy event as a browser request sends it."""
+    headers = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Host": "api.example.com",
+        "User-Agent": "Mozilla/5.0",
+        "X-Forwarded-For": "192.0.2.1",
+        "X-Forwarded-Proto": "https",
+    }
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": query or None,
+        "multiValueQueryStringParameters": (
+            {key: [value] for key, value in query.items()} or None
+        ),
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": f"/v1{path}",
+            "stage": "v1",
+            "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef",
+            "accountId": "123456789012",
+            "apiId": "1234567890",
+            "domainName": "api.example.com",
+            "protocol": "HTTP/1.1",
+            "requestTimeEpoch": 1700000000000,
+            "identity": {"sourceIp": "192.0.2.1", "userAgent": "Mozilla/5.0"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def lambda_context() -> dict[str, Any]:
+    """Fields of the Lambda context read by powertools and Mangum."""
+    return {
+        "function_name": "diopside",
+        "function_version": "$LATEST",
+        "memory_limit_in_mb": MEMORY_LIMIT_MB,
+        "invoked_function_arn": (
+            "arn:aws:lambda:ap-northeast-1:123456789012:function:diopside"
+        ),
+        "aws_request_id": "bench",
+    }
+
+
+def route_cases(records: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Build an event for every route with typical arguments.
+
+    Args:
+        records: Catalog the routes read
+
+    Returns:
+        Events keyed by route
+    """
+    newest = max(records, key=lambda record: record["published_at"])
+    years = Counter(record["published_at"][:4] for record in records)
+    top_tags = Counter(record["tags"][0] for record in records if record["tags"])
+    top_tag = top_tags.most_common(1)[0][0]
+    sub_tags = Counter(
+        "/".join(record["tags"][:2])
+        for record in records
+        if len(record["tags"]) > 1 and record["tags"][0] == top_tag
+    )
+    tag_path = sub_tags.most_common(1)[0][0] if sub_tags else top_tag
+    ids = ",".join(record["video_id"] for record in records[:20])
+
+    cases = {
+        # No data access: what every invocation pays before any query
+        "/health": ("/health", {}),
+        "/api/videos": ("/api/videos", {"year": years.most_common(1)[0][0]}),
+        "/api/videos/latest": ("/api/videos/latest", {}),
+        "/api/videos/{video_id}": (f"/api/videos/{newest['video_id']}", {}),
+        "/api/videos/batch": ("/api/videos/batch", {"ids": ids}),
+        "/api/tags": ("/api/tags", {}),
+        "/api/videos/by-tag": ("/api/videos/by-tag", {"path": tag_path}),
+        "/api/videos/search": ("/api/videos/search", {"q": top_tag}),
+        "/api/videos/random": ("/api/videos/random", {"count": "20"}),
+        "/api/videos/memory": ("/api/videos/memory", {}),
+    }
+    return {route: lambda_event(path, query) for route, (path, query) in cases.items()}
+
+
+def server_timing(response: dict[str, Any]) -> dict[str, float]:
+    """Parse the Server-Timing header of a handler response into durations."""
+    headers = {key.lower(): value for key, value in response["headers"].items()}
+    phases = {}
+    for entry in headers.get("server-timing", "").split(","):
+        name, *params = entry.strip().split(";")
+        for param in params:
+            key, _, value = param.partition("=")
+            if key == "dur":
+                phases[name] = float(value)
+    return phases
+
+
+def check(route: str, response: dict[str, Any]) -> None:
+    """Stop when a route fails, which would time the error path instead."""
+    if response["statusCode"] >= 400:
+        raise SystemExit(f"{route} returned {response['statusCode']}")
+
+
+def measure_warm(
+    main: ModuleType, route: str, event: dict[str, Any], runs: int, warmup: int
+) -> dict[str, Any]:
+    """Call one route repeatedly in a warm container and split its time.
+
+    Args:
+        main: Imported main module
+        route: Route name, for error messages
+        event: Event of the route
+        runs: Number of timed runs
+        warmup: Untimed runs first, filling the caches of a warm container
+
+    Returns:
+        Median and 95th percentile of the handler time, and the median of
+        each layer
+    """
+    context = SimpleNamespace(**lambda_context())
+    for _ in range(warmup):
+        check(route, main.handler(event, context))
+
+    handler_ms, adapter_ms, total_ms, data_ms = [], [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = main.handler(event, context)
+        handler_ms.append((time.perf_counter() - started) * 1000)
+        check(route, response)
+
+        started = time.perf_counter()
+        response = main.lambda_adapter(event, context)
+        adapter_ms.append((time.perf_counter() - started) * 1000)
+        phases = server_timing(response)
+        total_ms.append(phases.get("total", 0.0))
+        data_ms.append(phases.get("dynamodb", 0.0))
+
+    handler = statistics.median(handler_ms)
+    adapter = statistics.median(adapter_ms)
+    total = statistics.median(total_ms)
+    data = statistics.median(data_ms)
+    return {
+        "handler_ms": round(handler, 3),
+        "handler_ms_p95": round(statistics.quantiles(handler_ms, n=20)[-1], 3)
+        if runs > 1
+        else round(handler, 3),
+        "decorator_ms": round(max(handler - adapter, 0.0), 3),
+        "adapter_ms": round(max(adapter - total, 0.0), 3),
+        "app_ms": round(max(total - data, 0.0), 3),
+        "data_ms": round(data, 3),
+    }
+
+
+def measure_cold(route: str, event: dict[str, Any], runs: int) -> dict[str, Any]:
+    """Start fresh interpreters and time init and the first invocations.
+
+    Args:
+        route: Route name, for error messages
+        event: Event of the first and second invocation
+        runs: Number of fresh interpreters
+
+    Returns:
+        Median and slowest of the import, first and second invocation
+    """
+    env = {**os.environ, "PYTHONPATH": str(APP_DIR)}
+    samples = []
+    for _ in range(runs):
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                COLD_START,
+                json.dumps(event),
+                json.dumps(lambda_context()),
+            ],
+            capture_output=True,
+            text=True,
+            cwd=APP_DIR,
+            env=env,
+        )
+        if process.returncode != 0:
+            raise SystemExit(f"{route} cold start failed:\n{process.stderr}")
+        sample = json.loads(process.stdout.strip().splitlines()[-1])
+        if max(sample["status"]) >= 400:
+            raise SystemExit(f"{route} returned {sample['status']}")
+        samples.append(sample)
+
+    result = {}
+    for phase in ("init_ms", "first_ms", "second_ms"):
+        values = [sample[phase] for sample in samples]
+        result[phase] = round(statistics.median(values), 3)
+        result[f"{phase}_max"] = round(max(values), 3)
+    return result
+
+
+def run(
+    metadata_dir: Path, routes: list[str], runs: int, warmup: int, cold_runs: int
+) -> dict[str, Any]:
+    """Seed the catalog, then benchmark the routes warm and cold.
+
+    Args:
+        metadata_dir: Directory of the catalog to serve
+        routes: Routes to call (every route when empty)
+        runs: Timed warm runs per route
+        warmup: Untimed warm runs per route
+        cold_runs: Fresh interpreters per route (0 skips cold starts)
+
+    Returns:
+        Warm and cold results keyed by route
+    """
+    records = list(read_metadata_dir(metadata_dir))
+    cases = route_cases(records)
+    unknown = set(routes) - set(cases)
+    if unknown:
+        raise SystemExit(f"Unknown routes: {', '.join(sorted(unknown))}")
+    selected = {route: cases[route] for route in routes or cases}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Seeded once, so neither this process nor the cold starts load the
+        # metadata during init as the local backend otherwise would
+        path = str(Path(directory) / "catalog.db")
+        started = time.perf_counter()
+        open_local_storage(TABLE_NAME, path, str(metadata_dir)).close()
+        print(
+            f"catalog: {len(records)} videos seeded in "
+            f"{time.perf_counter() - started:.1f} s",
+            file=sys.stderr,
+        )
+        os.environ.update(LAMBDA_ENVIRONMENT, LOCAL_DB_PATH=path)
+
+        # Log lines and metrics go to stdout, as in Lambda; the logger binds
+        # its handler to stdout when main is imported
+        warm = {}
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            main = importlib.import_module("main")
+            for route, event in selected.items():
+                warm[route] = measure_warm(main, route, event, runs, warmup)
+
+        cold = {}
+        if cold_runs:
+            for route, event in selected.items():
+                cold[route] = measure_cold(route, event, cold_runs)
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "videos": len(records),
+        "runs": runs,
+        "cold_runs": cold_runs,
+        "warm": warm,
+        "cold": cold,
+    }
+
+
+def print_results(results: dict[str, Any]) -> None:
+    """Print the warm and cold results as tables."""
+    print(
+        f"warm ({results['runs']} runs, {results['videos']} videos, median ms)\n"
+        f"{'route':<24} {'handler':>8} {'p95':>8} {'decorator':>10} "
+        f"{'adapter':>8} {'app':>8} {'data':>8}"
+    )
+    for route, result in results["warm"].items():
+        print(
+            f"{route:<24} {result['handler_ms']:>8.2f} "
+            f"{result['handler_ms_p95']:>8.2f} {result['decorator_ms']:>10.2f} "
+            f"{result['adapter_ms']:>8.2f} {result['app_ms']:>8.2f} "
+            f"{result['data_ms']:>8.2f}"
+        )
+    if not results["cold"]:
+        return
+    print(
+        f"\ncold ({results['cold_runs']} fresh interpreter(s) per route, "
+        f"median / max ms)\n"
+        f"{'route':<24} {'init':>17} {'first':>17} {'second':>17}"
+    )
+    for route, result in results["cold"].items():
+        cells = " ".join(
+            f"{result[phase]:>8.1f}/{result[f'{phase}_max']:<8.1f}"
+            for phase in ("init_ms", "first_ms", "second_ms")
+        )
+        print(f"{route:<24} {cells}")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--metadata-dir",
+        type=Path,
+        default=METADATA_DIR,
+        help="catalog to serve (default: the repository's metadata/)",
+    )
+    parser.add_argument(
+        "--routes", nargs="+", default=[], help="routes to call (default: all)"
+    )
+    parser.add_argument("--runs", type=int, default=50, help="warm runs per route")
+    parser.add_argument(
+        "--warmup", type=int, default=3, help="untimed warm runs per route"
+    )
+    parser.add_argument(
+        "--cold-runs",
+        type=int,
+        default=3,
+        help="fresh interpreters per route (0 skips cold starts)",
+    )
+    parser.add_argument("--json", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = run(
+        args.metadata_dir, args.routes, args.runs, args.warmup, args.cold_runs
+    )
+    print_results(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
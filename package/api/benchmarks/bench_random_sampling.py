@@ -0,0 +1,101 @@
+"""Compare the read cost of random sampling against a full-table scan.
+
+The catalog is loaded from the ``metadata/`` corpus (optionally replicated to
+simulate a larger table) into the local SQLite stand-in for DynamoDB
+(services/local_storage.py), which meters read capacity the way DynamoDB
+does for eventually consistent reads: every request is rounded up to 4 KB
+units at half a unit each, and scans are billed for every item read per
+1 MB page before filters and projections apply. Requests and units are
+tallied by services/request_metrics.py, as they are for API requests.
+
+Usage:
+    python benchmarks/bench_random_sampling.py [--scale N] [--count N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+
+from services.dynamodb_service import CATALOG_KEY, DynamoDBService
+from services.local_storage import LocalDynamoDB
+from services.request_metrics import track_dynamodb_usage
+
+METADATA_DIR = Path(__file__).resolve().parents[3] / "metadata"
+
+
+def load_catalog(scale: int) -> list[dict[str, Any]]:
+    """Load the metadata corpus as video items, replicated ``scale`` times."""
+    records = [
+        record
+        for path in sorted(METADATA_DIR.glob("*.json"))
+        for record in json.loads(path.read_text(encoding="utf-8"))
+    ]
+
+    videos: list[dict[str, Any]] = []
+    for copy in range(scale):
+        for record in records:
+            video_id = f"{record['video_id']}-{copy}" if copy else record["video_id"]
+            year = int(record["published_at"][:4])
+            videos.append(
+                {
+                    "PK": f"YEAR#{year}",
+                    "SK": f"VIDEO#{video_id}",
+                    "video_id": video_id,
+                    "title": record["title"],
+                    "tags": record.get("tags", []),
+                    "year": year,
+                    "thumbnail_url": (
+                        f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg"
+                    ),
+                    "created_at": record["published_at"],
+                    "updated_at": record["published_at"],
+                    "ordinal": len(videos),
+                }
+            )
+    return videos
+
+
+def measure(service: DynamoDBService, count: int) -> None:
+    """Print the requests and read units of one random sample."""
+    with track_dynamodb_usage() as usage:
+        asyncio.run(service.get_random_videos(count=count))
+    print(f"  requests:   {usage.calls}")
+    print(f"  read units: {usage.consumed_capacity:.1f}")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="corpus copies")
+    parser.add_argument("--count", type=int, default=1, help="videos per sample")
+    args = parser.parse_args()
+
+    videos = load_catalog(args.scale)
+    resource = LocalDynamoDB()
+    table = resource.Table("videos")
+    table.put_items(videos)
+    summary = {"PK": CATALOG_KEY, "SK": CATALOG_KEY}
+    table.put_item(
+        Item={**summary, "video_count": len(videos), "ordinal_limit": len(videos)}
+    )
+    print(f"catalog: {len(videos)} videos, sample size {args.count}")
+
+    service = DynamoDBService("videos", scan_segments=1, resource=resource)
+
+    print("ordinal sampling:")
+    measure(service, args.count)
+
+    print("full scan (no catalog summary):")
+    table.delete_item(Key=summary)
+    measure(service, args.count)
+
+
+if __name__ == "__main__":
+    main()
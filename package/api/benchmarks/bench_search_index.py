@@ -0,0 +1,103 @@
+"""Time building and querying the title search index on large catalogs.
+
+Two catalogs of the same size are indexed. The corpus catalog replicates the
+``metadata/`` corpus, so its titles share terms the way one channel's titles
+do and the number of distinct terms stays small. The unique catalog gives
+every title its own random terms, the worst case for the index: every term
+is normalized and its bigrams are registered once per video.
+
+Build time is what a search pays whenever the index is not kept (a cold
+container, or a new catalog version); search time is what every later
+search pays.
+
+Usage:
+    python benchmarks/bench_search_index.py [--size N] [--seed N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+
+from bench_random_sampling import load_catalog
+from models.video import Video
+from services.dynamodb_service import DynamoDBService
+from services.search_index import TitleIndex
+
+# Characters of the random terms in the unique catalog
+KATAKANA = [chr(code) for code in range(0x30A1, 0x30F7)]
+
+
+def corpus_items(size: int) -> list[dict[str, Any]]:
+    """Replicate the corpus until it has ``size`` video items."""
+    items = load_catalog(1)
+    return load_catalog(-(-size // len(items)))[:size]
+
+
+def unique_items(size: int, seed: int) -> list[dict[str, Any]]:
+    """Build ``size`` video items whose titles share no terms."""
+    rng = random.Random(seed)
+    items = corpus_items(size)
+    for item in items:
+        terms = [
+            "".join(rng.choices(KATAKANA, k=rng.randint(3, 8)))
+            for _ in range(rng.randint(3, 6))
+        ]
+        item["title"] = f"【{terms[0]}】" + " ".join(terms[1:])
+    return items
+
+
+def queries(videos: list[Video], count: int, seed: int) -> list[str]:
+    """Pick search terms from the titles, as users type them."""
+    rng = random.Random(seed)
+    picked = []
+    for video in rng.sample(videos, count):
+        term = rng.choice(video.title.replace("【", " ").replace("】", " ").split())
+        picked.append(term[: rng.randint(2, max(2, len(term)))])
+    return picked
+
+
+def measure(name: str, items: list[dict[str, Any]], seed: int) -> None:
+    """Build the index over the items and time searches against it."""
+    service = DynamoDBService("videos", scan_segments=1)
+    videos = [service._convert_dynamodb_item_to_video(item) for item in items]
+
+    start = time.perf_counter()
+    index = TitleIndex(videos)
+    build = time.perf_counter() - start
+
+    timings = []
+    for query in queries(videos, 200, seed):
+        start = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    print(
+        f"{name:<8} {len(videos):>8} {build:>9.2f}"
+        f" {statistics.median(timings):>9.2f}"
+        f" {timings[int(len(timings) * 0.99)]:>9.2f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="videos indexed")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    print(f"{'catalog':<8} {'videos':>8} {'build s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    measure("corpus", corpus_items(args.size), args.seed)
+    measure("unique", unique_items(args.size, args.seed), args.seed)
+
+
+if __name__ == "__main__":
+    main()
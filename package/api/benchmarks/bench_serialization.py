@@ -0,0 +1,105 @@
+"""Compare the per-item cost of building and serializing 100-item pages.
+
+Pages are taken from the ``metadata/`` corpus. Both paths build each Video
+from its DynamoDB item the way the service does. The response_model path is
+what routes did before: wrap the page in its response model and let FastAPI
+validate it against response_model again, dump it and encode it with
+json.dumps. The trusted path encodes the Videos directly with msgspec.
+
+Building with model_construct is measured as well: in pydantic 2 it runs in
+Python and is slower than validating in pydantic-core, so the service keeps
+validating once when it converts items.
+
+Usage:
+    python benchmarks/bench_serialization.py [--page-size N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+
+from bench_random_sampling import load_catalog  # noqa: E402
+from models.video import Video  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from routers.videos import VideosResponse  # noqa: E402
+from services.dynamodb_service import DecimalEncoder, DynamoDBService  # noqa: E402
+from services.serialization import dumps  # noqa: E402
+
+response_adapter = TypeAdapter(VideosResponse)
+
+
+def constructed_video(item: dict[str, Any]) -> Video:
+    """Build a Video with model_construct, skipping validation."""
+    return Video.model_construct(
+        video_id=str(item["video_id"]),
+        title=str(item["title"]),
+        tags=[str(tag) for tag in item.get("tags", [])],
+        year=int(item["year"]),
+        thumbnail_url=str(item["thumbnail_url"]) if item.get("thumbnail_url") else None,
+        created_at=str(item["created_at"]) if item.get("created_at") else None,
+    )
+
+
+def response_model_page(videos: list[Video]) -> bytes:
+    """Serialize a page through response_model validation."""
+    page = VideosResponse(items=videos)
+    # What FastAPI does with a returned model when response_model is set
+    value = response_adapter.validate_python(page, from_attributes=True)
+    content = response_adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def trusted_page(videos: list[Video]) -> bytes:
+    """Serialize a page on the trusted path."""
+    return dumps({"items": videos, "last_key": None})
+
+
+def raw_page(items: list[dict[str, Any]]) -> bytes:
+    """Serialize the raw DynamoDB items with json.dumps and DecimalEncoder."""
+    payload = {"items": items, "last_key": None}
+    return json.dumps(payload, cls=DecimalEncoder, ensure_ascii=False).encode()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100, help="items per page")
+    parser.add_argument("--repeat", type=int, default=200, help="pages per timing")
+    args = parser.parse_args()
+
+    service = DynamoDBService("videos", scan_segments=1)
+    items = load_catalog(1)[: args.page_size]
+
+    def build() -> list[Video]:
+        return [service._convert_dynamodb_item_to_video(item) for item in items]
+
+    videos = build()
+    assert json.loads(response_model_page(videos)) == json.loads(trusted_page(videos))
+
+    cases = {
+        "response_model (before)": lambda: response_model_page(build()),
+        "trusted (after)": lambda: trusted_page(build()),
+        "  build, validated": build,
+        "  build, model_construct": lambda: [constructed_video(i) for i in items],
+        "  serialize, response_model": lambda: response_model_page(videos),
+        "  serialize, msgspec": lambda: trusted_page(videos),
+        "  raw items, DecimalEncoder": lambda: raw_page(items),
+    }
+
+    print(f"page size: {len(items)} items, best of 5 x {args.repeat} pages")
+    print(f"{'case':<28} {'us/page':>10} {'us/item':>9}")
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=args.repeat, repeat=5))
+        per_page = seconds / args.repeat * 1_000_000
+        print(f"{name:<28} {per_page:>10.1f} {per_page / len(items):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Time every public DynamoDBService method on synthetic catalogs.
+
+Catalogs of each size are generated from the ``metadata/`` corpus with a
+fixed seed by package/scripts/src/generate_synthetic_metadata.py and
+written in the import script's layout to the SQLite stand-in of
+services.local_storage, which answers the service's calls with DynamoDB's
+paging and accounting. Every run of a method gets a new service without a
+catalog cache and with the catalog version re-read on every call, so state
+built by an earlier run (such as the title index of search_videos) is not
+reused and every sample is what a cold container pays.
+
+Per method and size the benchmark records the median and fastest wall
+time over the runs, and the DynamoDB calls, items read (ScannedCount),
+items returned and read capacity units of the first run. ``--output`` writes the results as
+JSON; ``--compare`` runs the benchmark with the settings of such a file
+and flags every result that got worse than the baseline by more than
+``--tolerance``, exiting with status 1 if any did.
+
+Usage:
+    python benchmarks/bench_service.py [--sizes N ...] [--repeat N] [--output FILE]
+    python benchmarks/bench_service.py --compare FILE [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts" / "src"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+
+from generate_synthetic_metadata import (  # noqa: E402
+    CorpusProfile,
+    SyntheticMetadataGenerator,
+)
+from services.dynamodb_service import DynamoDBService  # noqa: E402
+from services.local_storage import (  # noqa: E402
+    LocalDynamoDB,
+    seed_videos,
+)
+from services.request_metrics import track_dynamodb_usage  # noqa: E402
+
+METADATA_DIR = Path(__file__).resolve().parents[3] / "metadata"
+# Bumped when the generated catalogs change, so old baselines are rejected
+BASELINE_FORMAT_VERSION = 3
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Wall time differences below this many milliseconds are noise, whatever
+# the ratio
+WALL_NOISE_MS = 1.0
+
+# Results compared against the baseline; all of them are worse when higher
+COMPARED = ["wall_ms", "calls", "scanned_count", "read_units"]
+
+
+def synthetic_records(size: int, seed: int) -> list[dict[str, Any]]:
+    """Generate a catalog resembling the metadata corpus.
+
+    Records come from the synthetic metadata generator, which samples tag
+    paths, title terms and publish gaps from the corpus. The gaps are
+    scaled to the corpus's date range, so catalogs of every size spread
+    over the same years.
+
+    Args:
+        size: Number of videos
+        seed: Random seed
+
+    Returns:
+        Records in the schema of the metadata/ JSON files, oldest first
+    """
+    profile = CorpusProfile.from_metadata_dir(str(METADATA_DIR))
+    generator = SyntheticMetadataGenerator(profile, seed)
+    return list(generator.generate(size, end=profile.last_published))
+
+
+def method_cases(
+    records: list[dict[str, Any]], seed: int
+) -> dict[str, Callable[[DynamoDBService], Awaitable[Any]]]:
+    """Build a call of every public service method with typical arguments.
+
+    Args:
+        records: Catalog the calls run against
+        seed: Random seed for picking video IDs
+
+    Returns:
+        Calls keyed by method name
+    """
+    rng = random.Random(seed)
+    years = Counter(int(record["published_at"][:4]) for record in records)
+    busiest_year = years.most_common(1)[0][0]
+    top_tags = Counter(record["tags"][0] for record in records if record["tags"])
+    top_tag = top_tags.most_common(1)[0][0]
+    sub_tags = Counter(
+        "/".join(record["tags"][:2])
+        for record in records
+        if len(record["tags"]) > 1 and record["tags"][0] == top_tag
+    )
+    tag_path = sub_tags.most_common(1)[0][0] if sub_tags else top_tag
+    video_id = rng.choice(records)["video_id"]
+    video_ids = [
+        record["video_id"] for record in rng.sample(records, min(50, len(records)))
+    ]
+
+    return {
+        "get_videos_by_year": lambda s: s.get_videos_by_year(busiest_year),
+        "get_latest_videos": lambda s: s.get_latest_videos(),
+        "get_video_by_id": lambda s: s.get_video_by_id(video_id),
+        "get_videos_by_ids": lambda s: s.get_videos_by_ids(video_ids),
+        "get_videos_by_tag_path": lambda s: s.get_videos_by_tag_path(tag_path),
+        "count_videos_by_tag_path": lambda s: s.count_videos_by_tag_path(tag_path),
+        "search_videos": lambda s: s.search_videos(top_tag),
+        "get_random_videos": lambda s: s.get_random_videos(count=20),
+        "get_memory_thumbnails": lambda s: s.get_memory_thumbnails(),
+        "get_catalog_version": lambda s: s.get_catalog_version(),
+        "get_tag_tree_json": lambda s: s.get_tag_tree_json(),
+        "get_tag_tree_gzip": lambda s: s.get_tag_tree_gzip(),
+        "build_tag_tree": lambda s: s.build_tag_tree(),
+    }
+
+
+async def measure(
+    make_service: Callable[[], DynamoDBService],
+    call: Callable[[DynamoDBService], Awaitable[Any]],
+    repeat: int,
+) -> dict[str, Any]:
+    """Run a call repeatedly, each time on a new service, and summarize its cost.
+
+    Args:
+        make_service: Factory of a cold service
+        call: Call to measure
+        repeat: Number of timed runs
+
+    Returns:
+        Median and fastest wall time, and the DynamoDB usage of the first run
+    """
+    timings = []
+    usages = []
+    for _ in range(repeat):
+        service = make_service()
+        with track_dynamodb_usage() as usage:
+            started = time.perf_counter()
+            await call(service)
+            timings.append((time.perf_counter() - started) * 1000)
+        usages.append(usage)
+    first = usages[0]
+    return {
+        "wall_ms": round(statistics.median(timings), 3),
+        "wall_ms_min": round(min(timings), 3),
+        "calls": first.calls,
+        "scanned_count": first.scanned_count,
+        "count": first.count,
+        "read_units": first.consumed_capacity,
+    }
+
+
+def run(sizes: list[int], repeat: int, seed: int) -> dict[str, Any]:
+    """Benchmark every method at every catalog size.
+
+    Args:
+        sizes: Catalog sizes in videos
+        repeat: Timed runs per method
+        seed: Random seed for the catalogs and arguments
+
+    Returns:
+        Results in the baseline file format
+    """
+    results: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            started = time.perf_counter()
+            records = synthetic_records(size, seed)
+            # A file keeps the larger catalogs out of memory
+            resource = LocalDynamoDB(str(Path(directory) / f"catalog-{size}.db"))
+            seed_videos(resource.Table("videos"), records)
+            print(
+                f"catalog: {size} videos seeded in "
+                f"{time.perf_counter() - started:.1f} s",
+                file=sys.stderr,
+            )
+
+            def make_service(resource: LocalDynamoDB = resource) -> DynamoDBService:
+                return DynamoDBService(
+                    "videos", cache=None, version_ttl_seconds=0, resource=resource
+                )
+
+            cases = method_cases(records, seed)
+            results[str(size)] = {
+                name: asyncio.run(measure(make_service, call, repeat))
+                for name, call in cases.items()
+            }
+            resource.close()
+
+    return {
+        "format_version": BASELINE_FORMAT_VERSION,
+        "created_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "sizes": sizes,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], tolerance: float
+) -> list[str]:
+    """List the results that regressed beyond the tolerance.
+
+    Args:
+        baseline: Results of an earlier run
+        current: Results of this run
+        tolerance: Allowed relative increase (0.25 allows 25 % more)
+
+    Returns:
+        One line per regression
+    """
+    regressions = []
+    for size, methods in current["results"].items():
+        for name, result in methods.items():
+            before = baseline["results"].get(size, {}).get(name)
+            if before is None:
+                continue
+            for metric in COMPARED:
+                old, new = before[metric], result[metric]
+                if new <= old * (1 + tolerance):
+                    continue
+                if metric == "wall_ms" and new - old < WALL_NOISE_MS:
+                    continue
+                regressions.append(
+                    f"{size:>7} {name:<26} {metric:<14} {old:>10g} -> {new:g}"
+                )
+    return regressions
+
+
+def print_results(results: dict[str, Any]) -> None:
+    """Print the results as a table."""
+    print(
+        f"{'size':>7} {'method':<26} {'median ms':>10} {'min ms':>9} "
+        f"{'calls':>6} {'scanned':>8} {'items':>6} {'RCU':>8}"
+    )
+    for size, methods in results["results"].items():
+        for name, result in methods.items():
+            print(
+                f"{size:>7} {name:<26} {result['wall_ms']:>10.2f} "
+                f"{result['wall_ms_min']:>9.2f} {result['calls']:>6} "
+                f"{result['scanned_count']:>8} {result['count']:>6} "
+                f"{result['read_units']:>8.1f}"
+            )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="catalog sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per method")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase over the baseline",
+    )
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("format_version") != BASELINE_FORMAT_VERSION:
+            parser.error(f"{args.compare} is not a baseline of this benchmark")
+        # The same catalogs and arguments, so the results are comparable
+        args.sizes, args.seed = baseline["sizes"], baseline["seed"]
+        args.repeat = baseline["repeat"]
+
+    results = run(args.sizes, args.repeat, args.seed)
+    print_results(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.tolerance)
+        print(
+            f"\n{len(regressions)} regression(s) beyond "
+            f"{args.tolerance:.0%} against {args.compare}"
+        )
+        for line in regressions:
+            print(line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""Load-test the API over HTTP with a weighted mix of screen requests.
+
+Starts the development server (``main.py``) on the local storage backend,
+seeded from a metadata directory (the repository's ``metadata/`` or one
+written by package/scripts/src/generate_synthetic_metadata.py), or targets
+a running server with ``--url``. Requests are drawn from a mix modeled on
+the screens: year pages, the tag tree, by-tag browsing, random picks and
+the memory game. Years are weighted by their number of videos (read from
+the metadata file names) and tag paths by their count in ``/api/tags``.
+
+With ``--concurrency N`` that many clients send requests back to back
+(closed loop). With ``--rate R`` requests are sent on a fixed schedule of R
+per second whatever the response times (open loop), and latency is counted
+from each request's scheduled time, so a stalled server shows up as
+queueing instead of fewer samples. Requests during ``--warmup`` are not
+counted.
+
+The report gives requests, throughput, error rate (transport errors and
+statuses of 400 and above) and p50/p95/p99/max latency per route and in
+total, as Markdown on stdout and optionally as JSON and Markdown files.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency N | --rate R] [--duration S]
+        [--metadata-dir DIR | --url URL] [--mix route=weight ...]
+        [--json FILE] [--markdown FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+API_DIR = Path(__file__).resolve().parents[1]
+METADATA_DIR = Path(__file__).resolve().parents[3] / "metadata"
+
+# Share of requests per route, after the screens that send them
+DEFAULT_MIX = {
+    "/api/videos": 35,  # year pages
+    "/api/videos/by-tag": 30,  # tag browsing
+    "/api/tags": 15,  # tag tree of the browsing screen
+    "/api/videos/random": 12,  # random discovery
+    "/api/videos/memory": 8,  # memory game
+}
+
+# Seconds to wait for the server to answer its health check
+STARTUP_TIMEOUT = 120.0
+
+
+class Workload:
+    """Draws requests of the mix with realistic parameters."""
+
+    def __init__(
+        self,
+        mix: dict[str, float],
+        years: list[int],
+        tag_paths: list[str],
+        seed: int,
+    ) -> None:
+        """Initialize the workload.
+
+        Args:
+            mix: Weight per route
+            years: Years to request, repeated by weight
+            tag_paths: Tag paths to request, repeated by weight
+            seed: Random seed
+        """
+        self.routes = list(mix)
+        self.weights = list(mix.values())
+        self.years = years
+        self.tag_paths = tag_paths
+        self.random = random.Random(seed)
+
+    def next_request(self) -> tuple[str, dict[str, Any]]:
+        """Draw the next request.
+
+        Returns:
+            Route path and query parameters
+        """
+        route = self.random.choices(self.routes, self.weights)[0]
+        if route == "/api/videos":
+            return route, {"year": self.random.choice(self.years), "limit": 50}
+        if route == "/api/videos/by-tag":
+            return route, {"path": self.random.choice(self.tag_paths), "limit": 50}
+        if route == "/api/videos/random":
+            return route, {"count": 20}
+        return route, {}
+
+
+def metadata_years(metadata_dir: Path) -> list[int]:
+    """List the publish year of every video, from the metadata file names.
+
+    Args:
+        metadata_dir: Directory of YYYYMMDD-HHMMSS#<id>.json files
+
+    Returns:
+        One year per file
+    """
+    return [
+        int(name[:4])
+        for name in os.listdir(metadata_dir)
+        if name.endswith(".json") and name[:4].isdigit()
+    ]
+
+
+def tag_tree_paths(nodes: list[dict[str, Any]], prefix: str = "") -> Iterator[str]:
+    """Yield every tag path of a tag tree, repeated by its video count.
+
+    Args:
+        nodes: TagNode objects of /api/tags
+        prefix: Path of the parent node
+
+    Yields:
+        Tag paths
+    """
+    for node in nodes:
+        path = f"{prefix}/{node['name']}" if prefix else node["name"]
+        for _ in range(node.get("count", 1)):
+            yield path
+        yield from tag_tree_paths(node.get("children") or [], path)
+
+
+def free_port() -> int:
+    """Get a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@contextmanager
+def local_server(metadata_dir: Path) -> Iterator[str]:
+    """Run the development server on the local storage backend.
+
+    Args:
+        metadata_dir: Directory the server loads at startup
+
+    Yields:
+        Base URL of the server
+    """
+    port = free_port()
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": "local",
+        "SERVER_TIMING_ENABLED": "false",
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(API_DIR / "main.py"),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--metadata-dir",
+            str(metadata_dir),
+            "--no-reload",
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        # Metric log lines of every request would flood the terminal
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode}")
+            try:
+                if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("Server did not start in time")
+            time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class Recorder:
+    """Latencies and outcomes per route."""
+
+    def __init__(self) -> None:
+        """Initialize an empty recorder."""
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter[str]] = defaultdict(Counter)
+        self.recording = False
+
+    async def send(
+        self,
+        client: httpx.AsyncClient,
+        route: str,
+        params: dict[str, Any],
+        started: float,
+    ) -> None:
+        """Send a request and record its latency from started.
+
+        Args:
+            client: HTTP client
+            route: Route path
+            params: Query parameters
+            started: perf_counter time the request counts from
+        """
+        try:
+            response = await client.get(route, params=params)
+            outcome = str(response.status_code)
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        if self.recording:
+            self.latencies[route].append((time.perf_counter() - started) * 1000)
+            self.statuses[route][outcome] += 1
+
+
+async def closed_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    recorder: Recorder,
+    concurrency: int,
+    deadline: float,
+) -> None:
+    """Send requests back to back from concurrency clients until deadline."""
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            route, params = workload.next_request()
+            await recorder.send(client, route, params, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    recorder: Recorder,
+    rate: float,
+    deadline: float,
+) -> None:
+    """Send rate requests per second on schedule until deadline."""
+    tasks = set()
+    start = time.perf_counter()
+    sent = 0
+    while True:
+        scheduled = start + sent / rate
+        if scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        route, params = workload.next_request()
+        task = asyncio.create_task(recorder.send(client, route, params, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sent += 1
+    await asyncio.gather(*tasks)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    *,
+    concurrency: int | None,
+    rate: float | None,
+    duration: float,
+    warmup: float,
+) -> tuple[Recorder, float]:
+    """Apply load and record the requests after the warmup.
+
+    Args:
+        client: HTTP client with the server's base URL
+        workload: Requests to draw from
+        concurrency: Number of closed-loop clients (if rate is None)
+        rate: Requests per second of the open loop
+        duration: Seconds of load recorded
+        warmup: Seconds of load before recording starts
+
+    Returns:
+        Recorder and the seconds it recorded for
+    """
+    recorder = Recorder()
+    loop = asyncio.get_running_loop()
+    loop.call_later(warmup, setattr, recorder, "recording", True)
+    deadline = time.perf_counter() + warmup + duration
+
+    if rate is not None:
+        await open_loop(client, workload, recorder, rate, deadline)
+    else:
+        await closed_loop(client, workload, recorder, concurrency or 1, deadline)
+    # Requests in flight at the deadline are counted, so the recorded
+    # window ends when the last of them did
+    return recorder, time.perf_counter() - (deadline - duration)
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Get a nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(share * len(values)) - 1)]
+
+
+def summarize(
+    latencies: list[float], statuses: Counter[str], elapsed: float
+) -> dict[str, Any]:
+    """Summarize the requests of one route (or all of them).
+
+    Args:
+        latencies: Latency of every request in milliseconds
+        statuses: Number of requests per status code or error name
+        elapsed: Seconds the requests were recorded over
+
+    Returns:
+        Requests, throughput, errors and latency percentiles
+    """
+    ordered = sorted(latencies)
+    requests = len(ordered)
+    errors = sum(
+        count
+        for outcome, count in statuses.items()
+        if not outcome.isdigit() or int(outcome) >= 400
+    )
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def build_report(
+    recorder: Recorder, elapsed: float, config: dict[str, Any]
+) -> dict[str, Any]:
+    """Build the JSON report of a run."""
+    routes = {
+        route: summarize(recorder.latencies[route], recorder.statuses[route], elapsed)
+        for route in sorted(recorder.latencies)
+    }
+    all_statuses: Counter[str] = Counter()
+    for statuses in recorder.statuses.values():
+        all_statuses.update(statuses)
+    total = summarize(
+        [value for values in recorder.latencies.values() for value in values],
+        all_statuses,
+        elapsed,
+    )
+    return {
+        "created_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "config": config,
+        "elapsed_s": round(elapsed, 2),
+        "total": total,
+        "routes": routes,
+    }
+
+
+def markdown_report(report: dict[str, Any]) -> str:
+    """Format a report as a Markdown table."""
+    config = report["config"]
+    load = (
+        f"{config['rate']} req/s"
+        if config["rate"] is not None
+        else f"{config['concurrency']} concurrent clients"
+    )
+    lines = [
+        f"## Load test: {load}, {report['elapsed_s']} s",
+        "",
+        f"Target: {config['target']}",
+        "",
+        "| route | requests | req/s | errors | p50 ms | p95 ms | p99 ms | max ms |",
+        "|-------|---------:|------:|-------:|-------:|-------:|-------:|-------:|",
+    ]
+    rows = [*report["routes"].items(), ("**total**", report["total"])]
+    for route, result in rows:
+        lines.append(
+            f"| {route} | {result['requests']} | {result['throughput_rps']} | "
+            f"{result['errors']} ({result['error_rate']:.2%}) | "
+            f"{result['p50_ms']} | {result['p95_ms']} | {result['p99_ms']} | "
+            f"{result['max_ms']} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def parse_mix(entries: list[str] | None) -> dict[str, float]:
+    """Parse route=weight arguments into a mix (the default if none)."""
+    if not entries:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for entry in entries:
+        route, _, weight = entry.partition("=")
+        if route not in DEFAULT_MIX or not weight:
+            raise ValueError(f"Invalid mix entry: {entry}")
+        mix[route] = float(weight)
+    return mix
+
+
+async def load_test(args: argparse.Namespace, url: str) -> dict[str, Any]:
+    """Discover the catalog, apply the load and build the report."""
+    limit = args.concurrency or 100
+    async with httpx.AsyncClient(
+        base_url=url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+    ) as client:
+        response = await client.get("/api/tags")
+        response.raise_for_status()
+        tag_paths = list(tag_tree_paths(response.json()["tree"]))
+        years = metadata_years(args.metadata_dir)
+        if not tag_paths or not years:
+            raise RuntimeError("The catalog has no videos to request")
+
+        workload = Workload(parse_mix(args.mix), years, tag_paths, args.seed)
+        recorder, elapsed = await run_load(
+            client,
+            workload,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            duration=args.duration,
+            warmup=args.warmup,
+        )
+
+    config = {
+        "target": url if args.url else f"main.py on {args.metadata_dir}",
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "seed": args.seed,
+        "mix": parse_mix(args.mix),
+    }
+    return build_report(recorder, elapsed, config)
+
+
+def main() -> None:
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, help="closed-loop clients")
+    load.add_argument("--rate", type=float, help="open-loop requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds recorded")
+    parser.add_argument(
+        "--warmup", type=float, default=5, help="seconds before recording"
+    )
+    parser.add_argument(
+        "--metadata-dir",
+        type=Path,
+        default=METADATA_DIR,
+        help="catalog the server loads and years are drawn from",
+    )
+    parser.add_argument("--url", help="load a running server instead of main.py")
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        metavar="ROUTE=WEIGHT",
+        help="route weights (default: "
+        + " ".join(f"{route}={weight}" for route, weight in DEFAULT_MIX.items())
+        + ")",
+    )
+    parser.add_argument("--timeout", type=float, default=30, help="request timeout")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--json", type=Path, help="write the report as JSON")
+    parser.add_argument("--markdown", type=Path, help="write the report as Markdown")
+    args = parser.parse_args()
+    if args.rate is None and args.concurrency is None:
+        args.concurrency = 10
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.url:
+        report = asyncio.run(load_test(args, args.url))
+    else:
+        with local_server(args.metadata_dir) as url:
+            report = asyncio.run(load_test(args, url))
+
+    markdown = markdown_report(report)
+    print(markdown)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.markdown:
+        args.markdown.write_text(markdown, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
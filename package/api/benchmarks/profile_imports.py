@@ -0,0 +1,118 @@
+"""Report what the Lambda init phase spends importing the application.
+
+Imports ``main`` in a fresh interpreter with ``python -X importtime``, the way
+a cold Lambda container does, and reports the slowest modules by cumulative
+and by self time, and self time summed per top-level package.
+
+Usage:
+    python benchmarks/profile_imports.py [--top N] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def lambda_environment() -> dict[str, str]:
+    """Environment variables the application expects at import time."""
+    env = dict(os.environ)
+    env.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+    env.setdefault("DYNAMODB_TABLE_NAME", "videos")
+    env.setdefault("PROJECT_SEMANTIC_VERSION", "0.0.0-profile")
+    env.setdefault("PROJECT_MAJOR_VERSION", "v1")
+    env["PYTHONPATH"] = str(APP_DIR)
+    return env
+
+
+def profile_imports() -> tuple[list[dict[str, Any]], float]:
+    """Import main in a subprocess and parse its import times.
+
+    Returns:
+        One entry per imported module (times in milliseconds), and the
+        wall-clock time of the import in milliseconds
+    """
+    code = "import time; t = time.perf_counter(); import main; "
+    code += "print((time.perf_counter() - t) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR,
+        env=lambda_environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append(
+                {
+                    "module": name,
+                    "depth": len(indent) // 2,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                }
+            )
+    return modules, float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Run the profiler."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    modules, import_ms = profile_imports()
+    process_ms = (time.perf_counter() - started) * 1000
+
+    packages: dict[str, float] = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + module["self_ms"]
+
+    by_cumulative = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+    by_self = sorted(modules, key=lambda m: m["self_ms"], reverse=True)
+    by_package = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+    if args.json:
+        report = {
+            "import_main_ms": import_ms,
+            "process_ms": process_ms,
+            "modules": by_cumulative,
+            "packages": dict(by_package),
+        }
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"import main: {import_ms:.1f} ms (process total {process_ms:.1f} ms)")
+    print(f"\n{'cumulative ms':>13} {'self ms':>9}  module")
+    for module in by_cumulative[: args.top]:
+        print(
+            f"{module['cumulative_ms']:>13.1f} {module['self_ms']:>9.1f}  "
+            f"{'  ' * module['depth']}{module['module']}"
+        )
+    print(f"\n{'self ms':>9}  module")
+    for module in by_self[: args.top]:
+        print(f"{module['self_ms']:>9.1f}  {module['module']}")
+    print(f"\n{'self ms':>9}  package")
+    for package, self_ms in by_package[: args.top]:
+        print(f"{self_ms:>9.1f}  {package}")
+
+
+if __name__ == "__main__":
+    main()
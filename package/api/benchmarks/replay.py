@@ -0,0 +1,650 @@
+"""Replay requests recorded in production logs against a local build.
+
+The request mix is read from log exports, one event per line (CloudWatch
+Logs exports with a timestamp before each message, or the JSON of
+``aws logs filter-log-events``, are read as well):
+
+- Lambda JSON logs: the event the handler logs (inject_lambda_context with
+  log_event=True) gives the path, query string and request time, and the
+  EMF record of the same request ID gives the route and its latency
+- API Gateway access logs, as JSON (requestTimeEpoch or requestTime,
+  httpMethod, path, responseLatency) or in Common Log Format. Access logs
+  have no query string, so their requests replay without one.
+- API Gateway execution logs: the lines of a request ID give the path,
+  the query string (with data tracing) and the integration latency
+
+Only GET requests are replayed. They are sent to the development server
+(``main.py``, as load_test.py starts it) or to ``--url`` at the recorded
+pace, ``--speed`` times faster, each at its scheduled time whatever the
+response times; latency counts from the scheduled time. Beforehand the
+first ``--warmup`` requests are sent one by one, untimed, to fill the
+caches a warm container has.
+
+The report compares each route's p50 and p95 latency with the latency the
+logs recorded, or with an earlier replay report given to ``--compare``
+(the like-for-like check: logged latencies include DynamoDB and the
+network, a local replay does not). With ``--compare``, routes slower than
+the baseline by more than ``--tolerance`` are listed and the exit status
+is 1.
+
+Usage:
+    python benchmarks/replay.py LOG [LOG ...] [--speed N] [--metadata-dir DIR | --url URL]
+    python benchmarks/replay.py LOG [LOG ...] --compare FILE [--tolerance 0.25]
+        [--json FILE] [--markdown FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+from load_test import METADATA_DIR, local_server, percentile, summarize
+from starlette.routing import compile_path
+
+# Latency differences below this many milliseconds are noise, whatever the
+# ratio
+LATENCY_NOISE_MS = 1.0
+
+# Timestamp CloudWatch Logs exports put before each message
+LEADING_TIMESTAMP = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)\s+"
+)
+
+# Common Log Format access log line
+ACCESS_LOG = re.compile(
+    r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3})'
+)
+
+# Execution log lines, prefixed with the request ID in parentheses
+EXECUTION_LOG = re.compile(r"\((?P<request_id>[0-9a-f-]{36})\) (?P<message>.*)")
+EXECUTION_METHOD = re.compile(r"HTTP Method: (?P<method>[A-Z]+), Resource Path: (\S+)")
+EXECUTION_PROXY = re.compile(r"Method request path: \{proxy=(?P<path>[^}]*)\}")
+EXECUTION_QUERY = re.compile(r"Method request query string: \{(?P<query>.*)\}")
+EXECUTION_LATENCY = re.compile(r"Integration latency: (?P<latency>\d+) ms")
+
+
+@dataclass
+class LoggedRequest:
+    """A request recorded in the logs."""
+
+    time: float | None = None
+    method: str = "GET"
+    path: str = ""
+    query: list[tuple[str, str]] = field(default_factory=list)
+    latency_ms: float | None = None
+    route: str | None = None
+
+
+def parse_time(value: str | float) -> float:
+    """Convert a log timestamp to seconds since the epoch.
+
+    Args:
+        value: Epoch milliseconds, ISO 8601, powertools' "%Y-%m-%d
+            %H:%M:%S,%f%z" or the access log's "%d/%b/%Y:%H:%M:%S %z"
+
+    Returns:
+        Seconds since the epoch (naive times are taken as UTC)
+    """
+    if isinstance(value, int | float):
+        return value / 1000
+    if value.isdigit():
+        return int(value) / 1000
+    try:
+        parsed = datetime.strptime(value, "%d/%b/%Y:%H:%M:%S %z")
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace(",", "."))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+class LogParser:
+    """Extracts requests from log lines of any of the supported formats."""
+
+    def __init__(self, base_path: str = "") -> None:
+        """Initialize the parser.
+
+        Args:
+            base_path: Stage prefix to remove from logged paths (such as
+                "/v1", which access logs include)
+        """
+        self.base_path = base_path.rstrip("/")
+        self.lines = 0
+        self.requests: list[LoggedRequest] = []
+        # Lambda events and EMF records, joined by request ID
+        self.events: dict[str, LoggedRequest] = {}
+        self.metrics: dict[str, tuple[str, float]] = {}
+        # Execution log lines, grouped by request ID
+        self.executions: dict[str, LoggedRequest] = {}
+
+    def feed(self, line: str, timestamp: float | None = None) -> None:
+        """Parse one log line.
+
+        Args:
+            line: Log line
+            timestamp: Time of the line when the export records it apart
+        """
+        self.lines += 1
+        line = line.strip()
+        match = LEADING_TIMESTAMP.match(line)
+        if match:
+            timestamp = parse_time(match.group(1))
+            line = line[match.end() :]
+
+        start = line.find("{")
+        if start != -1:
+            try:
+                record = json.loads(line[start:])
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(record, dict):
+                    self._feed_record(record, timestamp)
+                    return
+
+        match = EXECUTION_LOG.search(line)
+        if match:
+            self._feed_execution(match["request_id"], match["message"], timestamp)
+            return
+        match = ACCESS_LOG.search(line)
+        if match:
+            target = urlsplit(match["target"])
+            self.requests.append(
+                LoggedRequest(
+                    time=parse_time(match["time"]),
+                    method=match["method"],
+                    path=self._path(target.path),
+                    query=parse_qsl(target.query, keep_blank_values=True),
+                )
+            )
+
+    def feed_export(self, text: str) -> None:
+        """Parse a log export, in lines or as filter-log-events JSON."""
+        try:
+            document = json.loads(text)
+        except json.JSONDecodeError:
+            document = None
+        if isinstance(document, dict) and "events" in document:
+            for event in document["events"]:
+                self.feed(event["message"], parse_time(event["timestamp"]))
+            return
+        for line in text.splitlines():
+            if line.strip():
+                self.feed(line)
+
+    def parsed(self) -> list[LoggedRequest]:
+        """Get the requests parsed so far, oldest first.
+
+        Requests without a time keep their position after the previous one.
+        """
+        requests = list(self.requests)
+        for request_id, request in self.events.items():
+            if request_id in self.metrics:
+                request.route, request.latency_ms = self.metrics[request_id]
+            requests.append(request)
+        requests.extend(request for request in self.executions.values() if request.path)
+
+        last = 0.0
+        for request in requests:
+            if request.time is None:
+                request.time = last
+            last = request.time
+        return sorted(requests, key=lambda request: request.time or 0.0)
+
+    def _path(self, path: str) -> str:
+        """Remove the stage prefix from a logged path."""
+        if self.base_path and path.startswith(self.base_path + "/"):
+            return path[len(self.base_path) :]
+        return path
+
+    def _feed_record(self, record: dict[str, Any], timestamp: float | None) -> None:
+        """Parse a JSON log record."""
+        message = record.get("message")
+        if isinstance(message, str) and "timestamp" in record:
+            # A CloudWatch Logs event wrapping the original line
+            self.feed(message, parse_time(record["timestamp"]))
+            return
+
+        if "_aws" in record and "request_id" in record:
+            # EMF record of MetricsMiddleware
+            latency = record["Latency"]
+            if isinstance(latency, list):
+                latency = latency[0]
+            self.metrics[record["request_id"]] = (record["route"], float(latency))
+            return
+
+        if isinstance(message, dict) and "requestContext" in message:
+            # Event logged by the handler
+            event = message
+            context = event["requestContext"]
+            query = event.get("multiValueQueryStringParameters") or {}
+            if "timestamp" in record and timestamp is None:
+                timestamp = parse_time(record["timestamp"])
+            request_id = record.get("function_request_id") or context.get("requestId")
+            self.events[str(request_id)] = LoggedRequest(
+                time=parse_time(context["requestTimeEpoch"])
+                if "requestTimeEpoch" in context
+                else timestamp,
+                method=event["httpMethod"],
+                path=self._path(event["path"]),
+                query=[
+                    (key, value) for key, values in query.items() for value in values
+                ],
+            )
+            return
+
+        if "httpMethod" in record and isinstance(record.get("path"), str):
+            # Access log in JSON
+            if "requestTimeEpoch" in record:
+                timestamp = parse_time(record["requestTimeEpoch"])
+            elif "requestTime" in record:
+                timestamp = parse_time(record["requestTime"])
+            latency = record.get("responseLatency") or record.get("integrationLatency")
+            target = urlsplit(record["path"])
+            self.requests.append(
+                LoggedRequest(
+                    time=timestamp,
+                    method=record["httpMethod"],
+                    path=self._path(target.path),
+                    query=parse_qsl(target.query, keep_blank_values=True),
+                    latency_ms=float(latency) if latency not in (None, "-") else None,
+                )
+            )
+
+    def _feed_execution(
+        self, request_id: str, message: str, timestamp: float | None
+    ) -> None:
+        """Parse an execution log line of a request."""
+        request = self.executions.setdefault(request_id, LoggedRequest(time=timestamp))
+        if request.time is None:
+            request.time = timestamp
+
+        match = EXECUTION_METHOD.search(message)
+        if match:
+            request.method = match["method"]
+            if "{" not in match[2]:
+                request.path = self._path(match[2])
+            return
+        match = EXECUTION_PROXY.search(message)
+        if match:
+            request.path = "/" + match["path"]
+            return
+        match = EXECUTION_QUERY.search(message)
+        if match:
+            entries = (entry.partition("=") for entry in match["query"].split(", "))
+            request.query = [(key, value) for key, _, value in entries if key]
+            return
+        match = EXECUTION_LATENCY.search(message)
+        if match:
+            request.latency_ms = float(match["latency"])
+
+
+def read_logs(paths: Iterable[Path], base_path: str) -> list[LoggedRequest]:
+    """Read the requests of log exports, oldest first."""
+    parser = LogParser(base_path)
+    for path in paths:
+        parser.feed_export(path.read_text(encoding="utf-8"))
+    requests = parser.parsed()
+    print(
+        f"logs: {len(requests)} requests in {parser.lines} lines",
+        file=sys.stderr,
+    )
+    return requests
+
+
+class RouteMatcher:
+    """Maps paths to the route templates of the API."""
+
+    def __init__(self, templates: Iterable[str]) -> None:
+        """Initialize the matcher.
+
+        Args:
+            templates: Route path templates such as /api/videos/{video_id}
+        """
+        self.exact = {template for template in templates if "{" not in template}
+        self.templated = [
+            (compile_path(template)[0], template)
+            for template in templates
+            if "{" in template
+        ]
+
+    def route(self, path: str) -> str:
+        """Get the template matching a path (the path itself if none does)."""
+        if path in self.exact:
+            return path
+        for pattern, template in self.templated:
+            if pattern.match(path):
+                return template
+        return path
+
+
+async def route_matcher(client: httpx.AsyncClient) -> RouteMatcher:
+    """Build a matcher from the OpenAPI schema of the target, if it serves one."""
+    try:
+        response = await client.get("/openapi.json")
+        response.raise_for_status()
+        return RouteMatcher(response.json()["paths"])
+    except (httpx.HTTPError, ValueError, KeyError):
+        return RouteMatcher([])
+
+
+class ReplayRecorder:
+    """Latencies and outcomes of replayed requests per route."""
+
+    def __init__(self) -> None:
+        """Initialize an empty recorder."""
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter[str]] = defaultdict(Counter)
+
+    async def send(
+        self,
+        client: httpx.AsyncClient,
+        route: str,
+        request: LoggedRequest,
+        started: float,
+    ) -> None:
+        """Send a logged request and record its latency from started."""
+        try:
+            response = await client.get(request.path, params=request.query)
+            outcome = str(response.status_code)
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        self.statuses[route][outcome] += 1
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    requests: list[LoggedRequest],
+    matcher: RouteMatcher,
+    speed: float,
+) -> tuple[ReplayRecorder, float]:
+    """Send the requests on the recorded schedule, speed times faster.
+
+    Returns:
+        Recorder and the seconds the replay took
+    """
+    recorder = ReplayRecorder()
+    tasks = set()
+    first = requests[0].time or 0.0
+    start = time.perf_counter()
+    for request in requests:
+        scheduled = start + ((request.time or 0.0) - first) / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        route = request.route or matcher.route(request.path)
+        task = asyncio.create_task(recorder.send(client, route, request, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    return recorder, time.perf_counter() - start
+
+
+def logged_latencies(
+    requests: list[LoggedRequest], matcher: RouteMatcher
+) -> dict[str, dict[str, Any]]:
+    """Summarize the latencies the logs recorded per route."""
+    latencies: dict[str, list[float]] = defaultdict(list)
+    for request in requests:
+        if request.latency_ms is not None:
+            route = request.route or matcher.route(request.path)
+            latencies[route].append(request.latency_ms)
+    return {
+        route: {
+            "requests": len(values),
+            "p50_ms": round(percentile(sorted(values), 0.50), 2),
+            "p95_ms": round(percentile(sorted(values), 0.95), 2),
+        }
+        for route, values in latencies.items()
+    }
+
+
+def delta(current: float, reference: float) -> dict[str, float | None]:
+    """Difference of a latency from its reference, in ms and relative."""
+    return {
+        "ms": round(current - reference, 2),
+        "ratio": round(current / reference - 1, 4) if reference else None,
+    }
+
+
+def build_report(
+    recorder: ReplayRecorder,
+    elapsed: float,
+    references: dict[str, dict[str, Any]],
+    config: dict[str, Any],
+) -> dict[str, Any]:
+    """Build the JSON report of a replay.
+
+    Args:
+        recorder: Replayed requests
+        elapsed: Seconds the replay took
+        references: p50 and p95 per route to compare with
+        config: Settings of the replay
+
+    Returns:
+        Per-route and total results with their deltas from the references
+    """
+    routes = {}
+    for route in sorted(recorder.latencies):
+        result = summarize(recorder.latencies[route], recorder.statuses[route], elapsed)
+        reference = references.get(route)
+        if reference is not None:
+            result["reference"] = {
+                key: reference[key] for key in ("requests", "p50_ms", "p95_ms")
+            }
+            result["delta_p50"] = delta(result["p50_ms"], reference["p50_ms"])
+            result["delta_p95"] = delta(result["p95_ms"], reference["p95_ms"])
+        routes[route] = result
+
+    all_statuses: Counter[str] = Counter()
+    for statuses in recorder.statuses.values():
+        all_statuses.update(statuses)
+    total = summarize(
+        [value for values in recorder.latencies.values() for value in values],
+        all_statuses,
+        elapsed,
+    )
+    return {
+        "created_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        "config": config,
+        "elapsed_s": round(elapsed, 2),
+        "total": total,
+        "routes": routes,
+    }
+
+
+def format_delta(value: dict[str, float | None] | None) -> str:
+    """Format a delta as "+1.2 ms (+15%)"."""
+    if value is None:
+        return "-"
+    text = f"{value['ms']:+.2f} ms"
+    if value["ratio"] is not None:
+        text += f" ({value['ratio']:+.0%})"
+    return text
+
+
+def markdown_report(report: dict[str, Any]) -> str:
+    """Format a report as a Markdown table."""
+    config = report["config"]
+    lines = [
+        (
+            f"## Replay: {config['requests']} requests at {config['speed']}x, "
+            f"{report['elapsed_s']} s"
+        ),
+        "",
+        f"Target: {config['target']}  ",
+        f"Reference: {config['reference']}",
+        "",
+        (
+            "| route | requests | errors | p50 ms | p95 ms | ref p50 | ref p95 "
+            "| Δ p50 | Δ p95 |"
+        ),
+        (
+            "|-------|---------:|-------:|-------:|-------:|--------:|--------:"
+            "|------:|------:|"
+        ),
+    ]
+    for route, result in report["routes"].items():
+        reference = result.get("reference", {})
+        lines.append(
+            f"| {route} | {result['requests']} | "
+            f"{result['errors']} ({result['error_rate']:.2%}) | "
+            f"{result['p50_ms']} | {result['p95_ms']} | "
+            f"{reference.get('p50_ms', '-')} | {reference.get('p95_ms', '-')} | "
+            f"{format_delta(result.get('delta_p50'))} | "
+            f"{format_delta(result.get('delta_p95'))} |"
+        )
+    total = report["total"]
+    lines.append(
+        f"| **total** | {total['requests']} | "
+        f"{total['errors']} ({total['error_rate']:.2%}) | "
+        f"{total['p50_ms']} | {total['p95_ms']} | | | | |"
+    )
+    return "\n".join(lines) + "\n"
+
+
+def regressions(report: dict[str, Any], tolerance: float) -> list[str]:
+    """List the routes slower than the reference beyond the tolerance."""
+    lines = []
+    for route, result in report["routes"].items():
+        for name in ("delta_p50", "delta_p95"):
+            value = result.get(name)
+            if value is None or value["ms"] < LATENCY_NOISE_MS:
+                continue
+            if value["ratio"] is not None and value["ratio"] <= tolerance:
+                continue
+            lines.append(f"{route:<28} {name[-3:]} {format_delta(value)}")
+    return lines
+
+
+async def run_replay(
+    args: argparse.Namespace, url: str, requests: list[LoggedRequest]
+) -> dict[str, Any]:
+    """Warm the target up, replay the requests and build the report."""
+    async with httpx.AsyncClient(
+        base_url=url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+    ) as client:
+        matcher = await route_matcher(client)
+        for request in requests[: args.warmup]:
+            await client.get(request.path, params=request.query)
+        recorder, elapsed = await replay(client, requests, matcher, args.speed)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        references = baseline["routes"]
+        reference = f"replay {args.compare}"
+    else:
+        references = logged_latencies(requests, matcher)
+        reference = "latency recorded in the logs"
+
+    config = {
+        "target": url if args.url else f"main.py on {args.metadata_dir}",
+        "logs": [str(path) for path in args.logs],
+        "requests": len(requests),
+        "speed": args.speed,
+        "warmup": args.warmup,
+        "reference": reference,
+    }
+    return build_report(recorder, elapsed, references, config)
+
+
+def iter_replayable(
+    requests: list[LoggedRequest], limit: int | None
+) -> Iterator[LoggedRequest]:
+    """Yield the GET requests of the logs, up to limit of them."""
+    count = 0
+    for request in requests:
+        if limit is not None and count >= limit:
+            return
+        if request.method == "GET" and request.path:
+            count += 1
+            yield request
+
+
+def main() -> None:
+    """Run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", type=Path, nargs="+", help="log exports to replay")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="replay this many times faster than recorded (default: 1)",
+    )
+    parser.add_argument("--limit", type=int, help="replay the first N requests")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=20,
+        help="requests sent one by one before the replay, not counted",
+    )
+    parser.add_argument(
+        "--base-path",
+        default="/v1",
+        help="stage prefix removed from logged paths (default: /v1)",
+    )
+    parser.add_argument(
+        "--metadata-dir",
+        type=Path,
+        default=METADATA_DIR,
+        help="catalog the server loads",
+    )
+    parser.add_argument("--url", help="replay against a running server")
+    parser.add_argument("--timeout", type=float, default=30, help="request timeout")
+    parser.add_argument("--compare", type=Path, help="earlier replay report (JSON)")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase over the reference with --compare",
+    )
+    parser.add_argument("--json", type=Path, help="write the report as JSON")
+    parser.add_argument("--markdown", type=Path, help="write the report as Markdown")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    requests = list(iter_replayable(read_logs(args.logs, args.base_path), args.limit))
+    if not requests:
+        parser.error("no GET requests found in the logs")
+
+    if args.url:
+        report = asyncio.run(run_replay(args, args.url, requests))
+    else:
+        with local_server(args.metadata_dir) as url:
+            report = asyncio.run(run_replay(args, url, requests))
+
+    markdown = markdown_report(report)
+    print(markdown)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.markdown:
+        args.markdown.write_text(markdown, encoding="utf-8")
+
+    if args.compare:
+        lines = regressions(report, args.tolerance)
+        print(
+            f"{len(lines)} regression(s) beyond {args.tolerance:.0%} "
+            f"against {args.compare}"
+        )
+        for line in lines:
+            print(line)
+        if lines:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
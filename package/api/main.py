@@ -1,12 +1,57 @@
-"""Development server for FastAPI application."""
+"""Development server for FastAPI application.
+
+Serves the API from the local storage backend, seeded with the repository's
+metadata/ directory, so no AWS account or network access is needed. Set
+STORAGE_BACKEND=dynamodb (with AWS credentials) to read the real table.
+
+Usage:
+    python main.py [--port N] [--metadata-dir DIR] [--no-reload]
+"""
+
+import argparse
+import os
+from pathlib import Path
 
 import uvicorn
 
-if __name__ == "__main__":
+ROOT = Path(__file__).resolve().parent
+
+
+def main() -> None:
+    """Run the development server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0", help="address to bind")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    parser.add_argument(
+        "--metadata-dir",
+        type=Path,
+        help="metadata directory the local backend serves (default: the "
+        "repository's metadata/)",
+    )
+    parser.add_argument(
+        "--no-reload",
+        action="store_true",
+        help="do not restart on code changes (for load tests)",
+    )
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    args = parser.parse_args()
+
+    os.environ.setdefault("PROJECT_SEMANTIC_VERSION", "0.0.0-dev")
+    os.environ.setdefault("PROJECT_MAJOR_VERSION", "0")
+    os.environ.setdefault("STORAGE_BACKEND", "local")
+    if args.metadata_dir is not None:
+        os.environ["LOCAL_METADATA_DIR"] = str(args.metadata_dir)
+    os.environ.setdefault("LOCAL_METADATA_DIR", str(ROOT.parents[1] / "metadata"))
+
     uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info",
-    )
\ No newline at end of file
+        "main:app",
+        app_dir=str(ROOT / "app"),
+        host=args.host,
+        port=args.port,
+        reload=not args.no_reload,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 os.environ["DYNAMODB_TABLE_NAME"] = "test-videos-table"
 os.environ["PROJECT_SEMANTIC_VERSION"] = "1.0.0-test"
 os.environ["PROJECT_MAJOR_VERSION"] = "v1"
+os.environ["METRICS_SINK"] = "memory"
+os.environ["SERVER_TIMING_ENABLED"] = "true"
 
 from app.main import app  # noqa: E402
 from app.models.video import Video  # noqa: E402
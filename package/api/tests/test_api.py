@@ -1,14 +1,23 @@
 """Integration tests for API endpoints."""
 
+import base64
+import gzip
 import json
+from datetime import UTC, datetime
 from decimal import Decimal
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
+from mangum import Mangum
 
-from app.main import app
+from app.main import app, metrics_sink
+from app.middleware.compression import choose_encoding
+from app.middleware.metrics import UNMATCHED_ROUTE, MemorySink, MetricsMiddleware
+from app.middleware.routing import RouteResolver
 from app.models.video import TagNode, Video
+from app.routers.videos import _storage
 from app.services.dynamodb_service import DynamoDBService
 
 
@@ -92,6 +101,36 @@ class TestVideoEndpoints:
         assert len(data["items"]) == 0
         assert data["last_key"] is None
 
+    @patch("routers.videos.db_service")
+    def test_get_videos_by_year_with_date_range(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test from/to bounds are parsed and passed to the service."""
+        mock_db.get_videos_by_year = AsyncMock(return_value=([], None))
+
+        response = client.get(
+            "/api/videos?year=2024&from=2024-03-01T00:00:00Z&to=2024-03-31"
+        )
+
+        assert response.status_code == 200
+        kwargs = mock_db.get_videos_by_year.call_args.kwargs
+        assert kwargs["date_from"] == datetime(2024, 3, 1, tzinfo=UTC)
+        assert kwargs["date_to"] == datetime(2024, 3, 31)
+
+    @patch("routers.videos.db_service")
+    def test_get_videos_by_year_invalid_date_range(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test invalid from/to bounds are rejected."""
+        mock_db.get_videos_by_year = AsyncMock(side_effect=ValueError("bad range"))
+
+        response = client.get("/api/videos?year=2024&from=2024-04-01&to=2024-03-01")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "bad range"
+
+        response = client.get("/api/videos?year=2024&from=yesterday")
+        assert response.status_code == 422
+
     def test_get_videos_by_year_missing_year(self, client: TestClient) -> None:
         """Test get videos by year without year parameter."""
         response = client.get("/api/videos")
@@ -130,6 +169,8 @@ class TestVideoEndpoints:
             },
             {"name": "雑談", "children": None, "count": 10},
         ]
+        mock_db.get_tag_tree_gzip = AsyncMock(return_value=None)
+        mock_db.get_tag_tree_json = AsyncMock(return_value=None)
         mock_db.build_tag_tree = AsyncMock(return_value=mock_tags)
 
         response = client.get("/api/tags")
@@ -141,6 +182,56 @@ class TestVideoEndpoints:
         assert len(data["tree"][0]["children"]) == 2
         assert data["tree"][1]["name"] == "雑談"
 
+    @patch("routers.videos.db_service")
+    def test_get_tag_tree_materialized(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test the materialized tag tree is served without rebuilding it."""
+        body = json.dumps(
+            {"tree": [{"name": "雑談", "children": None, "count": 10}]},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        mock_db.get_tag_tree_gzip = AsyncMock(return_value=None)
+        mock_db.get_tag_tree_json = AsyncMock(return_value=body)
+        mock_db.build_tag_tree = AsyncMock()
+
+        response = client.get("/api/tags")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == body
+        mock_db.build_tag_tree.assert_not_called()
+
+    @patch("routers.videos.db_service")
+    def test_get_tag_tree_stored_gzip(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test the stored gzip tag tree is sent without recompressing it."""
+        body = json.dumps(
+            {"tree": [{"name": "雑談", "children": None, "count": 10}]},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        stored = gzip.compress(body, mtime=0)
+        mock_db.get_catalog_version = AsyncMock(return_value="v1")
+        mock_db.get_tag_tree_gzip = AsyncMock(return_value=stored)
+        mock_db.get_tag_tree_json = AsyncMock()
+
+        with patch("middleware.compression.gzip.compress") as compress:
+            response = client.get("/api/tags", headers={"Accept-Encoding": "gzip"})
+        compress.assert_not_called()
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].startswith("W/")
+        assert response.content == body
+        mock_db.get_tag_tree_json.assert_not_called()
+
+        # Clients not accepting gzip get the decompressed tree
+        mock_db.get_tag_tree_json = AsyncMock(return_value=body)
+        response = client.get("/api/tags", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == body
+
     @patch("routers.videos.db_service")
     def test_get_videos_by_tag_success(
         self, mock_db: MagicMock, client: TestClient
@@ -164,20 +255,116 @@ class TestVideoEndpoints:
                 "created_at": None,
             },
         ]
-        mock_db.get_videos_by_tag_path = AsyncMock(return_value=mock_videos)
+        mock_db.get_videos_by_tag_path = AsyncMock(
+            return_value=(mock_videos, '{"SK": "VIDEO#horror2"}')
+        )
+        mock_db.count_videos_by_tag_path = AsyncMock(return_value=10)
 
-        response = client.get("/api/videos/by-tag?path=ゲーム実況/ホラー")
+        response = client.get("/api/videos/by-tag?path=ゲーム実況/ホラー&limit=2")
 
         assert response.status_code == 200
         data = response.json()
         assert len(data["items"]) == 2
         assert all("ホラー" in item["tags"] for item in data["items"])
+        assert data["last_key"] == '{"SK": "VIDEO#horror2"}'
+        # The total is only counted on request
+        assert "total" not in data
+        mock_db.count_videos_by_tag_path.assert_not_called()
+        mock_db.get_videos_by_tag_path.assert_called_once_with(
+            "ゲーム実況/ホラー", limit=2, last_key=None
+        )
+
+    @patch("routers.videos.db_service")
+    def test_get_videos_by_tag_with_total(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test get videos by tag with the total count."""
+        mock_db.get_videos_by_tag_path = AsyncMock(return_value=([], None))
+        mock_db.count_videos_by_tag_path = AsyncMock(return_value=10)
+
+        response = client.get(
+            "/api/videos/by-tag",
+            params={"path": "雑談", "last_key": "{}", "include_total": "true"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "last_key": None, "total": 10}
+        mock_db.get_videos_by_tag_path.assert_called_once_with(
+            "雑談", limit=50, last_key="{}"
+        )
+        mock_db.count_videos_by_tag_path.assert_called_once_with("雑談")
+
+    @patch("routers.videos.db_service")
+    def test_get_videos_by_tag_invalid_last_key(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test get videos by tag with a malformed last_key."""
+        mock_db.get_videos_by_tag_path = AsyncMock(
+            side_effect=ValueError("Invalid last_key: x")
+        )
+
+        response = client.get("/api/videos/by-tag?path=雑談&last_key=x")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid last_key: x"
+
+    def test_get_videos_by_tag_invalid_limit(self, client: TestClient) -> None:
+        """Test get videos by tag with an out-of-range limit."""
+        response = client.get("/api/videos/by-tag?path=雑談&limit=101")
+        assert response.status_code == 422
 
     def test_get_videos_by_tag_missing_path(self, client: TestClient) -> None:
         """Test get videos by tag without path parameter."""
         response = client.get("/api/videos/by-tag")
         assert response.status_code == 422
 
+    @patch("routers.videos.db_service")
+    def test_search_videos_success(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test successful title search."""
+        mock_videos = [
+            {
+                "video_id": "kart1",
+                "title": "【マリカ】視聴者参加型",
+                "tags": ["ゲーム実況", "マリオカート"],
+                "year": 2024,
+                "thumbnail_url": None,
+                "created_at": None,
+            }
+        ]
+        mock_db.search_videos = AsyncMock(
+            return_value=(mock_videos, '{"offset": 1}', 3)
+        )
+
+        response = client.get("/api/videos/search", params={"q": "まりか", "limit": 1})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "items": mock_videos,
+            "last_key": '{"offset": 1}',
+            "total": 3,
+        }
+        mock_db.search_videos.assert_called_once_with("まりか", limit=1, last_key=None)
+
+    @patch("routers.videos.db_service")
+    def test_search_videos_invalid_last_key(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test title search with a malformed last_key."""
+        mock_db.search_videos = AsyncMock(side_effect=ValueError("Invalid last_key: x"))
+
+        response = client.get("/api/videos/search?q=ASMR&last_key=x")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid last_key: x"
+
+    @pytest.mark.parametrize("query", ["", "x" * 101])
+    def test_search_videos_invalid_query(self, client: TestClient, query: str) -> None:
+        """Test title search with an empty or overlong query."""
+        response = client.get("/api/videos/search", params={"q": query})
+        assert response.status_code == 422
+
     @patch("routers.videos.db_service")
     def test_get_random_videos_success(
         self, mock_db: MagicMock, client: TestClient
@@ -271,6 +458,88 @@ class TestVideoEndpoints:
         response = client.get("/api/videos/memory?pairs=21")
         assert response.status_code == 422
 
+    @patch("routers.videos.db_service")
+    def test_get_latest_videos_success(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test the cross-year feed returns the page and next cursor."""
+        videos = [
+            {"video_id": video_id, "title": video_id, "tags": [], "year": year}
+            for video_id, year in (("new", 2024), ("old", 2023))
+        ]
+        mock_db.get_latest_videos = AsyncMock(return_value=(videos, "cursor2"))
+
+        response = client.get("/api/videos/latest?limit=2&last_key=cursor1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [v["video_id"] for v in data["items"]] == ["new", "old"]
+        assert data["last_key"] == "cursor2"
+        mock_db.get_latest_videos.assert_called_once_with(limit=2, cursor="cursor1")
+
+    @patch("routers.videos.db_service")
+    def test_get_latest_videos_invalid_cursor(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test a malformed cursor is reported as a bad request."""
+        mock_db.get_latest_videos = AsyncMock(
+            side_effect=ValueError("Invalid last_key: x")
+        )
+
+        response = client.get("/api/videos/latest?last_key=x")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid last_key: x"
+
+    @patch("routers.videos.db_service")
+    def test_get_latest_videos_db_error(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test the cross-year feed with database error."""
+        mock_db.get_latest_videos = AsyncMock(side_effect=RuntimeError("DB error"))
+
+        response = client.get("/api/videos/latest")
+
+        assert response.status_code == 500
+
+    @patch("routers.videos.db_service")
+    def test_get_videos_by_ids_success(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test batch lookup passes the IDs in order and returns the videos."""
+        videos = [
+            {"video_id": video_id, "title": video_id, "tags": [], "year": 2024}
+            for video_id in ("b", "a")
+        ]
+        mock_db.get_videos_by_ids = AsyncMock(return_value=videos)
+
+        response = client.get("/api/videos/batch?ids=b, a,,")
+
+        assert response.status_code == 200
+        assert [v["video_id"] for v in response.json()["items"]] == ["b", "a"]
+        mock_db.get_videos_by_ids.assert_called_once_with(["b", "a"])
+
+    def test_get_videos_by_ids_invalid(self, client: TestClient) -> None:
+        """Test batch lookup rejects missing, empty and oversized ID lists."""
+        assert client.get("/api/videos/batch").status_code == 422
+        assert client.get("/api/videos/batch?ids=,").status_code == 400
+
+        ids = ",".join(f"v{i}" for i in range(201))
+        response = client.get(f"/api/videos/batch?ids={ids}")
+        assert response.status_code == 400
+
+    @patch("routers.videos.db_service")
+    def test_get_videos_by_ids_db_error(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test batch lookup with database error."""
+        mock_db.get_videos_by_ids = AsyncMock(side_effect=RuntimeError("DB error"))
+
+        response = client.get("/api/videos/batch?ids=a")
+
+        assert response.status_code == 500
+        assert "DB error" in response.json()["detail"]
+
     @patch("routers.videos.db_service")
     def test_get_video_by_id_success(
         self, mock_db: MagicMock, client: TestClient
@@ -393,3 +662,519 @@ class TestCORSHeaders:
         assert "access-control-allow-origin" in response.headers
         assert "access-control-allow-methods" in response.headers
         assert "GET" in response.headers["access-control-allow-methods"]
+
+
+class TestConditionalRequests:
+    """Test cases for ETag, If-None-Match and Cache-Control handling."""
+
+    @pytest.fixture
+    def mock_db(self) -> Any:
+        """Patch the DynamoDB service with a fixed catalog version."""
+        with patch("routers.videos.db_service") as mock_db:
+            mock_db.get_catalog_version = AsyncMock(return_value="v1")
+            mock_db.get_tag_tree_gzip = AsyncMock(return_value=None)
+            mock_db.get_tag_tree_json = AsyncMock(return_value=b'{"tree":[]}')
+            mock_db.get_random_videos = AsyncMock(return_value=[])
+            yield mock_db
+
+    def test_etag_and_cache_control(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test catalog reads carry a strong ETag and their cache policy."""
+        identity = {"Accept-Encoding": "identity"}
+        response = client.get("/api/tags", headers=identity)
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=300"
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+
+        # The ETag depends on the URL as well as the catalog version
+        other = client.get("/api/tags?x=1", headers=identity)
+        assert other.headers["etag"] != etag
+
+        # Responses that may be compressed carry the weak form
+        encoded = client.get("/api/tags", headers={"Accept-Encoding": "gzip"})
+        assert encoded.headers["etag"] == f"W/{etag}"
+
+    def test_not_modified_skips_route(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test a matching If-None-Match returns 304 without reading data."""
+        etag = client.get("/api/tags").headers["etag"]
+        mock_db.get_tag_tree_json.reset_mock()
+
+        response = client.get(
+            "/api/tags",
+            headers={"If-None-Match": f'"other", {etag}', "Origin": "http://x"},
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        # The 304 of a compressible resource carries the 200's weak ETag
+        assert etag.startswith("W/")
+        assert response.headers["etag"] == etag
+        # CORS wraps the early answer too (the value varies with Starlette)
+        assert "access-control-allow-origin" in response.headers
+        mock_db.get_tag_tree_json.assert_not_called()
+
+    def test_new_catalog_version_changes_etag(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test an import invalidates the ETags clients hold."""
+        etag = client.get("/api/tags").headers["etag"]
+        mock_db.get_catalog_version = AsyncMock(return_value="v2")
+
+        response = client.get("/api/tags", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_random_routes_are_not_cached(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test random picks get no-store and no ETag."""
+        response = client.get("/api/videos/random")
+
+        assert response.headers["cache-control"] == "no-store"
+        assert "etag" not in response.headers
+        mock_db.get_catalog_version.assert_not_called()
+
+    def test_errors_get_no_validators(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test error responses are not marked cacheable."""
+        mock_db.get_video_by_id = AsyncMock(return_value=None)
+
+        response = client.get("/api/videos/missing")
+
+        assert response.status_code == 404
+        assert "etag" not in response.headers
+        assert "cache-control" not in response.headers
+
+    def test_version_failure_serves_without_etag(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test a failed version lookup does not fail the request."""
+        mock_db.get_catalog_version = AsyncMock(side_effect=RuntimeError("boom"))
+
+        response = client.get("/api/tags", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "public, max-age=300"
+
+    def test_route_resolver(self) -> None:
+        """Test request paths resolve to route templates below the mount point."""
+        resolver = RouteResolver(["/api/videos/{video_id}", "/api/videos/latest"])
+
+        def scope(path: str, root_path: str = "") -> dict[str, Any]:
+            return {"path": path, "root_path": root_path}
+
+        assert resolver.resolve(scope("/api/videos/latest")) == "/api/videos/latest"
+        assert resolver.resolve(scope("/api/videos/abc")) == "/api/videos/{video_id}"
+        assert (
+            resolver.resolve(scope("/v1/api/videos/latest", root_path="/v1"))
+            == "/api/videos/latest"
+        )
+        assert resolver.resolve(scope("/api/tags")) is None
+
+
+class TestCompression:
+    """Test cases for negotiated response compression."""
+
+    @pytest.fixture
+    def mock_db(self) -> Any:
+        """Patch the DynamoDB service with a large and a small response."""
+        tree = {
+            "tree": [
+                {"name": f"ゲーム実況{i}", "count": i, "children": []}
+                for i in range(200)
+            ]
+        }
+        with patch("routers.videos.db_service") as mock_db:
+            mock_db.get_catalog_version = AsyncMock(return_value="v1")
+            mock_db.get_tag_tree_gzip = AsyncMock(return_value=None)
+            mock_db.get_tag_tree_json = AsyncMock(
+                return_value=json.dumps(tree, ensure_ascii=False).encode()
+            )
+            mock_db.get_random_videos = AsyncMock(return_value=[])
+            yield mock_db
+
+    @staticmethod
+    def _lambda_event(path: str, headers: dict[str, str]) -> dict[str, Any]:
+        """Create an API Gateway REST API proxy event."""
+        return {
+            "resource": "/{proxy+}",
+            "path": path,
+            "httpMethod": "GET",
+            "headers": {"Host": "api.example.com", **headers},
+            "multiValueHeaders": {},
+            "queryStringParameters": None,
+            "multiValueQueryStringParameters": None,
+            "pathParameters": None,
+            "stageVariables": None,
+            "requestContext": {
+                "resourcePath": "/{proxy+}",
+                "httpMethod": "GET",
+                "path": path,
+                "stage": "v1",
+                "identity": {"sourceIp": "192.0.2.1"},
+            },
+            "body": None,
+            "isBase64Encoded": False,
+        }
+
+    def test_gzip_large_response(self, mock_db: MagicMock, client: TestClient) -> None:
+        """Test a large JSON body is gzipped with a weak ETag."""
+        plain = client.get("/api/tags", headers={"Accept-Encoding": "identity"})
+        response = client.get("/api/tags", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in plain.headers
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(plain.content) / 2
+        assert response.json() == plain.json()
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"] == f"W/{plain.headers['etag']}"
+
+        # The weak ETag still validates the resource
+        revalidated = client.get(
+            "/api/tags",
+            headers={
+                "Accept-Encoding": "gzip",
+                "If-None-Match": response.headers["etag"],
+            },
+        )
+        assert revalidated.status_code == 304
+        assert "Accept-Encoding" in revalidated.headers["vary"]
+
+    def test_brotli_preferred(self, mock_db: MagicMock, client: TestClient) -> None:
+        """Test brotli is used when the client accepts it."""
+        pytest.importorskip("brotli")
+
+        response = client.get("/api/tags", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.json()["tree"][0]["name"] == "ゲーム実況0"
+
+    def test_small_response_not_compressed(
+        self, mock_db: MagicMock, client: TestClient
+    ) -> None:
+        """Test bodies under the size threshold are sent as is."""
+        response = client.get("/api/videos/random", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+
+    @pytest.mark.parametrize(
+        ("accept_encoding", "expected"),
+        [
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("br, gzip", "br"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("*", "br"),
+            ("*, br;q=0", "gzip"),
+            ("gzip;q=bogus", None),
+        ],
+    )
+    def test_choose_encoding(self, accept_encoding: str, expected: str | None) -> None:
+        """Test Accept-Encoding negotiation honours q-values."""
+        assert choose_encoding(accept_encoding, ("br", "gzip")) == expected
+
+    def test_compressed_body_through_mangum(self, mock_db: MagicMock) -> None:
+        """Test Mangum returns compressed bodies base64-encoded."""
+        handler = Mangum(app, lifespan="off")
+        context = MagicMock(aws_request_id="request-id")
+
+        response = handler(
+            self._lambda_event("/api/tags", {"Accept-Encoding": "gzip"}), context
+        )
+
+        assert response["statusCode"] == 200
+        assert response["isBase64Encoded"] is True
+        headers = response["multiValueHeaders"] | response["headers"]
+        assert headers["content-encoding"] in ("gzip", ["gzip"])
+        body = gzip.decompress(base64.b64decode(response["body"]))
+        assert json.loads(body)["tree"][0]["name"] == "ゲーム実況0"
+
+
+class TestMetrics:
+    """Test cases for the per-request EMF metrics."""
+
+    @pytest.fixture
+    def sink(self) -> Any:
+        """Give each test an empty view of the records the app emits."""
+        metrics_sink.clear()
+        yield metrics_sink
+        metrics_sink.clear()
+
+    @staticmethod
+    def _metric_names(record: dict[str, Any]) -> list[str]:
+        """List the metric names an EMF record declares."""
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        return [metric["Name"] for metric in directive["Metrics"]]
+
+    @patch("routers.videos.db_service")
+    def test_record_per_request(
+        self, mock_db: MagicMock, sink: MemorySink, client: TestClient
+    ) -> None:
+        """Test each request emits one record labelled with its route template."""
+        mock_db.get_catalog_version = AsyncMock(return_value=None)
+        mock_db.get_video_by_id = AsyncMock(return_value=None)
+
+        response = client.get("/api/videos/abc")
+
+        assert response.status_code == 404
+        assert len(sink.records) == 1
+        record = sink.records[0]
+        assert record["route"] == "/api/videos/{video_id}"
+        assert record["status_code"] == 404
+        assert record["method"] == "GET"
+        assert record["cold_start"] in ("true", "false")
+        assert record["DynamoDBCalls"] == [0.0]
+        assert record["Latency"][0] > 0
+        assert self._metric_names(record) == [
+            "Latency",
+            "DynamoDBCalls",
+            "DynamoDBScannedCount",
+            "DynamoDBCount",
+            "DynamoDBConsumedCapacity",
+            "CatalogCacheHits",
+            "CatalogCacheMisses",
+            "CatalogCacheBypasses",
+            "CatalogCachedItems",
+        ]
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Dimensions"] == [["route", "cold_start", "service"]]
+
+    @patch("routers.videos.db_service")
+    def test_not_modified_labelled_with_route(
+        self, mock_db: MagicMock, sink: MemorySink, client: TestClient
+    ) -> None:
+        """Test 304s answered before routing still carry their route."""
+        mock_db.get_catalog_version = AsyncMock(return_value="v1")
+        mock_db.get_video_by_id = AsyncMock(
+            return_value=Video(video_id="abc", title="A", tags=[], year=2024)
+        )
+        etag = client.get("/api/videos/abc").headers["etag"]
+
+        response = client.get("/api/videos/abc", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert [r["route"] for r in sink.records] == ["/api/videos/{video_id}"] * 2
+        assert sink.records[1]["status_code"] == 304
+
+    def test_unmatched_route(self, sink: MemorySink, client: TestClient) -> None:
+        """Test unknown paths share one route label."""
+        response = client.get("/no/such/path")
+
+        assert response.status_code == 404
+        assert sink.records[0]["route"] == UNMATCHED_ROUTE
+
+    def test_cold_start_dimension(self) -> None:
+        """Test only the first request of a container is a cold start."""
+        sink = MemorySink()
+
+        async def ok(scope: Any, receive: Any, send: Any) -> None:
+            await send({"type": "http.response.start", "status": 204})
+            await send({"type": "http.response.body", "body": b""})
+
+        metrics_client = TestClient(
+            MetricsMiddleware(ok, namespace="test", service="test", sink=sink)
+        )
+        metrics_client.get("/")
+        metrics_client.get("/")
+
+        assert [r["cold_start"] for r in sink.records] == ["true", "false"]
+        assert sink.records[0]["status_code"] == 204
+
+    def test_catalog_cache_counters(self) -> None:
+        """Test records carry the change in the cache counters per request."""
+        sink = MemorySink()
+        stats = {"hits": 3, "misses": 1, "bypasses": 5, "cached_items": 10}
+
+        async def hit(scope: Any, receive: Any, send: Any) -> None:
+            stats["hits"] += 2
+            await send({"type": "http.response.start", "status": 204})
+            await send({"type": "http.response.body", "body": b""})
+
+        metrics_client = TestClient(
+            MetricsMiddleware(
+                hit,
+                namespace="test",
+                service="test",
+                sink=sink,
+                cache_stats=lambda: dict(stats),
+            )
+        )
+        metrics_client.get("/")
+
+        record = sink.records[0]
+        assert record["CatalogCacheHits"] == [2.0]
+        assert record["CatalogCacheMisses"] == [0.0]
+        assert record["CatalogCacheBypasses"] == [0.0]
+        assert record["CatalogCachedItems"] == [10.0]
+
+    def test_request_id_through_mangum(self, sink: MemorySink) -> None:
+        """Test records carry the Lambda request ID."""
+        handler = Mangum(app, lifespan="off")
+        context = MagicMock(aws_request_id="request-id")
+
+        handler(TestCompression._lambda_event("/health", {}), context)
+
+        assert sink.records[0]["request_id"] == "request-id"
+        assert sink.records[0]["route"] == "/health"
+
+
+class TestServerTimingHeader:
+    """Test cases for the Server-Timing response header."""
+
+    @patch("routers.videos.db_service")
+    def test_phases_in_header(self, mock_db: MagicMock, client: TestClient) -> None:
+        """Test responses report the phases they went through."""
+        mock_db.get_catalog_version = AsyncMock(return_value=None)
+        mock_db.get_random_videos = AsyncMock(
+            return_value=[
+                Video(video_id=f"v{i}", title="動画" * 50, tags=[], year=2024)
+                for i in range(20)
+            ]
+        )
+
+        response = client.get(
+            "/api/videos/random?count=20", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        phases = [
+            entry.split(";")[0]
+            for entry in response.headers["server-timing"].split(", ")
+        ]
+        assert phases == ["encode", "compress", "total"]
+        assert response.headers["timing-allow-origin"] == "*"
+
+    def test_service_phases(self, client: TestClient) -> None:
+        """Test phases timed by the service on its worker threads are reported."""
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {}
+        mock_table.query.return_value = {
+            "Items": [{"video_id": "a", "title": "A", "year": Decimal("2024")}]
+        }
+
+        with patch("routers.videos.db_service._table", mock_table):
+            response = client.get("/api/videos?year=2024")
+
+        assert response.status_code == 200
+        phases = [
+            entry.split(";")[0]
+            for entry in response.headers["server-timing"].split(", ")
+        ]
+        assert phases == ["convert", "encode", "total"]
+
+    def test_not_modified_has_total(self, client: TestClient) -> None:
+        """Test even responses without instrumented phases carry the total."""
+        response = client.get("/health")
+
+        assert response.headers["server-timing"].startswith("total;dur=")
+
+
+class TestSerialization:
+    """Test cases for the trusted serialization path."""
+
+    def test_body_matches_response_model(self, client: TestClient) -> None:
+        """Test the fast path writes what response_model would have."""
+        videos = [
+            Video(
+                video_id=f"v{i}",
+                title=f"【ゲーム実況】テスト {i}",
+                tags=["ゲーム実況", "ホラー"],
+                year=2024,
+                created_at="2024-01-01T00:00:00Z",
+            )
+            for i in range(3)
+        ]
+        with patch("routers.videos.db_service") as mock_db:
+            mock_db.get_catalog_version = AsyncMock(return_value=None)
+            mock_db.get_latest_videos = AsyncMock(return_value=(videos, "next"))
+            response = client.get("/api/videos/latest")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        expected = {"items": [v.model_dump() for v in videos], "last_key": "next"}
+        assert response.json() == expected
+
+    def test_openapi_keeps_response_models(self, client: TestClient) -> None:
+        """Test routes still document their response models."""
+        paths = client.get("/openapi.json").json()["paths"]
+
+        def schema(path: str) -> Any:
+            content = paths[path]["get"]["responses"]["200"]["content"]
+            return content["application/json"]["schema"]
+
+        assert schema("/api/videos") == {"$ref": "#/components/schemas/VideosResponse"}
+        assert schema("/api/tags") == {"$ref": "#/components/schemas/TagsResponse"}
+        assert schema("/api/videos/{video_id}") == {
+            "$ref": "#/components/schemas/Video"
+        }
+
+
+class TestStorageBackend:
+    """Test cases for selecting the storage backend."""
+
+    def test_default_is_dynamodb(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test DynamoDB is used unless STORAGE_BACKEND says otherwise."""
+        monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+
+        assert _storage() is None
+
+    def test_local_backend_serves_metadata(
+        self,
+        client: TestClient,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Any,
+    ) -> None:
+        """Test the local backend is seeded from LOCAL_METADATA_DIR."""
+        (tmp_path / "20240101-000000#v1.json").write_text(
+            json.dumps(
+                [
+                    {
+                        "video_id": "v1",
+                        "title": "【雑談】ローカル配信",
+                        "tags": ["雑談", "フリートーク"],
+                        "published_at": "2024-01-01T00:00:00Z",
+                        "duration": "PT1H",
+                    }
+                ]
+            ),
+            encoding="utf-8",
+        )
+        monkeypatch.setenv("STORAGE_BACKEND", "local")
+        monkeypatch.setenv("LOCAL_METADATA_DIR", str(tmp_path))
+        resource = _storage()
+        service = DynamoDBService("test-videos-table", resource=resource)
+
+        try:
+            with patch("routers.videos.db_service", service):
+                tags = client.get("/api/tags").json()
+                search = client.get("/api/videos/search?q=ろーかる").json()
+                bad_year_key = client.get("/api/videos?year=2024&last_key=%7B")
+                bad_feed_key = client.get("/api/videos/latest?last_key=e30")
+        finally:
+            resource.close()
+
+        assert tags["tree"][0]["name"] == "雑談"
+        assert [video["video_id"] for video in search["items"]] == ["v1"]
+        # Malformed cursors are client errors that do not echo parser messages
+        assert bad_year_key.status_code == 400
+        assert bad_year_key.json()["detail"] == "Invalid last_key: {"
+        assert bad_feed_key.status_code == 400
+        assert bad_feed_key.json()["detail"] == "Invalid last_key: e30"
+
+    def test_unknown_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test an unknown STORAGE_BACKEND fails at startup."""
+        monkeypatch.setenv("STORAGE_BACKEND", "postgres")
+
+        with pytest.raises(ValueError, match="Unknown STORAGE_BACKEND"):
+            _storage()
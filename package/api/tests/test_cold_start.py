@@ -0,0 +1,89 @@
+"""Tests for Lambda cold start behaviour."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from mangum import Mangum
+
+import app.main as main
+
+APP_DIR = Path(__file__).parent.parent / "app"
+
+# Budget for importing the handler module in a fresh interpreter; raise it with
+# COLD_START_BUDGET_SECONDS on slow CI runners rather than deleting the test
+COLD_START_BUDGET_SECONDS = float(os.getenv("COLD_START_BUDGET_SECONDS", "2.0"))
+
+
+def run_cold(code: str, **env: str) -> dict[str, Any]:
+    """Import main in a fresh interpreter and run code printing JSON."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=APP_DIR,
+        env={
+            **os.environ,
+            "PYTHONPATH": str(APP_DIR),
+            "AWS_DEFAULT_REGION": "us-east-1",
+            "DYNAMODB_TABLE_NAME": "test-videos-table",
+            "PROJECT_SEMANTIC_VERSION": "1.0.0-test",
+            "PROJECT_MAJOR_VERSION": "v1",
+            **env,
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return dict(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+class TestColdStart:
+    """Test cases for the work done while a Lambda container starts."""
+
+    def test_init_within_budget(self) -> None:
+        """Test importing the handler module stays within the init budget."""
+        result = run_cold(
+            "import json, time\n"
+            "started = time.perf_counter()\n"
+            "import main\n"
+            "elapsed = time.perf_counter() - started\n"
+            "from routers.videos import db_service\n"
+            "print(json.dumps({'seconds': elapsed, "
+            "'resource': db_service._dynamodb is not None}))\n"
+        )
+
+        assert result["seconds"] < COLD_START_BUDGET_SECONDS, (
+            f"import main took {result['seconds']:.2f}s, "
+            f"budget is {COLD_START_BUDGET_SECONDS}s "
+            "(see benchmarks/profile_imports.py)"
+        )
+        # The boto3 resource is built by the first DynamoDB call, not at init
+        assert result["resource"] is False
+
+    def test_docs_can_be_disabled(self) -> None:
+        """Test API_DOCS_ENABLED=false removes the docs and OpenAPI routes."""
+        result = run_cold(
+            "import json, main\n"
+            "paths = [getattr(r, 'path', '') for r in main.app.routes]\n"
+            "print(json.dumps({'paths': paths}))\n",
+            API_DOCS_ENABLED="false",
+        )
+
+        assert "/docs" not in result["paths"]
+        assert "/openapi.json" not in result["paths"]
+        assert "/health" in result["paths"]
+
+    def test_handler_reuses_adapter(self) -> None:
+        """Test warm invocations share the adapter built at import time."""
+        assert isinstance(main.lambda_adapter, Mangum)
+        context = MagicMock(function_name="diopside", aws_request_id="request-id")
+
+        with patch.object(main, "lambda_adapter") as adapter:
+            adapter.return_value = {"statusCode": 200}
+            main.handler({"path": "/health"}, context)
+            main.handler({"path": "/health"}, context)
+
+        assert adapter.call_count == 2
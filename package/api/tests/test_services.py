@@ -1,15 +1,54 @@
 """Unit tests for DynamoDB service."""
 
+import asyncio
+import base64
+import gzip
 import json
+import random
+import threading
+import time
+from datetime import UTC, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any
+from functools import partial
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import boto3
 import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import Binary
 from botocore.exceptions import ClientError
+from botocore.stub import Stubber
 
 from app.models.video import TagNode, Video
-from app.services.dynamodb_service import DecimalEncoder, DynamoDBService
+from app.services.catalog_cache import CatalogCache, CatalogSnapshot
+from app.services.catalog_layout import add_tags_to_tree, tag_tree_nodes
+from app.services.concurrency import SingleFlight, fan_out
+from app.services.dynamodb_service import (
+    VIDEO_ITEM_FILTER,
+    VIDEO_SCAN_INDEX,
+    DecimalEncoder,
+    DynamoDBService,
+)
+from app.services.local_storage import (
+    PAGE_BYTES,
+    LocalDynamoDB,
+    LocalTable,
+    seed_videos,
+)
+from app.services.request_metrics import (
+    DynamoDBUsage,
+    instrument_client,
+    track_dynamodb_usage,
+)
+from app.services.search_index import TitleIndex, normalize
+from app.services.serialization import dumps
+from app.services.timing import (
+    ServerTiming,
+    span,
+    time_client_calls,
+    track_server_timing,
+)
 
 
 class TestDecimalEncoder:
@@ -40,6 +79,404 @@ class TestDecimalEncoder:
         assert parsed["nested"]["count"] == 100
 
 
+class TestDumps:
+    """Test cases for the fast response serializer."""
+
+    def test_decimals_as_numbers(self) -> None:
+        """Test DynamoDB numbers are written as JSON numbers."""
+        result = dumps({"year": Decimal("2024"), "rating": Decimal("4.5")})
+        assert result == b'{"year":2024,"rating":4.5}'
+
+    def test_models_match_pydantic(self) -> None:
+        """Test models serialize exactly as pydantic would."""
+        video = Video(
+            video_id="v1",
+            title="【雑談】テスト",
+            tags=["雑談"],
+            year=2024,
+            created_at="2024-01-01T00:00:00Z",
+        )
+        tree = [TagNode(name="雑談", children=[TagNode(name="料理", count=1)], count=1)]
+
+        assert dumps(video) == video.model_dump_json().encode()
+        assert json.loads(dumps({"tree": tree})) == {
+            "tree": [node.model_dump() for node in tree]
+        }
+
+    def test_unsupported_type(self) -> None:
+        """Test objects that are not JSON data are rejected."""
+        with pytest.raises(TypeError):
+            dumps({"when": object()})
+
+
+class TestCatalogCache:
+    """Test cases for CatalogCache and CatalogSnapshot."""
+
+    @pytest.fixture
+    def videos(self) -> list[Video]:
+        """Create a small catalog spanning two years."""
+        return [
+            Video(
+                video_id="old",
+                title="Old",
+                tags=["ゲーム実況", "ホラー", "Cry of Fear"],
+                year=2023,
+                thumbnail_url="https://example.com/old.jpg",
+                created_at="2023-01-01T00:00:00Z",
+            ),
+            Video(
+                video_id="new",
+                title="New",
+                tags=["ゲーム実況", "ホラー"],
+                year=2023,
+                thumbnail_url="https://example.com/new.jpg",
+                created_at="2023-12-01T00:00:00Z",
+            ),
+            Video(
+                video_id="chat",
+                title="Chat",
+                tags=["雑談"],
+                year=2024,
+                thumbnail_url=None,
+            ),
+        ]
+
+    def test_snapshot_indexes(self, videos: list[Video]) -> None:
+        """Test the snapshot builds ID, tag path and thumbnail indexes."""
+        snapshot = CatalogSnapshot(videos, tag_tree=[])
+        by_path = snapshot.videos_by_tag_path
+
+        assert set(snapshot.videos_by_id) == {"old", "new", "chat"}
+        assert snapshot.thumbnail_pool == [
+            "https://example.com/old.jpg",
+            "https://example.com/new.jpg",
+        ]
+
+        assert [v.video_id for v in by_path["ゲーム実況/ホラー"]] == ["new", "old"]
+        # Paths may start in the middle of a video's tags
+        assert [v.video_id for v in by_path["ホラー/Cry of Fear"]] == ["old"]
+        assert "ホラー/ゲーム実況" not in by_path
+        assert [v.video_id for v in snapshot.videos_newest_first] == [
+            "new",
+            "old",
+            "chat",
+        ]
+
+    def test_hit_and_miss_counters(self, videos: list[Video]) -> None:
+        """Test loads count as misses and lookups that fall back as bypasses."""
+        cache = CatalogCache(ttl_seconds=60)
+
+        assert cache.get() is None
+        assert not cache.should_load()
+        cache.put(videos, tag_tree=[])
+        assert cache.get() is not None
+        assert cache.get() is not None
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["bypasses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(2 / 3)
+        assert stats["cached_items"] == 3
+
+    def test_should_load_when_warm_or_stale(self, videos: list[Video]) -> None:
+        """Test reads with a fallback load once warm, and again once stale."""
+        now = [100.0]
+        cache = CatalogCache(ttl_seconds=10, warm_after=3, clock=lambda: now[0])
+
+        assert [cache.should_load() for _ in range(3)] == [False, False, True]
+
+        cache.put(videos, tag_tree=[])
+        now[0] = 110.0
+        assert cache.get() is None
+        assert cache.should_load()
+
+        cache.put(videos, tag_tree=[])
+        cache.invalidate()
+        assert cache.should_load()
+
+    def test_should_not_load_uncacheable(self, videos: list[Video]) -> None:
+        """Test catalogs that cannot be kept are never loaded passively."""
+        disabled = CatalogCache(ttl_seconds=0, warm_after=1)
+        too_large = CatalogCache(ttl_seconds=60, max_items=2, warm_after=1)
+        too_large.put(videos, tag_tree=[])
+
+        assert not disabled.should_load()
+        assert not too_large.should_load()
+
+    def test_ttl_expiry(self, videos: list[Video]) -> None:
+        """Test snapshots expire after the TTL."""
+        now = [100.0]
+        cache = CatalogCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.put(videos, tag_tree=[])
+
+        now[0] = 109.0
+        assert cache.get() is not None
+        now[0] = 110.0
+        assert cache.get() is None
+        assert cache.stats()["cached_items"] == 0
+
+    def test_size_bound(self, videos: list[Video]) -> None:
+        """Test catalogs larger than max_items are not kept."""
+        cache = CatalogCache(ttl_seconds=60, max_items=2)
+
+        snapshot = cache.put(videos, tag_tree=[])
+
+        assert len(snapshot.videos) == 3
+        assert cache.get() is None
+
+    def test_invalidate(self, videos: list[Video]) -> None:
+        """Test invalidate drops the cached snapshot."""
+        cache = CatalogCache(ttl_seconds=60)
+        cache.put(videos, tag_tree=[])
+
+        cache.invalidate()
+
+        assert cache.get() is None
+
+
+class TestTitleIndex:
+    """Test cases for the title search index."""
+
+    @pytest.fixture
+    def index(self) -> TitleIndex:
+        """Create an index over a few Japanese titles, newest first."""
+        titles = [
+            "【マリカ】視聴者参加型マリカ",
+            "【ASMR】耳かき",
+            "【ホラーゲーム】Cry of Fear 実況プレイ #1",
+            "まりか",
+            "雑談しながら歌う",
+            "マリオカート8DX",
+        ]
+        return TitleIndex(
+            [
+                Video(video_id=f"video{i}", title=title, year=2024)
+                for i, title in enumerate(titles)
+            ]
+        )
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("ＡＳＭＲ", "asmr"),
+            ("ﾏﾘｶ", "マリカ"),
+            ("まりか", "マリカ"),
+            ("【雑談】歌枠！", "雑談 歌枠"),
+            ("Cry_of  Fear", "cry of fear"),
+        ],
+    )
+    def test_normalize(self, text: str, expected: str) -> None:
+        """Test width, case and kana folding and separator collapsing."""
+        assert normalize(text) == expected
+
+    @staticmethod
+    def _ids(videos: list[Video]) -> list[str]:
+        return [video.video_id for video in videos]
+
+    def test_kana_and_width_variants_match(self, index: TitleIndex) -> None:
+        """Test hiragana, half-width and full-width queries match."""
+        assert self._ids(index.search("ＡＳＭＲ")) == ["video1"]
+        assert self._ids(index.search("asmr")) == ["video1"]
+        assert set(self._ids(index.search("ﾏﾘｶ"))) == {"video0", "video3"}
+
+    def test_ranked_by_title_coverage(self, index: TitleIndex) -> None:
+        """Test titles the query covers more of come first."""
+        # The exact title beats one mentioning the term twice in passing
+        assert self._ids(index.search("マリカ")) == ["video3", "video0"]
+
+    def test_every_term_must_match(self, index: TitleIndex) -> None:
+        """Test space-separated terms are combined with AND."""
+        assert self._ids(index.search("ホラー 実況")) == ["video2"]
+        assert index.search("ホラー 耳かき") == []
+
+    def test_bigrams_apart_do_not_match(self, index: TitleIndex) -> None:
+        """Test titles containing the query bigrams but not the query."""
+        # マリオカート has マリ and カー but not マリカ
+        assert "video5" not in self._ids(index.search("マリカ"))
+        assert index.search("マリオカ") == index.search("マリオカート")
+
+    def test_single_character_query(self, index: TitleIndex) -> None:
+        """Test queries without a bigram fall back to checking every term."""
+        assert self._ids(index.search("歌")) == ["video4"]
+        assert self._ids(index.search("8")) == ["video5"]
+
+    def test_query_without_terms(self, index: TitleIndex) -> None:
+        """Test queries made of separators only match nothing."""
+        assert index.search("【】 ！") == []
+        assert len(index) == 6
+
+
+class TestFanOut:
+    """Test cases for the fan_out helper."""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_call_order(self) -> None:
+        """Test results are returned in call order, not completion order."""
+
+        async def delayed(value: int) -> int:
+            await asyncio.sleep(0.01 * (3 - value))
+            return value
+
+        results = await fan_out([partial(delayed, v) for v in range(3)])
+        assert results == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_limit_bounds_concurrency(self) -> None:
+        """Test no more than limit calls are in flight at once."""
+        active = peak = 0
+
+        async def call() -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        await fan_out([call] * 5, limit=2)
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_error_cancels_other_calls(self) -> None:
+        """Test the first error is raised and pending calls are cancelled."""
+        cancelled = asyncio.Event()
+
+        async def fail() -> None:
+            raise RuntimeError("boom")
+
+        async def wait() -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await fan_out([wait, fail])
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_empty(self) -> None:
+        """Test no calls give no results."""
+        assert await fan_out([]) == []
+
+
+class TestSingleFlight:
+    """Test cases for the SingleFlight helper."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self) -> None:
+        """Test callers with the same key await a single call."""
+        flights = SingleFlight()
+        calls = 0
+
+        async def load() -> list[int]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [1, 2]
+
+        results = await asyncio.gather(*(flights.do("catalog", load) for _ in range(5)))
+
+        assert calls == 1
+        assert all(result is results[0] for result in results)
+        assert flights.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self) -> None:
+        """Test calls with different keys are not shared."""
+        flights = SingleFlight()
+
+        async def echo(value: str) -> str:
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            flights.do(("scan", "a"), partial(echo, "a")),
+            flights.do(("scan", "b"), partial(echo, "b")),
+        )
+        assert results == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_finished_calls_are_not_reused(self) -> None:
+        """Test a call after the previous one finished runs again."""
+        flights = SingleFlight()
+        calls = 0
+
+        async def load() -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flights.do("key", load) == 1
+        assert await flights.do("key", load) == 2
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller_and_is_retried(self) -> None:
+        """Test a failure is raised to all waiters and not remembered."""
+        flights = SingleFlight()
+        calls = 0
+
+        async def fail() -> None:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            *(flights.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert calls == 1
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await flights.do("key", fail)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_others(self) -> None:
+        """Test the call keeps running while someone still waits for it."""
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def load() -> str:
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flights.do("key", load))
+        second = asyncio.create_task(flights.do("key", load))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "done"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_call_is_cancelled_with_its_last_caller(self) -> None:
+        """Test the call stops once nobody waits for it any more."""
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def load() -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(flights.do("key", load))
+        await asyncio.sleep(0)
+        caller.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flights.in_flight() == 0
+
+
 class TestDynamoDBService:
     """Test cases for DynamoDBService."""
 
@@ -47,15 +484,159 @@ class TestDynamoDBService:
     def mock_table(self) -> MagicMock:
         """Create a mock DynamoDB table."""
         mock_table = MagicMock()
+        # No metadata items (tag tree, catalog summary) unless a test adds them
+        mock_table.get_item.return_value = {}
         return mock_table
 
     @pytest.fixture
     def service(self, mock_table: MagicMock) -> DynamoDBService:
-        """Create DynamoDBService instance with mocked table."""
-        service = DynamoDBService("test-table")
+        """Create DynamoDBService instance with mocked table.
+
+        A single scan segment keeps each mocked scan response from being
+        returned once per segment.
+        """
+        service = DynamoDBService("test-table", scan_segments=1)
         service.table = mock_table
         return service
 
+    @pytest.mark.asyncio
+    async def test_blocking_call_does_not_block_event_loop(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test boto3 calls run off the event loop."""
+        release = threading.Event()
+
+        def slow_query(**kwargs: Any) -> dict[str, Any]:
+            release.wait(timeout=1)
+            return {"Items": []}
+
+        mock_table.query.side_effect = slow_query
+
+        task = asyncio.create_task(service.get_video_by_id("video1"))
+        await asyncio.sleep(0.05)
+
+        # The loop kept running while the query was still in flight
+        assert not task.done()
+        release.set()
+        assert await task is None
+
+    @pytest.mark.asyncio
+    async def test_call_timeout(self, mock_table: MagicMock) -> None:
+        """Test calls exceeding call_timeout raise RuntimeError."""
+        service = DynamoDBService("test-table", call_timeout=0.05)
+        service.table = mock_table
+        release = threading.Event()
+        mock_table.query.side_effect = lambda **kwargs: release.wait(timeout=1)
+
+        try:
+            with pytest.raises(RuntimeError, match="timed out"):
+                await service.get_video_by_id("video1")
+        finally:
+            release.set()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_bounded(self, mock_table: MagicMock) -> None:
+        """Test no more than max_workers boto3 calls run at once."""
+        service = DynamoDBService("test-table", max_workers=2)
+        service.table = mock_table
+        lock = threading.Lock()
+        active = peak = 0
+
+        def query(**kwargs: Any) -> dict[str, Any]:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return {"Items": []}
+
+        mock_table.query.side_effect = query
+
+        await asyncio.gather(*(service.get_video_by_id(f"v{i}") for i in range(6)))
+        assert peak == 2
+
+    def test_scan_items_follows_pagination(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test _scan_items reads every page until LastEvaluatedKey is absent."""
+        mock_table.scan.side_effect = [
+            {"Items": [{"video_id": "a"}], "LastEvaluatedKey": {"PK": "1"}},
+            {"Items": [{"video_id": "b"}], "LastEvaluatedKey": {"PK": "2"}},
+            {"Items": [{"video_id": "c"}]},
+        ]
+
+        items = list(service._scan_items())
+
+        assert [item["video_id"] for item in items] == ["a", "b", "c"]
+        assert mock_table.scan.call_count == 3
+        second_call = mock_table.scan.call_args_list[1][1]
+        assert second_call["ExclusiveStartKey"] == {"PK": "1"}
+
+    def test_scan_items_parallel_segments(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test _scan_items merges every segment of a parallel scan."""
+
+        def scan(**kwargs: Any) -> dict[str, Any]:
+            segment = kwargs["Segment"]
+            assert kwargs["TotalSegments"] == 3
+            if "ExclusiveStartKey" not in kwargs:
+                return {
+                    "Items": [{"video_id": f"s{segment}-0"}],
+                    "LastEvaluatedKey": {"PK": f"s{segment}"},
+                }
+            return {"Items": [{"video_id": f"s{segment}-1"}]}
+
+        mock_table.scan.side_effect = scan
+
+        items = list(service._scan_items(segments=3))
+
+        assert sorted(item["video_id"] for item in items) == [
+            "s0-0",
+            "s0-1",
+            "s1-0",
+            "s1-1",
+            "s2-0",
+            "s2-1",
+        ]
+        assert mock_table.scan.call_count == 6
+
+    def test_scan_items_projection(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test _scan_items passes attribute names through placeholders."""
+        mock_table.scan.return_value = {"Items": []}
+
+        list(service._scan_items(["tags", "year"]))
+
+        call_args = mock_table.scan.call_args[1]
+        assert call_args["ProjectionExpression"] == "#p0, #p1"
+        assert call_args["ExpressionAttributeNames"] == {"#p0": "tags", "#p1": "year"}
+        # Metadata items such as the materialized tag tree are not in the
+        # sparse video index; the filter only guards against strays
+        assert call_args["IndexName"] == VIDEO_SCAN_INDEX
+        assert call_args["FilterExpression"] == VIDEO_ITEM_FILTER
+
+    def test_scan_items_segment_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test an error in one scan segment is raised to the consumer."""
+
+        def scan(**kwargs: Any) -> dict[str, Any]:
+            if kwargs["Segment"] == 1:
+                raise ClientError(
+                    {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+                    "Scan",
+                )
+            return {"Items": [{"video_id": "ok"}]}
+
+        mock_table.scan.side_effect = scan
+
+        with pytest.raises(ClientError):
+            list(service._scan_items(segments=2))
+
     def test_convert_dynamodb_item_to_video(self, service: DynamoDBService) -> None:
         """Test converting DynamoDB item to Video model."""
         item = {
@@ -130,7 +711,8 @@ class TestDynamoDBService:
 
         mock_table.query.assert_called_once()
         call_args = mock_table.query.call_args[1]
-        assert call_args["IndexName"] == "GSI1"
+        assert call_args["IndexName"] == "ByYearDate"
+        assert call_args["KeyConditionExpression"] == Key("year").eq(2024)
         assert call_args["Limit"] == 2
         assert call_args["ScanIndexForward"] is False  # Verify descending sort
 
@@ -139,22 +721,100 @@ class TestDynamoDBService:
         self, service: DynamoDBService, mock_table: MagicMock
     ) -> None:
         """Test get_videos_by_year with pagination."""
-        last_key_str = json.dumps({"video_id": "prev", "year": 2024})
+        start_key = {
+            "PK": "YEAR#2024",
+            "SK": "VIDEO#prev",
+            "year": 2024,
+            "created_at": "2024-01-01T00:00:00Z",
+        }
         mock_response = {"Items": []}  # No LastEvaluatedKey means no more pages
         mock_table.query.return_value = mock_response
 
         videos, last_key = await service.get_videos_by_year(
-            2024, limit=50, last_key=last_key_str
+            2024, limit=50, last_key=json.dumps(start_key)
         )
 
         assert len(videos) == 0
         assert last_key is None
 
         call_args = mock_table.query.call_args[1]
-        assert "ExclusiveStartKey" in call_args
-        assert call_args["ExclusiveStartKey"]["video_id"] == "prev"
+        assert call_args["ExclusiveStartKey"] == start_key
         assert call_args["ScanIndexForward"] is False  # Verify descending sort
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "last_key",
+        [
+            "not json",
+            "[]",
+            '{"video_id": "prev", "year": 2024}',
+            '{"PK": "YEAR#2023", "SK": "VIDEO#v", "year": 2023, "created_at": "x"}',
+        ],
+    )
+    async def test_get_videos_by_year_invalid_last_key(
+        self, service: DynamoDBService, mock_table: MagicMock, last_key: str
+    ) -> None:
+        """Test malformed keys, or keys of another year, are rejected."""
+        with pytest.raises(ValueError, match="^Invalid last_key: ") as error:
+            await service.get_videos_by_year(2024, last_key=last_key)
+
+        if last_key == "not json":
+            assert isinstance(error.value.__cause__, json.JSONDecodeError)
+        mock_table.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("date_from", "date_to", "sort_key_condition"),
+        [
+            (
+                datetime(2024, 3, 1),
+                datetime(2024, 3, 31, 23, 59, 59),
+                Key("created_at").between(
+                    "2024-03-01T00:00:00Z", "2024-03-31T23:59:59Z"
+                ),
+            ),
+            (
+                datetime(2024, 3, 1, 9, tzinfo=timezone(timedelta(hours=9))),
+                None,
+                Key("created_at").gte("2024-03-01T00:00:00Z"),
+            ),
+            (
+                None,
+                datetime(2024, 3, 1, tzinfo=UTC),
+                Key("created_at").lte("2024-03-01T00:00:00Z"),
+            ),
+        ],
+    )
+    async def test_get_videos_by_year_date_range(
+        self,
+        service: DynamoDBService,
+        mock_table: MagicMock,
+        date_from: datetime | None,
+        date_to: datetime | None,
+        sort_key_condition: Any,
+    ) -> None:
+        """Test from/to bounds become a sort key condition in UTC."""
+        mock_table.query.return_value = {"Items": []}
+
+        await service.get_videos_by_year(2024, date_from=date_from, date_to=date_to)
+
+        call_args = mock_table.query.call_args[1]
+        assert call_args["KeyConditionExpression"] == (
+            Key("year").eq(2024) & sort_key_condition
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_videos_by_year_invalid_date_range(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a range that ends before it starts is rejected."""
+        with pytest.raises(ValueError, match="from"):
+            await service.get_videos_by_year(
+                2024, date_from=datetime(2024, 4, 1), date_to=datetime(2024, 3, 1)
+            )
+
+        mock_table.query.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_videos_by_year_date_sorting(
         self, service: DynamoDBService, mock_table: MagicMock
@@ -201,6 +861,183 @@ class TestDynamoDBService:
         with pytest.raises(RuntimeError, match="Failed to query videos by year"):
             await service.get_videos_by_year(2024)
 
+    @pytest.fixture
+    def feed_table(self, mock_table: MagicMock) -> list[dict[str, Any]]:
+        """Serve ByYearDate queries from an in-memory catalog spanning years."""
+        items = [
+            {
+                "PK": f"YEAR#{year}",
+                "SK": f"VIDEO#{year}-{day:02d}",
+                "video_id": f"{year}-{day:02d}",
+                "title": f"Video {year}-{day:02d}",
+                "tags": [],
+                "year": Decimal(year),
+                "created_at": f"{year}-01-{day:02d}T00:00:00Z",
+            }
+            for year, days in ((2022, 5), (2023, 9), (2024, 2))
+            for day in range(1, days + 1)
+        ]
+
+        def query(**kwargs: Any) -> dict[str, Any]:
+            assert kwargs["IndexName"] == "ByYearDate"
+            assert kwargs["ScanIndexForward"] is False
+            year = kwargs["KeyConditionExpression"].get_expression()["values"][1]
+            partition = sorted(
+                (item for item in items if item["year"] == year),
+                key=lambda item: item["created_at"],
+                reverse=True,
+            )
+            start = kwargs.get("ExclusiveStartKey")
+            if start:
+                partition = [
+                    i for i in partition if i["created_at"] < start["created_at"]
+                ]
+
+            page = partition[: kwargs["Limit"]]
+            response: dict[str, Any] = {"Items": page}
+            if len(partition) > len(page):
+                last = page[-1]
+                response["LastEvaluatedKey"] = {
+                    name: last[name] for name in ("PK", "SK", "year", "created_at")
+                }
+            return response
+
+        mock_table.get_item.return_value = {
+            "Item": {"PK": "META#CATALOG", "years": [Decimal(2024), Decimal(2023)]}
+        }
+        mock_table.query.side_effect = query
+        return items
+
+    @pytest.mark.asyncio
+    async def test_get_latest_videos_merges_years(
+        self,
+        service: DynamoDBService,
+        mock_table: MagicMock,
+        feed_table: list[dict[str, Any]],
+    ) -> None:
+        """Test paging through the feed yields every video newest first."""
+        # Years missing from the catalog summary are not read
+        expected = [
+            str(item["video_id"])
+            for item in sorted(
+                feed_table, key=lambda item: item["created_at"], reverse=True
+            )
+            if item["year"] != 2022
+        ]
+
+        seen: list[str] = []
+        cursor = None
+        for _ in range(10):
+            videos, cursor = await service.get_latest_videos(limit=4, cursor=cursor)
+            assert len(videos) <= 4
+            seen.extend(v.video_id for v in videos)
+            if cursor is None:
+                break
+
+        assert seen == expected
+        # No query reads more than a page
+        assert all(c.kwargs["Limit"] <= 4 for c in mock_table.query.call_args_list)
+        mock_table.scan.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_latest_videos_interleaved_partitions(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test the heap merge orders items from overlapping partitions."""
+        responses = {
+            2024: ["2024-05-01", "2024-03-01", "2024-01-01"],
+            2023: ["2024-04-01", "2024-02-01"],
+        }
+
+        def query(**kwargs: Any) -> dict[str, Any]:
+            year = kwargs["KeyConditionExpression"].get_expression()["values"][1]
+            return {
+                "Items": [
+                    {
+                        "PK": f"YEAR#{year}",
+                        "SK": f"VIDEO#{date}",
+                        "video_id": date,
+                        "title": date,
+                        "year": Decimal(year),
+                        "created_at": f"{date}T00:00:00Z",
+                    }
+                    for date in responses[year]
+                ]
+            }
+
+        mock_table.get_item.return_value = {
+            "Item": {"PK": "META#CATALOG", "years": [Decimal(2024), Decimal(2023)]}
+        }
+        mock_table.query.side_effect = query
+
+        videos, cursor = await service.get_latest_videos(limit=10)
+
+        assert [v.video_id for v in videos] == [
+            "2024-05-01",
+            "2024-04-01",
+            "2024-03-01",
+            "2024-02-01",
+            "2024-01-01",
+        ]
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_get_latest_videos_years_from_scan(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test years are found by a scan when the catalog summary is missing."""
+        mock_table.scan.return_value = {
+            "Items": [{"year": Decimal(2023)}, {"year": Decimal(2024)}]
+        }
+        mock_table.query.return_value = {"Items": []}
+
+        videos, cursor = await service.get_latest_videos(limit=5)
+
+        assert videos == []
+        assert cursor is None
+        queried = [
+            c.kwargs["KeyConditionExpression"].get_expression()["values"][1]
+            for c in mock_table.query.call_args_list
+        ]
+        assert sorted(queried) == [2023, 2024]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not-base64!",
+            "e30",
+            "eyJ2IjoyfQ",
+            # Positions that are not ByYearDate keys of their year
+            base64.urlsafe_b64encode(
+                b'{"v":1,"after":{"2024":{"PK":"x"}},"done":[]}'
+            ).decode(),
+            base64.urlsafe_b64encode(
+                b'{"v":1,"after":{"2024":"x"},"done":[]}'
+            ).decode(),
+        ],
+    )
+    async def test_get_latest_videos_invalid_cursor(
+        self, service: DynamoDBService, mock_table: MagicMock, cursor: str
+    ) -> None:
+        """Test malformed cursors raise ValueError before any read."""
+        with pytest.raises(ValueError, match="^Invalid last_key: "):
+            await service.get_latest_videos(cursor=cursor)
+        mock_table.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_latest_videos_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get latest videos with DynamoDB error."""
+        mock_table.get_item.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "Invalid"}},
+            "GetItem",
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to get latest videos"):
+            await service.get_latest_videos()
+
     @pytest.mark.asyncio
     async def test_get_video_by_id_found(
         self, service: DynamoDBService, mock_table: MagicMock
@@ -215,7 +1052,7 @@ class TestDynamoDBService:
                 }
             ]
         }
-        mock_table.scan.return_value = mock_response
+        mock_table.query.return_value = mock_response
 
         video = await service.get_video_by_id("found123")
 
@@ -223,10 +1060,12 @@ class TestDynamoDBService:
         assert video.video_id == "found123"
         assert video.title == "Found Video"
 
-        # Verify scan was called with correct filter
-        mock_table.scan.assert_called_once_with(
-            FilterExpression="video_id = :video_id",
-            ExpressionAttributeValues={":video_id": "found123"},
+        # Verify the ByVideoId index was queried instead of scanning
+        mock_table.scan.assert_not_called()
+        mock_table.query.assert_called_once_with(
+            IndexName="ByVideoId",
+            KeyConditionExpression=Key("video_id").eq("found123"),
+            Limit=1,
         )
 
     @pytest.mark.asyncio
@@ -234,16 +1073,18 @@ class TestDynamoDBService:
         self, service: DynamoDBService, mock_table: MagicMock
     ) -> None:
         """Test get_video_by_id when video not found."""
-        mock_table.scan.return_value = {"Items": []}
+        mock_table.query.return_value = {"Items": []}
 
         video = await service.get_video_by_id("notfound")
 
         assert video is None
 
-        # Verify scan was called with correct filter
-        mock_table.scan.assert_called_once_with(
-            FilterExpression="video_id = :video_id",
-            ExpressionAttributeValues={":video_id": "notfound"},
+        # Verify the ByVideoId index was queried instead of scanning
+        mock_table.scan.assert_not_called()
+        mock_table.query.assert_called_once_with(
+            IndexName="ByVideoId",
+            KeyConditionExpression=Key("video_id").eq("notfound"),
+            Limit=1,
         )
 
     @pytest.mark.asyncio
@@ -251,8 +1092,8 @@ class TestDynamoDBService:
         self, service: DynamoDBService, mock_table: MagicMock
     ) -> None:
         """Test get_video_by_id with DynamoDB error."""
-        mock_table.scan.side_effect = ClientError(
-            {"Error": {"Code": "InternalServerError"}}, "Scan"
+        mock_table.query.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "Query"
         )
 
         with pytest.raises(RuntimeError, match="Failed to get video by ID"):
@@ -277,7 +1118,7 @@ class TestDynamoDBService:
                 },
             ]
         }
-        mock_table.scan.return_value = mock_response
+        mock_table.query.return_value = mock_response
 
         video = await service.get_video_by_id("duplicate123")
 
@@ -305,7 +1146,7 @@ class TestDynamoDBService:
                 }
             ]
         }
-        mock_table.scan.return_value = mock_response
+        mock_table.query.return_value = mock_response
 
         video = await service.get_video_by_id("9xcMUP0l_Xs")
 
@@ -320,117 +1161,489 @@ class TestDynamoDBService:
         )
         assert video.created_at == "2024-01-01T12:00:00Z"
 
-    def test_tags_match_path_exact_match(self, service: DynamoDBService) -> None:
-        """Test _tags_match_path with exact match."""
-        item_tags = ["ゲーム実況", "ホラー", "Cry of Fear"]
-        path_tags = ["ゲーム実況", "ホラー", "Cry of Fear"]
+    @pytest.fixture
+    def mock_resource(self, service: DynamoDBService) -> MagicMock:
+        """Replace the DynamoDB resource used for batch reads."""
+        mock_resource = MagicMock()
+        service.dynamodb = mock_resource
+        return mock_resource
+
+    @staticmethod
+    def _lookup_item(video_id: str) -> dict[str, Any]:
+        """Create an ID-keyed lookup item as written by the import script."""
+        return {
+            "video": {
+                "video_id": video_id,
+                "title": f"Video {video_id}",
+                "tags": [],
+                "year": Decimal("2024"),
+            }
+        }
 
-        assert service._tags_match_path(item_tags, path_tags) is True
+    @pytest.mark.asyncio
+    async def test_get_videos_by_ids_chunks_keys(
+        self, service: DynamoDBService, mock_resource: MagicMock
+    ) -> None:
+        """Test IDs are read in BatchGetItem calls of at most 100 keys."""
+
+        def batch_get_item(RequestItems: dict[str, Any]) -> dict[str, Any]:
+            keys = RequestItems["test-table"]["Keys"]
+            return {
+                "Responses": {
+                    "test-table": [
+                        self._lookup_item(key["PK"].removeprefix("VIDEO#"))
+                        for key in reversed(keys)
+                    ]
+                }
+            }
 
-    def test_tags_match_path_partial_match(self, service: DynamoDBService) -> None:
-        """Test _tags_match_path with partial match."""
-        item_tags = ["ゲーム実況", "ホラー", "Cry of Fear", "Part 1"]
-        path_tags = ["ホラー", "Cry of Fear"]
+        mock_resource.batch_get_item.side_effect = batch_get_item
+        video_ids = [f"v{i}" for i in range(250)]
 
-        assert service._tags_match_path(item_tags, path_tags) is True
+        videos = await service.get_videos_by_ids(video_ids)
 
-    def test_tags_match_path_no_match(self, service: DynamoDBService) -> None:
-        """Test _tags_match_path with no match."""
-        item_tags = ["雑談", "料理"]
-        path_tags = ["ゲーム実況", "ホラー"]
+        # Results follow the requested order, not the response order
+        assert [v.video_id for v in videos] == video_ids
+        requests = [
+            call.kwargs["RequestItems"]["test-table"]
+            for call in mock_resource.batch_get_item.call_args_list
+        ]
+        assert sorted(len(request["Keys"]) for request in requests) == [50, 100, 100]
+        assert requests[0]["ProjectionExpression"] == "video"
+        assert requests[0]["Keys"][0] == {"PK": "VIDEO#v0", "SK": "VIDEO#v0"}
 
-        assert service._tags_match_path(item_tags, path_tags) is False
+    @pytest.mark.asyncio
+    async def test_get_videos_by_ids_skips_unknown_and_duplicates(
+        self, service: DynamoDBService, mock_resource: MagicMock
+    ) -> None:
+        """Test duplicate IDs are read once and unknown IDs are left out."""
+        mock_resource.batch_get_item.return_value = {
+            "Responses": {"test-table": [self._lookup_item("a")]}
+        }
 
-    def test_tags_match_path_empty_path(self, service: DynamoDBService) -> None:
-        """Test _tags_match_path with empty path."""
-        item_tags = ["any", "tags"]
-        path_tags = []
+        videos = await service.get_videos_by_ids(["a", "missing", "a"])
 
-        assert service._tags_match_path(item_tags, path_tags) is True
+        assert [v.video_id for v in videos] == ["a"]
+        request = mock_resource.batch_get_item.call_args.kwargs["RequestItems"]
+        keys = request["test-table"]["Keys"]
+        assert [key["PK"] for key in keys] == ["VIDEO#a", "VIDEO#missing"]
 
     @pytest.mark.asyncio
-    async def test_get_videos_by_tag_path(
-        self, service: DynamoDBService, mock_table: MagicMock
+    async def test_get_videos_by_ids_retries_unprocessed_keys(
+        self, service: DynamoDBService, mock_resource: MagicMock
     ) -> None:
-        """Test get_videos_by_tag_path."""
-        mock_response = {
-            "Items": [
-                {
-                    "video_id": "horror1",
-                    "title": "Horror Game 1",
-                    "year": Decimal("2024"),
-                    "tags": ["ゲーム実況", "ホラー", "Cry of Fear"],
-                },
-                {
-                    "video_id": "other1",
-                    "title": "Other Video",
-                    "year": Decimal("2024"),
-                    "tags": ["雑談", "料理"],
-                },
-                {
-                    "video_id": "horror2",
-                    "title": "Horror Game 2",
-                    "year": Decimal("2024"),
-                    "tags": ["ゲーム実況", "ホラー", "Amnesia"],
-                },
-            ]
+        """Test unprocessed keys are retried with backoff."""
+        unprocessed = {
+            "test-table": {
+                "Keys": [{"PK": "VIDEO#b", "SK": "VIDEO#b"}],
+                "ProjectionExpression": "video",
+            }
         }
-        mock_table.scan.return_value = mock_response
+        mock_resource.batch_get_item.side_effect = [
+            {
+                "Responses": {"test-table": [self._lookup_item("a")]},
+                "UnprocessedKeys": unprocessed,
+            },
+            {"Responses": {"test-table": [self._lookup_item("b")]}},
+        ]
 
-        videos = await service.get_videos_by_tag_path("ゲーム実況/ホラー")
+        with patch("time.sleep") as sleep:
+            videos = await service.get_videos_by_ids(["b", "a"])
 
-        assert len(videos) == 2
-        assert all("ホラー" in v.tags for v in videos)
-        assert videos[0].video_id == "horror1"
-        assert videos[1].video_id == "horror2"
+        assert [v.video_id for v in videos] == ["b", "a"]
+        assert mock_resource.batch_get_item.call_count == 2
+        assert mock_resource.batch_get_item.call_args.kwargs == {
+            "RequestItems": unprocessed
+        }
+        sleep.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_get_random_videos(
+    async def test_get_videos_by_ids_gives_up_after_retries(
+        self, service: DynamoDBService, mock_resource: MagicMock
+    ) -> None:
+        """Test keys that stay unprocessed raise RuntimeError."""
+        unprocessed = {"test-table": {"Keys": [{"PK": "VIDEO#a", "SK": "VIDEO#a"}]}}
+        mock_resource.batch_get_item.return_value = {"UnprocessedKeys": unprocessed}
+
+        with patch("time.sleep") as sleep:
+            with pytest.raises(RuntimeError, match="unprocessed"):
+                await service.get_videos_by_ids(["a"])
+
+        assert mock_resource.batch_get_item.call_count == 6
+        assert sleep.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_get_videos_by_ids_error(
+        self, service: DynamoDBService, mock_resource: MagicMock
+    ) -> None:
+        """Test batch lookup with DynamoDB error."""
+        mock_resource.batch_get_item.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "Invalid"}},
+            "BatchGetItem",
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to get videos by IDs"):
+            await service.get_videos_by_ids(["a"])
+
+    @pytest.mark.asyncio
+    async def test_get_videos_by_tag_path(
         self, service: DynamoDBService, mock_table: MagicMock
     ) -> None:
-        """Test get_random_videos."""
-        mock_response = {
+        """Test get_videos_by_tag_path reads one page of the ByTagDate index."""
+        last_evaluated_key = {
+            "PK": "TAGPATH#ゲーム実況/ホラー",
+            "SK": "VIDEO#horror1",
+            "Tag": "ゲーム実況/ホラー",
+            "created_at": "2024-05-01T00:00:00Z",
+        }
+        mock_table.query.return_value = {
             "Items": [
                 {
-                    "video_id": f"video{i}",
-                    "title": f"Video {i}",
-                    "year": Decimal("2024"),
+                    "video": {
+                        "video_id": "horror1",
+                        "title": "Horror Game 1",
+                        "year": Decimal("2024"),
+                        "tags": ["ゲーム実況", "ホラー", "Cry of Fear"],
+                    }
                 }
-                for i in range(10)
-            ]
+            ],
+            "LastEvaluatedKey": last_evaluated_key,
         }
-        mock_table.scan.return_value = mock_response
 
-        videos = await service.get_random_videos(count=3)
+        videos, last_key = await service.get_videos_by_tag_path(
+            " ゲーム実況 / ホラー ", limit=1
+        )
 
-        assert len(videos) == 3
-        # Check that all videos are from the original set
-        video_ids = {v.video_id for v in videos}
-        assert all(vid.startswith("video") for vid in video_ids)
+        assert [v.video_id for v in videos] == ["horror1"]
+        assert last_key is not None
+        assert json.loads(last_key) == last_evaluated_key
+        mock_table.scan.assert_not_called()
+
+        call_kwargs = mock_table.query.call_args[1]
+        assert call_kwargs["IndexName"] == "ByTagDate"
+        assert call_kwargs["KeyConditionExpression"] == Key("Tag").eq(
+            "ゲーム実況/ホラー"
+        )
+        assert call_kwargs["ProjectionExpression"] == "video"
+        assert call_kwargs["Limit"] == 1
+        assert call_kwargs["ScanIndexForward"] is False
+        assert "ExclusiveStartKey" not in call_kwargs
+
+        # The returned key resumes the query where the page ended
+        mock_table.query.return_value = {"Items": []}
+        videos, last_key = await service.get_videos_by_tag_path(
+            "ゲーム実況/ホラー", limit=1, last_key=last_key
+        )
+
+        assert videos == []
+        assert last_key is None
+        assert mock_table.query.call_args[1]["ExclusiveStartKey"] == (
+            last_evaluated_key
+        )
 
     @pytest.mark.asyncio
-    async def test_get_random_videos_empty_table(
-        self, service: DynamoDBService, mock_table: MagicMock
+    @pytest.mark.parametrize(
+        "last_key", ["not-json", "[]", '{"SK": "VIDEO#a"}', '{"created_at": 1}']
+    )
+    async def test_get_videos_by_tag_path_invalid_last_key(
+        self, service: DynamoDBService, mock_table: MagicMock, last_key: str
     ) -> None:
-        """Test get_random_videos with empty table."""
-        mock_table.scan.return_value = {"Items": []}
+        """Test a malformed last_key is rejected before querying."""
+        with pytest.raises(ValueError, match="Invalid last_key"):
+            await service.get_videos_by_tag_path("雑談", last_key=last_key)
 
-        videos = await service.get_random_videos(count=5)
+        mock_table.query.assert_not_called()
 
-        assert len(videos) == 0
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("pk", "sk", "tag"),
+        [
+            ("TAGPATH#ゲーム実況/ホラー", "VIDEO#horror1", "ゲーム実況/ホラー"),
+            ("TAGPATH#ゲーム実況", "VIDEO#horror1", "ゲーム実況/ホラー"),
+            ("TAGPATH#ゲーム実況/ホラー", "YEAR#2024", "ゲーム実況/ホラー"),
+        ],
+    )
+    async def test_get_videos_by_tag_path_foreign_last_key(
+        self,
+        service: DynamoDBService,
+        mock_table: MagicMock,
+        pk: str,
+        sk: str,
+        tag: str,
+    ) -> None:
+        """Test a last_key of another tag path or index is rejected."""
+        last_key = json.dumps(
+            {"PK": pk, "SK": sk, "Tag": tag, "created_at": "2024-05-01T00:00:00Z"},
+            ensure_ascii=False,
+        )
+
+        with pytest.raises(ValueError, match="^Invalid last_key: "):
+            await service.get_videos_by_tag_path("ゲーム実況", last_key=last_key)
+
+        mock_table.query.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_get_memory_thumbnails(
+    async def test_get_videos_by_tag_path_empty_path(
         self, service: DynamoDBService, mock_table: MagicMock
     ) -> None:
-        """Test get_memory_thumbnails."""
-        mock_response = {
+        """Test an empty tag path pages through every video, newest first."""
+        mock_table.scan.return_value = {
             "Items": [
                 {
-                    "video_id": f"video{i}",
-                    "title": f"Video {i}",
-                    "year": Decimal("2024"),
-                    "thumbnail_url": f"https://example.com/thumb{i}.jpg",
+                    "video_id": "a",
+                    "title": "A",
+                    "year": Decimal("2023"),
+                    "created_at": "2023-01-01T00:00:00Z",
+                },
+                {
+                    "video_id": "b",
+                    "title": "B",
+                    "year": Decimal("2024"),
+                    "created_at": "2024-01-01T00:00:00Z",
+                },
+                {"video_id": "c", "title": "C", "year": Decimal("2024")},
+            ]
+        }
+
+        first, last_key = await service.get_videos_by_tag_path("/", limit=2)
+        rest, end_key = await service.get_videos_by_tag_path(
+            "/", limit=2, last_key=last_key
+        )
+
+        assert [v.video_id for v in first] == ["b", "a"]
+        assert [v.video_id for v in rest] == ["c"]
+        assert end_key is None
+        mock_table.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_count_videos_by_tag_path(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test counts are read from the items written by the import script."""
+        mock_table.get_item.return_value = {"Item": {"video_count": Decimal("12")}}
+
+        assert await service.count_videos_by_tag_path("ゲーム実況/ホラー") == 12
+        mock_table.get_item.assert_called_with(
+            Key={"PK": "TAGPATH#ゲーム実況/ホラー", "SK": "META#COUNT"}
+        )
+
+        assert await service.count_videos_by_tag_path("/") == 12
+        mock_table.get_item.assert_called_with(
+            Key={"PK": "META#CATALOG", "SK": "META#CATALOG"}
+        )
+
+        mock_table.get_item.return_value = {}
+        assert await service.count_videos_by_tag_path("雑談") is None
+        mock_table.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_count_videos_by_tag_path_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test count_videos_by_tag_path with DynamoDB error."""
+        mock_table.get_item.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "GetItem"
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to count videos by tag path"):
+            await service.count_videos_by_tag_path("雑談")
+
+    @pytest.mark.asyncio
+    async def test_get_videos_by_tag_path_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get_videos_by_tag_path with DynamoDB error."""
+        mock_table.query.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "Query"
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to get videos by tag path"):
+            await service.get_videos_by_tag_path("雑談")
+
+    @pytest.mark.asyncio
+    async def test_get_random_videos(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get_random_videos."""
+        mock_response = {
+            "Items": [
+                {
+                    "video_id": f"video{i}",
+                    "title": f"Video {i}",
+                    "year": Decimal("2024"),
+                }
+                for i in range(10)
+            ]
+        }
+        mock_table.scan.return_value = mock_response
+
+        videos = await service.get_random_videos(count=3)
+
+        assert len(videos) == 3
+        # Check that all videos are from the original set
+        video_ids = {v.video_id for v in videos}
+        assert all(vid.startswith("video") for vid in video_ids)
+
+    @pytest.fixture
+    def ordinal_table(self, mock_table: MagicMock) -> dict[int, dict[str, Any]]:
+        """Serve a catalog summary and ByOrdinal lookups from the mock table."""
+        items = {
+            ordinal: {
+                "video_id": f"video{ordinal}",
+                "title": f"Video {ordinal}",
+                "year": Decimal("2024"),
+                "thumbnail_url": f"https://example.com/thumb{ordinal}.jpg",
+                "ordinal": Decimal(ordinal),
+            }
+            for ordinal in range(10)
+        }
+
+        def query(**kwargs: Any) -> dict[str, Any]:
+            assert kwargs["IndexName"] == "ByOrdinal"
+            ordinal = kwargs["KeyConditionExpression"].get_expression()["values"][1]
+            item = items.get(ordinal)
+            return {"Items": [item] if item else []}
+
+        mock_table.get_item.return_value = {
+            "Item": {"PK": "META#CATALOG", "video_count": Decimal(len(items))}
+        }
+        mock_table.query.side_effect = query
+        return items
+
+    @pytest.mark.asyncio
+    async def test_get_random_videos_by_ordinal(
+        self,
+        service: DynamoDBService,
+        mock_table: MagicMock,
+        ordinal_table: dict[int, dict[str, Any]],
+    ) -> None:
+        """Test random videos are read with one lookup per video."""
+        videos = await service.get_random_videos(count=3)
+
+        assert len({v.video_id for v in videos}) == 3
+        assert mock_table.get_item.call_count == 1
+        assert mock_table.query.call_count == 3
+        mock_table.scan.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_random_videos_distribution_is_uniform(
+        self,
+        service: DynamoDBService,
+        ordinal_table: dict[int, dict[str, Any]],
+    ) -> None:
+        """Test every video is drawn equally often across many samples."""
+
+        async def run_inline(func: Any) -> Any:
+            return func()
+
+        # Thousands of thread hand-offs add nothing to a distribution test
+        service._run = run_inline  # type: ignore[method-assign]
+
+        state = random.getstate()
+        random.seed(20240101)
+        try:
+            counts = dict.fromkeys(ordinal_table, 0)
+            draws = 1000
+            for _ in range(draws):
+                for video in await service.get_random_videos(count=3):
+                    counts[int(video.video_id.removeprefix("video"))] += 1
+        finally:
+            random.setstate(state)
+
+        expected = draws * 3 / len(counts)
+        chi_square = sum((n - expected) ** 2 / expected for n in counts.values())
+        # Critical value of the chi-square distribution, 9 dof, p = 0.001
+        assert chi_square < 27.88
+
+    @pytest.mark.asyncio
+    async def test_get_random_videos_skips_missing_ordinals(
+        self,
+        service: DynamoDBService,
+        ordinal_table: dict[int, dict[str, Any]],
+    ) -> None:
+        """Test gaps in the ordinal sequence are replaced by other videos."""
+        for ordinal in (1, 4, 7):
+            del ordinal_table[ordinal]
+
+        videos = await service.get_random_videos(count=4)
+        assert len({v.video_id for v in videos}) == 4
+        assert not {"video1", "video4", "video7"} & {v.video_id for v in videos}
+
+        videos = await service.get_random_videos(count=20)
+        assert len(videos) == 7
+
+    @pytest.mark.asyncio
+    async def test_get_random_videos_reach_ordinal_limit(
+        self,
+        service: DynamoDBService,
+        mock_table: MagicMock,
+        ordinal_table: dict[int, dict[str, Any]],
+    ) -> None:
+        """Test ordinals kept after deletions are drawn up to ordinal_limit."""
+        for ordinal in range(5):
+            del ordinal_table[ordinal]
+        mock_table.get_item.return_value = {
+            "Item": {"video_count": Decimal(5), "ordinal_limit": Decimal(10)}
+        }
+
+        videos = await service.get_random_videos(count=5)
+
+        assert {v.video_id for v in videos} == {f"video{i}" for i in range(5, 10)}
+
+    @pytest.mark.asyncio
+    async def test_get_memory_thumbnails_replaces_videos_without_one(
+        self,
+        service: DynamoDBService,
+        ordinal_table: dict[int, dict[str, Any]],
+    ) -> None:
+        """Test videos without a thumbnail are replaced by further draws."""
+        for ordinal in range(0, 10, 2):
+            del ordinal_table[ordinal]["thumbnail_url"]
+
+        thumbnails = await service.get_memory_thumbnails(pairs=5)
+
+        assert sorted(set(thumbnails)) == [
+            f"https://example.com/thumb{i}.jpg" for i in range(1, 10, 2)
+        ]
+        assert len(thumbnails) == 10
+
+    @pytest.mark.asyncio
+    async def test_get_memory_thumbnails_by_ordinal(
+        self,
+        service: DynamoDBService,
+        mock_table: MagicMock,
+        ordinal_table: dict[int, dict[str, Any]],
+    ) -> None:
+        """Test memory thumbnails are sampled without scanning."""
+        thumbnails = await service.get_memory_thumbnails(pairs=4)
+
+        assert len(thumbnails) == 8
+        assert all(thumbnails.count(t) == 2 for t in thumbnails)
+        mock_table.scan.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_random_videos_empty_table(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get_random_videos with empty table."""
+        mock_table.scan.return_value = {"Items": []}
+
+        videos = await service.get_random_videos(count=5)
+
+        assert len(videos) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_memory_thumbnails(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get_memory_thumbnails."""
+        mock_response = {
+            "Items": [
+                {
+                    "video_id": f"video{i}",
+                    "title": f"Video {i}",
+                    "year": Decimal("2024"),
+                    "thumbnail_url": f"https://example.com/thumb{i}.jpg",
                 }
                 for i in range(10)
             ]
@@ -466,13 +1679,13 @@ class TestDynamoDBService:
 
         assert len(thumbnails) == 0
 
-    def test_add_tags_to_tree(self, service: DynamoDBService) -> None:
-        """Test _add_tags_to_tree method."""
+    def test_add_tags_to_tree(self) -> None:
+        """Test add_tags_to_tree."""
         tree: dict[str, Any] = {}
 
-        service._add_tags_to_tree(tree, ["ゲーム実況", "ホラー", "Cry of Fear"])
-        service._add_tags_to_tree(tree, ["ゲーム実況", "ホラー", "Amnesia"])
-        service._add_tags_to_tree(tree, ["ゲーム実況", "アクション"])
+        add_tags_to_tree(tree, ["ゲーム実況", "ホラー", "Cry of Fear"])
+        add_tags_to_tree(tree, ["ゲーム実況", "ホラー", "Amnesia"])
+        add_tags_to_tree(tree, ["ゲーム実況", "アクション"])
 
         assert "ゲーム実況" in tree
         assert tree["ゲーム実況"]["count"] == 3
@@ -482,8 +1695,8 @@ class TestDynamoDBService:
         assert "Amnesia" in tree["ゲーム実況"]["children"]["ホラー"]["children"]
         assert "アクション" in tree["ゲーム実況"]["children"]
 
-    def test_dict_to_tag_nodes(self, service: DynamoDBService) -> None:
-        """Test _dict_to_tag_nodes method."""
+    def test_tag_tree_nodes(self) -> None:
+        """Test tag_tree_nodes."""
         tree = {
             "ゲーム実況": {
                 "count": 2,
@@ -494,7 +1707,7 @@ class TestDynamoDBService:
             }
         }
 
-        nodes = service._dict_to_tag_nodes(tree)
+        nodes = tag_tree_nodes(tree)
 
         assert len(nodes) == 1
         assert nodes[0].name == "ゲーム実況"
@@ -504,6 +1717,76 @@ class TestDynamoDBService:
         assert nodes[0].children[0].name == "アクション"  # type: ignore
         assert nodes[0].children[1].name == "ホラー"  # type: ignore
 
+    @pytest.mark.asyncio
+    async def test_get_tag_tree_json(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test reading the gzip-compressed materialized tag tree."""
+        body = '{"tree":[{"name":"雑談","children":null,"count":1}]}'.encode()
+        mock_table.get_item.return_value = {
+            "Item": {
+                "PK": "META#TAG_TREE",
+                "SK": "META#TAG_TREE",
+                "tree": Binary(gzip.compress(body)),
+                "content_encoding": "gzip",
+                "format_version": Decimal("1"),
+            }
+        }
+
+        result = await service.get_tag_tree_json()
+
+        assert result == body
+        mock_table.get_item.assert_called_once_with(
+            Key={"PK": "META#TAG_TREE", "SK": "META#TAG_TREE"}
+        )
+        mock_table.scan.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_tag_tree_gzip(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test the stored gzip stream is returned without decompressing it."""
+        stored = gzip.compress(b'{"tree":[]}')
+        mock_table.get_item.return_value = {
+            "Item": {
+                "tree": Binary(stored),
+                "content_encoding": "gzip",
+                "format_version": Decimal("1"),
+            }
+        }
+        assert await service.get_tag_tree_gzip() == stored
+
+        # Trees stored uncompressed are only served through get_tag_tree_json
+        mock_table.get_item.return_value = {
+            "Item": {"tree": Binary(b'{"tree":[]}'), "format_version": Decimal("1")}
+        }
+        assert await service.get_tag_tree_gzip() is None
+
+    @pytest.mark.asyncio
+    async def test_get_tag_tree_json_missing_or_stale(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a missing or outdated tag tree item falls back to None."""
+        mock_table.get_item.return_value = {}
+        assert await service.get_tag_tree_json() is None
+
+        mock_table.get_item.return_value = {
+            "Item": {"tree": Binary(b"{}"), "format_version": Decimal("0")}
+        }
+        assert await service.get_tag_tree_json() is None
+
+    @pytest.mark.asyncio
+    async def test_get_tag_tree_json_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get_tag_tree_json with DynamoDB error."""
+        mock_table.get_item.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "GetItem"
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to get tag tree"):
+            await service.get_tag_tree_json()
+
     @pytest.mark.asyncio
     async def test_build_tag_tree(
         self, service: DynamoDBService, mock_table: MagicMock
@@ -543,3 +1826,744 @@ class TestDynamoDBService:
         assert chat_node.count == 1
         assert len(chat_node.children) == 1  # type: ignore
         assert chat_node.children[0].name == "料理"  # type: ignore
+
+    @pytest.fixture
+    def cached_service(self, mock_table: MagicMock) -> DynamoDBService:
+        """Create DynamoDBService with a catalog cache and mocked table."""
+        service = DynamoDBService(
+            "test-table", scan_segments=1, cache=CatalogCache(ttl_seconds=60)
+        )
+        service.table = mock_table
+        mock_table.scan.return_value = {
+            "Items": [
+                {
+                    "video_id": f"video{i}",
+                    "title": f"Video {i}",
+                    "year": Decimal("2024"),
+                    "tags": ["ゲーム実況", "ホラー"] if i % 2 else ["雑談"],
+                    "thumbnail_url": f"https://example.com/thumb{i}.jpg",
+                }
+                for i in range(6)
+            ]
+        }
+        return service
+
+    @pytest.mark.asyncio
+    async def test_cached_reads_scan_once(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test catalog-wide reads share one scan while the cache is warm."""
+        tag_tree = await cached_service.build_tag_tree()
+        horror, _ = await cached_service.get_videos_by_tag_path("ゲーム実況/ホラー")
+        random_videos = await cached_service.get_random_videos(count=4)
+        thumbnails = await cached_service.get_memory_thumbnails(pairs=3)
+        by_ids = await cached_service.get_videos_by_ids(["video5", "none", "video0"])
+
+        assert mock_table.scan.call_count == 1
+        assert [node.name for node in tag_tree] == ["ゲーム実況", "雑談"]
+        assert {v.video_id for v in horror} == {"video1", "video3", "video5"}
+        assert len({v.video_id for v in random_videos}) == 4
+        assert len(thumbnails) == 6
+        assert all(thumbnails.count(t) == 2 for t in thumbnails)
+        assert [v.video_id for v in by_ids] == ["video5", "video0"]
+
+        assert cached_service.cache is not None
+        assert cached_service.cache.stats()["hits"] == 4
+        assert cached_service.cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_warm_container_loads_catalog(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test reads with a targeted fallback load the catalog once warm."""
+        assert cached_service.cache is not None
+        cached_service.cache.warm_after = 2
+        mock_table.get_item.return_value = {"Item": {"video_count": Decimal(5)}}
+
+        assert await cached_service.count_videos_by_tag_path("") == 5
+        assert mock_table.scan.call_count == 0
+
+        assert await cached_service.count_videos_by_tag_path("") == 6
+        assert await cached_service.count_videos_by_tag_path("雑談") == 3
+        assert mock_table.scan.call_count == 1
+        assert mock_table.get_item.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_passive_load_falls_back(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a failed opportunistic load answers with the targeted read."""
+        assert cached_service.cache is not None
+        cached_service.cache.warm_after = 1
+        mock_table.scan.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "Scan"
+        )
+        mock_table.get_item.return_value = {"Item": {"video_count": Decimal(5)}}
+
+        assert await cached_service.count_videos_by_tag_path("") == 5
+
+    @pytest.mark.asyncio
+    async def test_search_videos_pages(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test search pages come from one index kept with the snapshot."""
+        first, last_key, total = await cached_service.search_videos("video", limit=4)
+        rest, end_key, _ = await cached_service.search_videos(
+            "ＶＩＤＥＯ", limit=4, last_key=last_key
+        )
+
+        assert total == 6
+        assert last_key == '{"offset": 4}'
+        assert len(first) == 4
+        assert len(rest) == 2
+        assert end_key is None
+        assert {v.video_id for v in first + rest} == {f"video{i}" for i in range(6)}
+        assert mock_table.scan.call_count == 1
+
+        assert cached_service.cache is not None
+        catalog = cached_service.cache.get()
+        assert catalog is not None
+        assert catalog.title_index is catalog.title_index
+
+    @pytest.mark.asyncio
+    async def test_search_videos_without_cache(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test searching indexes a scan when the catalog cache is disabled."""
+        mock_table.scan.return_value = {
+            "Items": [
+                {"video_id": "a", "title": "【ASMR】耳かき", "year": Decimal("2024")},
+                {"video_id": "b", "title": "雑談", "year": Decimal("2024")},
+            ]
+        }
+
+        videos, last_key, total = await service.search_videos("ａｓｍｒ")
+
+        assert [v.video_id for v in videos] == ["a"]
+        assert last_key is None
+        assert total == 1
+
+    @pytest.mark.asyncio
+    async def test_search_index_kept_per_catalog_version(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test the uncached index is reused until the catalog version changes."""
+        service.version_ttl_seconds = 0
+        mock_table.get_item.return_value = {"Item": {"catalog_version": "v1"}}
+        mock_table.scan.return_value = {
+            "Items": [{"video_id": "a", "title": "【ASMR】耳かき", "year": 2024}]
+        }
+
+        await service.search_videos("asmr")
+        await service.search_videos("耳かき")
+        assert mock_table.scan.call_count == 1
+
+        mock_table.get_item.return_value = {"Item": {"catalog_version": "v2"}}
+        await service.search_videos("asmr")
+        assert mock_table.scan.call_count == 2
+
+        # Without a version the index cannot be checked, so it is not kept
+        mock_table.get_item.return_value = {}
+        await service.search_videos("asmr")
+        await service.search_videos("asmr")
+        assert mock_table.scan.call_count == 4
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("last_key", ["x", "{}", '{"offset": -1}', "[1]"])
+    async def test_search_videos_invalid_last_key(
+        self, cached_service: DynamoDBService, last_key: str
+    ) -> None:
+        """Test malformed search cursors are rejected."""
+        with pytest.raises(ValueError, match="Invalid last_key"):
+            await cached_service.search_videos("video", last_key=last_key)
+
+    @pytest.mark.asyncio
+    async def test_search_videos_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test DynamoDB errors while indexing are reported."""
+        mock_table.scan.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "Scan"
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to search videos"):
+            await service.search_videos("video")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_reads_share_one_scan(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test requests arriving before the cache is filled scan once."""
+        items = mock_table.scan.return_value
+
+        def slow_scan(**kwargs: Any) -> dict[str, Any]:
+            time.sleep(0.05)
+            return cast("dict[str, Any]", items)
+
+        mock_table.scan.side_effect = slow_scan
+
+        trees = await asyncio.gather(
+            *(cached_service.build_tag_tree() for _ in range(10))
+        )
+
+        assert mock_table.scan.call_count == 1
+        assert all(tree == trees[0] for tree in trees)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scan_fallbacks_share_one_scan(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test uncached full-table reads in flight together scan once."""
+
+        def slow_scan(**kwargs: Any) -> dict[str, Any]:
+            time.sleep(0.05)
+            return {
+                "Items": [
+                    {"video_id": f"video{i}", "title": "t", "year": Decimal("2024")}
+                    for i in range(3)
+                ]
+            }
+
+        mock_table.scan.side_effect = slow_scan
+
+        results = await asyncio.gather(
+            *(service.get_random_videos(count=2) for _ in range(5))
+        )
+
+        assert mock_table.scan.call_count == 1
+        assert all(len(videos) == 2 for videos in results)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cold_read_error(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a failed shared load fails every waiting request."""
+
+        def failing_scan(**kwargs: Any) -> dict[str, Any]:
+            time.sleep(0.05)
+            raise ClientError({"Error": {"Code": "InternalServerError"}}, "Scan")
+
+        mock_table.scan.side_effect = failing_scan
+
+        results = await asyncio.gather(
+            *(cached_service.build_tag_tree() for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert mock_table.scan.call_count == 1
+        assert all(
+            isinstance(r, RuntimeError) and "Failed to build tag tree" in str(r)
+            for r in results
+        )
+
+    @pytest.mark.asyncio
+    async def test_cached_read_error(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a failed catalog load is reported and not cached."""
+        mock_table.scan.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "Scan"
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to build tag tree"):
+            await cached_service.build_tag_tree()
+
+        assert cached_service.cache is not None
+        assert cached_service.cache.stats()["cached_items"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cached_tag_path_pages(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test tag pages from the cache use the ByTagDate cursor format."""
+        await cached_service.build_tag_tree()
+
+        first, last_key = await cached_service.get_videos_by_tag_path(
+            "ゲーム実況/ホラー", limit=2
+        )
+        rest, end_key = await cached_service.get_videos_by_tag_path(
+            "ゲーム実況/ホラー", limit=2, last_key=last_key
+        )
+
+        # No publish dates, so ties are ordered by ID like the index
+        assert [v.video_id for v in first] == ["video5", "video3"]
+        assert [v.video_id for v in rest] == ["video1"]
+        assert end_key is None
+        assert last_key is not None
+        assert json.loads(last_key) == {
+            "PK": "TAGPATH#ゲーム実況/ホラー",
+            "SK": "VIDEO#video3",
+            "Tag": "ゲーム実況/ホラー",
+            "created_at": "",
+        }
+        mock_table.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_count_videos_by_tag_path_cached(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test counts come from the warm catalog cache."""
+        await cached_service.build_tag_tree()
+
+        assert await cached_service.count_videos_by_tag_path("ゲーム実況/ホラー") == 3
+        assert await cached_service.count_videos_by_tag_path("") == 6
+        assert await cached_service.count_videos_by_tag_path("なし") == 0
+        mock_table.get_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cold_cache_tag_path_uses_index(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a cold cache does not turn a tag path lookup into a scan."""
+        mock_table.query.return_value = {"Items": []}
+
+        videos, last_key = await cached_service.get_videos_by_tag_path("雑談")
+
+        assert videos == []
+        assert last_key is None
+        mock_table.scan.assert_not_called()
+        mock_table.query.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_catalog_version_memoized(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test the catalog version is read once per TTL."""
+        mock_table.get_item.return_value = {"Item": {"catalog_version": "abc"}}
+
+        assert await service.get_catalog_version() == "abc"
+        assert await service.get_catalog_version() == "abc"
+
+        mock_table.get_item.assert_called_once_with(
+            Key={"PK": "META#CATALOG", "SK": "META#CATALOG"},
+            ProjectionExpression="catalog_version",
+        )
+
+        service.version_ttl_seconds = 0
+        mock_table.get_item.return_value = {}
+        assert await service.get_catalog_version() is None
+        assert mock_table.get_item.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_catalog_version_change_invalidates_cache(
+        self, cached_service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test a new catalog version drops the cached snapshot."""
+        cached_service.version_ttl_seconds = 0
+        mock_table.get_item.return_value = {"Item": {"catalog_version": "v1"}}
+        await cached_service.get_catalog_version()
+        await cached_service.build_tag_tree()
+
+        await cached_service.get_catalog_version()
+        await cached_service.build_tag_tree()
+        assert mock_table.scan.call_count == 1
+
+        mock_table.get_item.return_value = {"Item": {"catalog_version": "v2"}}
+        await cached_service.get_catalog_version()
+        await cached_service.build_tag_tree()
+        assert mock_table.scan.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_catalog_version_error(
+        self, service: DynamoDBService, mock_table: MagicMock
+    ) -> None:
+        """Test get catalog version with DynamoDB error."""
+        mock_table.get_item.side_effect = ClientError(
+            {"Error": {"Code": "InternalServerError"}}, "GetItem"
+        )
+
+        with pytest.raises(RuntimeError, match="Failed to get catalog version"):
+            await service.get_catalog_version()
+
+
+class TestLocalStorage:
+    """Test cases for the SQLite stand-in of the DynamoDB table."""
+
+    RECORDS = [
+        {
+            "video_id": f"v{index}",
+            "title": f"配信 {index}",
+            "tags": tags,
+            "published_at": f"{year}-0{month}-01T00:00:00Z",
+        }
+        for index, (year, month, tags) in enumerate(
+            [
+                (2023, 1, ["ゲーム実況", "ホラー"]),
+                (2023, 2, ["雑談"]),
+                (2024, 3, ["ゲーム実況", "ホラー", "Cry of Fear"]),
+                (2024, 4, ["ゲーム実況", "RPG"]),
+                (2024, 5, []),
+            ]
+        )
+    ]
+
+    @pytest.fixture
+    def resource(self) -> Any:
+        """Create local storage seeded with RECORDS."""
+        resource = LocalDynamoDB()
+        seed_videos(resource.Table("videos"), self.RECORDS)
+        yield resource
+        resource.close()
+
+    @pytest.fixture
+    def table(self, resource: LocalDynamoDB) -> LocalTable:
+        """Get the seeded table."""
+        return resource.Table("videos")
+
+    def test_seed_layout(self, table: LocalTable) -> None:
+        """Test seeding writes the items of the import script."""
+        item = table.get_item(Key={"PK": "YEAR#2024", "SK": "VIDEO#v2"})["Item"]
+        assert item["year"] == Decimal(2024)
+        assert item["ordinal"] == Decimal(2)
+        assert item["tags"] == ["ゲーム実況", "ホラー", "Cry of Fear"]
+
+        count = table.get_item(Key={"PK": "TAGPATH#ゲーム実況", "SK": "META#COUNT"})
+        assert count["Item"]["video_count"] == Decimal(3)
+        lookup = table.get_item(Key={"PK": "VIDEO#v1", "SK": "VIDEO#v1"})
+        assert lookup["Item"]["video"]["title"] == "配信 1"
+
+        catalog = table.get_item(Key={"PK": "META#CATALOG", "SK": "META#CATALOG"})
+        assert catalog["Item"]["video_count"] == Decimal(5)
+        assert catalog["Item"]["years"] == [Decimal(2024), Decimal(2023)]
+        assert len(catalog["Item"]["catalog_version"]) == 16
+
+        tree = table.get_item(Key={"PK": "META#TAG_TREE", "SK": "META#TAG_TREE"})
+        assert isinstance(tree["Item"]["tree"], Binary)
+        nodes = json.loads(gzip.decompress(tree["Item"]["tree"].value))["tree"]
+        assert [node["name"] for node in nodes] == ["ゲーム実況", "雑談"]
+
+    def test_items_keep_dynamodb_types(self, table: LocalTable) -> None:
+        """Test stored items read back with their DynamoDB types."""
+        item = {
+            "PK": "TEST",
+            "SK": "TEST",
+            "count": 3,
+            "ratio": Decimal("0.10"),
+            "payload": b"\x00\x1f\x8b",
+            "nested": {"flags": [True, None, "x"], "ids": {"a", "b"}},
+            "numbers": {Decimal(1), Decimal(2)},
+        }
+        table.put_item(Item=item)
+
+        stored = table.get_item(Key={"PK": "TEST", "SK": "TEST"})["Item"]
+        assert stored["count"] == Decimal(3)
+        assert str(stored["ratio"]) == "0.10"
+        assert stored["payload"] == Binary(b"\x00\x1f\x8b")
+        assert stored["nested"] == {"flags": [True, None, "x"], "ids": {"a", "b"}}
+        assert stored["numbers"] == {Decimal(1), Decimal(2)}
+
+    def test_query_index_in_sort_order(self, table: LocalTable) -> None:
+        """Test queries read one partition of an index in sort key order."""
+        response = table.query(
+            IndexName="ByYearDate",
+            KeyConditionExpression=Key("year").eq(2024),
+            ScanIndexForward=False,
+        )
+
+        assert [item["video_id"] for item in response["Items"]] == ["v4", "v3", "v2"]
+        assert response["Count"] == response["ScannedCount"] == 3
+        assert "LastEvaluatedKey" not in response
+
+    def test_query_sort_key_condition(self, table: LocalTable) -> None:
+        """Test sort key conditions narrow the range read."""
+        response = table.query(
+            IndexName="ByTagDate",
+            KeyConditionExpression=Key("Tag").eq("ゲーム実況")
+            & Key("created_at").begins_with("2024"),
+            ProjectionExpression="video",
+        )
+
+        assert [item["video"]["video_id"] for item in response["Items"]] == [
+            "v2",
+            "v3",
+        ]
+        assert all(set(item) == {"video"} for item in response["Items"])
+
+    def test_indexes_are_sparse(self, table: LocalTable) -> None:
+        """Test items without an index's key attributes are not in it."""
+        response = table.query(
+            IndexName="ByVideoId", KeyConditionExpression=Key("video_id").eq("v1")
+        )
+
+        # Only the year item has a top-level video_id
+        assert [item["PK"] for item in response["Items"]] == ["YEAR#2023"]
+
+    def test_query_pagination(self, table: LocalTable) -> None:
+        """Test Limit pages resume from LastEvaluatedKey."""
+        kwargs: dict[str, Any] = {
+            "IndexName": "GSI1",
+            "KeyConditionExpression": Key("year").eq(2024),
+            "Limit": 2,
+        }
+        first = table.query(**kwargs)
+        second = table.query(**kwargs, ExclusiveStartKey=first["LastEvaluatedKey"])
+
+        assert first["LastEvaluatedKey"] == {
+            "PK": "YEAR#2024",
+            "SK": "VIDEO#v3",
+            "year": Decimal(2024),
+        }
+        assert [item["video_id"] for item in first["Items"] + second["Items"]] == [
+            "v2",
+            "v3",
+            "v4",
+        ]
+        assert "LastEvaluatedKey" not in second
+
+    def test_query_requires_partition_key(self, table: LocalTable) -> None:
+        """Test invalid key conditions and unknown indexes are rejected."""
+        with pytest.raises(ClientError, match="KeyConditionExpression"):
+            table.query(IndexName="GSI1", KeyConditionExpression=Key("SK").eq("x"))
+        with pytest.raises(ClientError, match="Unknown index"):
+            table.query(IndexName="Missing", KeyConditionExpression=Key("PK").eq("x"))
+
+    def test_scan_segments_partition_table(self, table: LocalTable) -> None:
+        """Test the segments of a parallel scan cover every item once."""
+        keys = []
+        for segment in range(3):
+            response = table.scan(Segment=segment, TotalSegments=3)
+            keys += [(item["PK"], item["SK"]) for item in response["Items"]]
+
+        assert len(keys) == len(set(keys)) == table.item_count
+
+    def test_delete_item(self, table: LocalTable) -> None:
+        """Test items are deleted by key and missing keys are ignored."""
+        count = table.item_count
+        key = {"PK": "YEAR#2023", "SK": "VIDEO#v0"}
+
+        table.delete_item(Key=key)
+        table.delete_item(Key=key)
+
+        assert "Item" not in table.get_item(Key=key)
+        assert table.item_count == count - 1
+
+    def test_scan_filter(self, table: LocalTable) -> None:
+        """Test filters drop items after they are read."""
+        by_key = table.scan(FilterExpression=VIDEO_ITEM_FILTER)
+        by_attribute = table.scan(
+            FilterExpression=Attr("title").begins_with("配信")
+            & Attr("tags").contains("雑談")
+        )
+
+        assert by_key["Count"] == 5
+        assert by_key["ScannedCount"] == table.item_count
+        assert [item["video_id"] for item in by_attribute["Items"]] == ["v1"]
+        assert by_attribute["ScannedCount"] == table.item_count
+
+    def test_scan_sparse_index(self, table: LocalTable) -> None:
+        """Test scanning an index reads only the items that carry its keys."""
+        first = table.scan(IndexName=VIDEO_SCAN_INDEX, Limit=3)
+        rest = table.scan(
+            IndexName=VIDEO_SCAN_INDEX, ExclusiveStartKey=first["LastEvaluatedKey"]
+        )
+
+        assert set(first["LastEvaluatedKey"]) == {"PK", "SK", "year", "created_at"}
+        assert first["ScannedCount"] + rest["ScannedCount"] == 5
+        assert sorted(item["video_id"] for item in first["Items"] + rest["Items"]) == [
+            "v0",
+            "v1",
+            "v2",
+            "v3",
+            "v4",
+        ]
+        with pytest.raises(ClientError, match="Unknown index"):
+            table.scan(IndexName="Missing")
+
+    def test_pages_end_after_one_megabyte(self, resource: LocalDynamoDB) -> None:
+        """Test reads stop after 1 MB like DynamoDB's."""
+        table = resource.Table("large")
+        table.put_items(
+            {"PK": "BIG", "SK": f"{index:02d}", "blob": "x" * 300_000}
+            for index in range(8)
+        )
+
+        first = table.query(KeyConditionExpression=Key("PK").eq("BIG"))
+        rest = table.query(
+            KeyConditionExpression=Key("PK").eq("BIG"),
+            ExclusiveStartKey=first["LastEvaluatedKey"],
+        )
+
+        assert first["Count"] == -(-PAGE_BYTES // 300_000)
+        assert first["Count"] + rest["Count"] == 8
+
+    def test_batch_get_item(self, resource: LocalDynamoDB) -> None:
+        """Test BatchGetItem returns the items found, projected."""
+        keys = [
+            {"PK": f"VIDEO#{video_id}", "SK": f"VIDEO#{video_id}"}
+            for video_id in ("v0", "missing", "v3")
+        ]
+        response = resource.batch_get_item(
+            RequestItems={"videos": {"Keys": keys, "ProjectionExpression": "video"}},
+            ReturnConsumedCapacity="TOTAL",
+        )
+
+        items = response["Responses"]["videos"]
+        assert [item["video"]["video_id"] for item in items] == ["v0", "v3"]
+        assert response["UnprocessedKeys"] == {}
+        assert response["ConsumedCapacity"][0]["CapacityUnits"] == 1.0
+
+        with pytest.raises(ClientError, match="Too many keys"):
+            resource.batch_get_item(RequestItems={"videos": {"Keys": keys * 34}})
+
+    def test_reads_are_recorded(self, table: LocalTable) -> None:
+        """Test reads count against the request like boto3 calls."""
+        with patch("app.services.local_storage.record_response") as record:
+            response = table.get_item(Key={"PK": "YEAR#2023", "SK": "VIDEO#v0"})
+
+        assert "ConsumedCapacity" not in response
+        record.assert_called_once()
+        assert record.call_args.args[0]["ConsumedCapacity"]["CapacityUnits"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_service_over_local_storage(self, resource: LocalDynamoDB) -> None:
+        """Test DynamoDBService runs unchanged against local storage."""
+        service = DynamoDBService("videos", scan_segments=2, resource=resource)
+
+        videos, last_key = await service.get_videos_by_year(2024, limit=2)
+        tree = await service.build_tag_tree()
+        tagged, _ = await service.get_videos_by_tag_path("ゲーム実況/ホラー")
+        found = await service.get_videos_by_ids(["v1", "v4"])
+
+        assert [video.video_id for video in videos] == ["v4", "v3"]
+        assert last_key is not None
+        assert {node.name: node.count for node in tree} == {"ゲーム実況": 3, "雑談": 1}
+        assert [video.video_id for video in tagged] == ["v2", "v0"]
+        assert [video.video_id for video in found] == ["v1", "v4"]
+        assert await service.count_videos_by_tag_path("ゲーム実況") == 3
+        assert await service.get_video_by_id("v4") == found[1]
+
+
+class TestRequestMetrics:
+    """Test cases for per-request DynamoDB accounting."""
+
+    def test_record_responses(self) -> None:
+        """Test each read operation's response is added to the tally."""
+        usage = DynamoDBUsage()
+
+        usage.record(
+            {
+                "Count": 2,
+                "ScannedCount": 10,
+                "ConsumedCapacity": {"CapacityUnits": 1.5},
+            }
+        )
+        usage.record({"Item": {}, "ConsumedCapacity": {"CapacityUnits": 0.5}})
+        usage.record({"ConsumedCapacity": {"CapacityUnits": 0.5}})
+        usage.record(
+            {
+                "Responses": {"videos": [{}, {}, {}]},
+                "ConsumedCapacity": [{"CapacityUnits": 1.0}],
+            }
+        )
+        usage.record({"Error": {"Code": "ProvisionedThroughputExceededException"}})
+
+        assert usage.calls == 5
+        assert usage.count == 6
+        assert usage.scanned_count == 14
+        assert usage.consumed_capacity == 3.5
+
+    @pytest.fixture
+    def stubbed_resource(self) -> Any:
+        """Create an instrumented DynamoDB resource with a stubbed client."""
+        resource = boto3.resource("dynamodb", region_name="us-east-1")
+        instrument_client(resource.meta.client)
+        with Stubber(resource.meta.client) as stubber:
+            yield resource, stubber
+
+    def test_instrumented_client(self, stubbed_resource: Any) -> None:
+        """Test only calls made while tracking are changed and counted."""
+        resource, stubber = stubbed_resource
+        table = resource.Table("videos")
+        key = {"PK": "META#CATALOG", "SK": "META#CATALOG"}
+        stubber.add_response(
+            "get_item",
+            {"ConsumedCapacity": {"TableName": "videos", "CapacityUnits": 0.5}},
+            {"TableName": "videos", "Key": key, "ReturnConsumedCapacity": "TOTAL"},
+        )
+        stubber.add_response("get_item", {}, {"TableName": "videos", "Key": key})
+
+        with track_dynamodb_usage() as usage:
+            table.get_item(Key=key)
+        table.get_item(Key=key)
+
+        stubber.assert_no_pending_responses()
+        assert usage.calls == 1
+        assert usage.consumed_capacity == 0.5
+
+    @pytest.mark.asyncio
+    async def test_service_calls_counted_per_request(
+        self, stubbed_resource: Any
+    ) -> None:
+        """Test calls the service runs on worker threads count for the request."""
+        resource, stubber = stubbed_resource
+        service = DynamoDBService("videos", scan_segments=2)
+        service.table = resource.Table("videos")
+        for _ in range(2):
+            stubber.add_response(
+                "scan",
+                {
+                    "Items": [
+                        {
+                            "video_id": {"S": "a"},
+                            "title": {"S": "A"},
+                            "year": {"N": "1"},
+                        }
+                    ],
+                    "Count": 1,
+                    "ScannedCount": 3,
+                    "ConsumedCapacity": {"TableName": "videos", "CapacityUnits": 2.0},
+                },
+            )
+
+        with track_dynamodb_usage() as usage:
+            await service.build_tag_tree()
+
+        assert usage.calls == 2
+        assert usage.count == 2
+        assert usage.scanned_count == 6
+        assert usage.consumed_capacity == 4.0
+
+
+class TestServerTiming:
+    """Test cases for request phase timing."""
+
+    def test_span_outside_request_is_noop(self) -> None:
+        """Test spans cost no allocation when nothing collects them."""
+        assert span("convert") is span("tree")
+        with span("convert"):
+            pass
+
+    def test_spans_add_up_per_phase(self) -> None:
+        """Test spans of the same phase are summed and counted."""
+        with track_server_timing() as timing:
+            with span("convert"):
+                pass
+            with span("convert"):
+                pass
+            timing.add("dynamodb", 12.34)
+
+        assert list(timing.durations()) == ["convert", "dynamodb"]
+        assert timing.durations()["dynamodb"] == 12.34
+        header = timing.header()
+        assert header.startswith('convert;dur=0.0;desc="2 calls", ')
+        assert header.endswith("dynamodb;dur=12.3")
+
+    def test_header_empty(self) -> None:
+        """Test an untouched collector formats as an empty header."""
+        assert ServerTiming().header() == ""
+
+    def test_client_calls_timed(self) -> None:
+        """Test DynamoDB calls of a tracked request form the dynamodb phase."""
+        resource = boto3.resource("dynamodb", region_name="us-east-1")
+        time_client_calls(resource.meta.client)
+        table = resource.Table("videos")
+        with Stubber(resource.meta.client) as stubber:
+            stubber.add_response("get_item", {})
+            stubber.add_response("get_item", {})
+
+            with track_server_timing() as timing:
+                table.get_item(Key={"PK": "a", "SK": "a"})
+            table.get_item(Key={"PK": "a", "SK": "a"})
+
+        assert list(timing.durations()) == ["dynamodb"]
+        assert timing.phases["dynamodb"][1] == 1
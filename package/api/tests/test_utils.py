@@ -114,7 +114,7 @@ def create_mock_db_service(
         # Configure return values
         mock_service.get_videos_by_year.return_value = (videos, None)
         mock_service.get_video_by_id.return_value = videos[0] if videos else None
-        mock_service.get_videos_by_tag_path.return_value = videos
+        mock_service.get_videos_by_tag_path.return_value = (videos, None)
         mock_service.get_random_videos.return_value = videos[:1] if videos else []
 
         # For memory thumbnails, create pairs
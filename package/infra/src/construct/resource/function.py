@@ -68,6 +68,10 @@ class LambdaConstruct(Construct):
             description=project.description,
             environment={
                 "ENV_NAME": environment.name,
+                # 本番系では /docs と OpenAPI スキーマを公開しない
+                "API_DOCS_ENABLED": str(not environment.is_production()).lower(),
+                # 本番系では処理時間の内訳 (Server-Timing ヘッダー) を返さない
+                "SERVER_TIMING_ENABLED": str(not environment.is_production()).lower(),
                 "POWERTOOLS_SERVICE_NAME": project.name,
                 "POWERTOOLS_METRICS_NAMESPACE": project.name,
                 "PROJECT_MAJOR_VERSION": project.major_version,
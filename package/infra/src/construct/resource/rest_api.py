@@ -41,6 +41,12 @@ class ApigwConstruct(Construct):
             handler=function,
             proxy=True,
             description=project.description,
+            # API Gateway はリクエストの Accept がバイナリメディアタイプに一致する
+            # ときだけ base64 をデコードし、API は Accept-Encoding だけで圧縮を
+            # 決めるため、どの Accept でもデコードされるよう */* とする。
+            # Mangum は UTF-8 として読めない本文（gzip/br で圧縮済みの JSON）
+            # だけを base64 で返し、非圧縮の JSON やエラーはテキストのまま返す。
+            binary_media_types=["*/*"],
             deploy_options=apigw.StageOptions(
                 logging_level=apigw.MethodLoggingLevel.ERROR,
                 stage_name=project.major_version,
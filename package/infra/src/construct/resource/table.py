@@ -7,6 +7,51 @@ from constructs import Construct
 from src.model.env import Env
 
 
+# GSIs added after the first release, in the order they are rolled out
+STAGED_INDEXES: list[dict[str, Any]] = [
+    # Direct video lookups by ID
+    {
+        "index_name": "ByVideoId",
+        "partition_key": dynamodb.Attribute(
+            name="video_id",
+            type=dynamodb.AttributeType.STRING,
+        ),
+    },
+    # Random sampling by the ordinal assigned at import time
+    {
+        "index_name": "ByOrdinal",
+        "partition_key": dynamodb.Attribute(
+            name="ordinal",
+            type=dynamodb.AttributeType.NUMBER,
+        ),
+    },
+    # Date-ordered reads within a year (cross-year feed)
+    {
+        "index_name": "ByYearDate",
+        "partition_key": dynamodb.Attribute(
+            name="year",
+            type=dynamodb.AttributeType.NUMBER,
+        ),
+        "sort_key": dynamodb.Attribute(
+            name="created_at",
+            type=dynamodb.AttributeType.STRING,
+        ),
+    },
+    # Date-ordered, paginated reads within a tag path
+    {
+        "index_name": "ByTagDate",
+        "partition_key": dynamodb.Attribute(
+            name="Tag",
+            type=dynamodb.AttributeType.STRING,
+        ),
+        "sort_key": dynamodb.Attribute(
+            name="created_at",
+            type=dynamodb.AttributeType.STRING,
+        ),
+    },
+]
+
+
 class DynamoDBConstruct(Construct):
     """DynamoDB table construct for archive metadata."""
 
@@ -71,6 +116,20 @@ class DynamoDBConstruct(Construct):
             ),
         )
 
+        # Indexes added after the first release, in rollout order.
+        # CloudFormation creates at most one GSI per table update, so an
+        # existing table gets them one deploy at a time: the
+        # tableIndexStage context (e.g. `cdk deploy -c tableIndexStage=1`)
+        # keeps only the first N of them. Without it, all are created,
+        # which is what new tables and the tests get.
+        # See docs/operations/deployment.md for the rollout order.
+        staged_indexes = STAGED_INDEXES
+        stage = self.node.try_get_context("tableIndexStage")
+        if stage is not None:
+            staged_indexes = STAGED_INDEXES[: int(stage)]
+        for index in staged_indexes:
+            self.table.add_global_secondary_index(**index)
+
         # Output table name
         cdk.CfnOutput(
             self,
@@ -71,12 +71,95 @@ def test_dynamodb_table_configuration() -> None:
                     "Projection": {
                         "ProjectionType": "ALL",
                     },
+                }),
+                Match.object_like({
+                    "IndexName": "ByVideoId",
+                    "KeySchema": [
+                        {
+                            "AttributeName": "video_id",
+                            "KeyType": "HASH",
+                        },
+                    ],
+                    "Projection": {
+                        "ProjectionType": "ALL",
+                    },
+                }),
+                Match.object_like({
+                    "IndexName": "ByOrdinal",
+                    "KeySchema": [
+                        {
+                            "AttributeName": "ordinal",
+                            "KeyType": "HASH",
+                        },
+                    ],
+                    "Projection": {
+                        "ProjectionType": "ALL",
+                    },
+                }),
+                Match.object_like({
+                    "IndexName": "ByYearDate",
+                    "KeySchema": [
+                        {
+                            "AttributeName": "year",
+                            "KeyType": "HASH",
+                        },
+                        {
+                            "AttributeName": "created_at",
+                            "KeyType": "RANGE",
+                        },
+                    ],
+                    "Projection": {
+                        "ProjectionType": "ALL",
+                    },
+                }),
+                Match.object_like({
+                    "IndexName": "ByTagDate",
+                    "KeySchema": [
+                        {
+                            "AttributeName": "Tag",
+                            "KeyType": "HASH",
+                        },
+                        {
+                            "AttributeName": "created_at",
+                            "KeyType": "RANGE",
+                        },
+                    ],
+                    "Projection": {
+                        "ProjectionType": "ALL",
+                    },
                 })
             ]),
         },
     )
 
 
+def test_dynamodb_index_stage() -> None:
+    """tableIndexStage で追加する GSI を先頭から段階的に絞れることを検証"""
+    # Arrange
+    app = cdk.App(context={"tableIndexStage": 1})
+    project = Project()
+    environment = Env.DEV
+
+    # Act
+    stack = AppStack(
+        app,
+        "TestAppStack",
+        project=project,
+        environment=environment,
+        env=cdk.Environment(account="123456789012", region="us-east-1"),
+    )
+    template = Template.from_stack(stack)
+
+    # Assert
+    tables = template.find_resources("AWS::DynamoDB::Table")
+    (table,) = tables.values()
+    index_names = [
+        index["IndexName"]
+        for index in table["Properties"]["GlobalSecondaryIndexes"]
+    ]
+    assert index_names == ["ByTag", "GSI1", "ByVideoId"]
+
+
 def test_lambda_function_configuration() -> None:
     """Lambda 関数の設定を検証"""
     # Arrange
@@ -107,6 +190,8 @@ def test_lambda_function_configuration() -> None:
             "Environment": {
                 "Variables": Match.object_like({
                     "DYNAMODB_TABLE_NAME": Match.any_value(),
+                    "API_DOCS_ENABLED": "true",
+                    "SERVER_TIMING_ENABLED": "true",
                     "POWERTOOLS_SERVICE_NAME": Match.any_value(),
                     "POWERTOOLS_METRICS_NAMESPACE": Match.any_value(),
                 }),
@@ -138,6 +223,7 @@ def test_api_gateway_configuration() -> None:
         Match.object_like({
             "Name": Match.any_value(),
             "Description": Match.any_value(),
+            "BinaryMediaTypes": ["*/*"],
         }),
     )
 
@@ -0,0 +1,323 @@
+"""実データの分布を学習して合成メタデータを生成するスクリプト
+
+metadata/ の動画から次の分布を学習し、同じスキーマ・ファイル名
+（YYYYMMDD-HHMMSS#<video_id>.json）で任意件数の合成ファイルを書き出す。
+
+- タグ: 先頭タグの頻度、先頭タグごとのタグパスの深さ、直前のタグから次のタグへの遷移頻度
+- 投稿間隔: 連続する動画の公開日時の差
+- タイトル: 先頭タグごとの文字数、タイトルを構成する語句の頻度、タグがタイトルに含まれる位置
+- 再生時間: 先頭タグごとの duration（ショート動画と長時間配信の違いを保つ）
+
+各分布は観測値をそのまま並べたリストで持ち、一様な添字で引くことで
+経験分布どおりに標本化する（1 件あたり数十回の乱数で済み、100 万件を数分で生成できる）。
+乱数はシードで固定できるため、同じ引数からは同じファイルが生成される。
+"""
+
+import glob
+import json
+import os
+import random
+import re
+import string
+import sys
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from itertools import pairwise
+from typing import Any
+
+# YouTube の動画IDと同じ文字種・長さ
+VIDEO_ID_ALPHABET = string.ascii_letters + string.digits + "-_"
+VIDEO_ID_LENGTH = 11
+
+# タイトルを語句に分ける: 【】で囲まれた部分はひとかたまり、それ以外は空白区切り
+TITLE_TOKEN = re.compile(r"【[^】]*】|[^\s【】]+")
+
+# ISO 8601 の duration（PT1H2M3S など）
+DURATION = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+# 遷移先が既出のタグばかりだった場合に引き直す回数
+MAX_TAG_RETRIES = 5
+
+
+def parse_duration(duration: str) -> int:
+    """ISO 8601 の duration を秒数に変換"""
+    match = DURATION.match(duration)
+    if not match:
+        raise ValueError(f"Invalid duration format: {duration}")
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def format_duration(seconds: int) -> str:
+    """秒数を metadata/ と同じ形式の duration（0 の単位は省略）に変換"""
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    parts = [
+        f"{value}{unit}"
+        for value, unit in ((hours, "H"), (minutes, "M"), (seconds, "S"))
+        if value
+    ]
+    return "PT" + ("".join(parts) or "0S")
+
+
+def parse_published_at(published_at: str) -> datetime:
+    """published_at（末尾 Z の UTC）を datetime に変換"""
+    return datetime.fromisoformat(published_at)
+
+
+def format_published_at(published: datetime) -> str:
+    """datetime を published_at の形式に変換"""
+    return published.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def load_corpus(metadata_dir: str = "metadata") -> list[dict[str, Any]]:
+    """metadata/ 配下の全ファイルから動画を読み込み（公開日時順）"""
+    records: list[dict[str, Any]] = []
+    for path in sorted(glob.glob(os.path.join(metadata_dir, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            records.extend(json.load(f))
+    if not records:
+        raise ValueError(f"No metadata found in {metadata_dir}")
+    return sorted(records, key=lambda record: record["published_at"])
+
+
+class CorpusProfile:
+    """実データから学習した分布
+
+    各分布は観測値のリスト（重複を含む）で、要素を一様に選ぶと経験分布に従う。
+    """
+
+    def __init__(self, records: list[dict[str, Any]]):
+        if not records:
+            raise ValueError("Cannot learn from an empty corpus")
+
+        # タグ: 先頭タグ、先頭タグごとの深さ、直前のタグからの遷移
+        self.first_tags: list[str | None] = []
+        self.depths: dict[str | None, list[int]] = {}
+        self.next_tags: dict[str, list[str]] = {}
+        # タイトル: 先頭タグごとの文字数、語句、タイトルに含まれるタグの位置（-1 は含まない）
+        self.title_lengths: dict[str | None, list[int]] = {}
+        self.title_tokens: list[str] = []
+        self.title_tag_positions: list[int] = []
+        # 再生時間（秒）と投稿間隔（秒）
+        self.durations: dict[str | None, list[int]] = {}
+        self.gaps: list[float] = []
+
+        published = [parse_published_at(record["published_at"]) for record in records]
+        self.first_published = min(published)
+        self.last_published = max(published)
+        ordered = sorted(published)
+        self.gaps = [
+            (later - earlier).total_seconds() for earlier, later in pairwise(ordered)
+        ] or [0.0]
+
+        for record in records:
+            tags = list(record.get("tags", []))
+            first = tags[0] if tags else None
+            self.first_tags.append(first)
+            self.depths.setdefault(first, []).append(len(tags))
+            for current, following in pairwise(tags):
+                self.next_tags.setdefault(current, []).append(following)
+
+            title = record["title"]
+            self.title_lengths.setdefault(first, []).append(len(title))
+            self.title_tokens.extend(TITLE_TOKEN.findall(title))
+            position = -1
+            for index in range(len(tags) - 1, -1, -1):
+                if tags[index] in title:
+                    position = index
+                    break
+            self.title_tag_positions.append(position)
+
+            if record.get("duration"):
+                seconds = parse_duration(record["duration"])
+                self.durations.setdefault(first, []).append(seconds)
+
+        if not self.title_tokens:
+            raise ValueError("Corpus titles have no tokens")
+        self.all_durations = [
+            seconds for values in self.durations.values() for seconds in values
+        ] or [0]
+
+    @classmethod
+    def from_metadata_dir(cls, metadata_dir: str = "metadata") -> "CorpusProfile":
+        """metadata/ ディレクトリから学習"""
+        return cls(load_corpus(metadata_dir))
+
+
+class SyntheticMetadataGenerator:
+    """学習した分布から合成動画を生成するクラス"""
+
+    def __init__(self, profile: CorpusProfile, seed: int = 0):
+        self.profile = profile
+        self.random = random.Random(seed)
+        self.used_ids: set[str] = set()
+
+    def _pick(self, values: list[Any]) -> Any:
+        """経験分布から 1 つ選ぶ"""
+        return values[int(self.random.random() * len(values))]
+
+    def generate_video_id(self) -> str:
+        """未使用の動画IDを生成"""
+        while True:
+            video_id = "".join(
+                self.random.choices(VIDEO_ID_ALPHABET, k=VIDEO_ID_LENGTH)
+            )
+            if video_id not in self.used_ids:
+                self.used_ids.add(video_id)
+                return video_id
+
+    def generate_tags(self) -> list[str]:
+        """先頭タグを選び、深さに達するまで遷移頻度に従ってタグを連ねる"""
+        first = self._pick(self.profile.first_tags)
+        if first is None:
+            return []
+        depth = self._pick(self.profile.depths[first])
+
+        tags = [first]
+        while len(tags) < depth:
+            candidates = self.profile.next_tags.get(tags[-1])
+            if not candidates:
+                break
+            # 同じタグはパス内で繰り返さない
+            for _ in range(MAX_TAG_RETRIES):
+                tag = self._pick(candidates)
+                if tag not in tags:
+                    tags.append(tag)
+                    break
+            else:
+                break
+        return tags
+
+    def generate_title(self, tags: list[str]) -> str:
+        """文字数を選び、語句を並べて切り詰める（タグを含む場合は先頭に置く）"""
+        first = tags[0] if tags else None
+        length = self._pick(self.profile.title_lengths[first])
+
+        parts: list[str] = []
+        position = self._pick(self.profile.title_tag_positions)
+        if 0 <= position < len(tags):
+            parts.append(f"【{tags[position]}】")
+        size = sum(len(part) for part in parts)
+        while size < length:
+            token = self._pick(self.profile.title_tokens)
+            # 括弧のない語句どうしは空白で区切る
+            if parts and not parts[-1].endswith("】") and not token.startswith("【"):
+                token = " " + token
+            parts.append(token)
+            size += len(token)
+        return "".join(parts)[:length].strip()
+
+    def generate_duration(self, tags: list[str]) -> str:
+        """先頭タグの再生時間の分布から duration を選ぶ"""
+        first = tags[0] if tags else None
+        return format_duration(
+            self._pick(self.profile.durations.get(first) or self.profile.all_durations)
+        )
+
+    def generate(
+        self,
+        count: int,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """合成動画を公開日時順に生成
+
+        Args:
+            count: 生成する件数
+            start: 最初の動画の公開日時（省略時は実データの最初の公開日時）
+            end: 最後の動画の公開日時。指定した場合は投稿間隔の分布の形を保ったまま
+                start から end に収まるよう縮尺する（省略時は実データの投稿間隔のまま）
+        """
+        start = start or self.profile.first_published
+        gaps = [self._pick(self.profile.gaps) for _ in range(max(count - 1, 0))]
+        scale = 1.0
+        if end is not None:
+            if end < start:
+                raise ValueError("end must not be earlier than start")
+            total = sum(gaps)
+            scale = (end - start).total_seconds() / total if total else 0.0
+
+        offset = 0.0
+        for index in range(count):
+            if index:
+                offset += gaps[index - 1] * scale
+            tags = self.generate_tags()
+            yield {
+                "video_id": self.generate_video_id(),
+                "title": self.generate_title(tags),
+                "tags": tags,
+                "published_at": format_published_at(
+                    start + timedelta(seconds=int(offset))
+                ),
+                "duration": self.generate_duration(tags),
+            }
+
+
+def metadata_filename(record: dict[str, Any]) -> str:
+    """metadata/ と同じファイル名（YYYYMMDD-HHMMSS#<video_id>.json）を生成"""
+    published = parse_published_at(record["published_at"])
+    return f"{published:%Y%m%d-%H%M%S}#{record['video_id']}.json"
+
+
+def write_metadata_files(records: Iterator[dict[str, Any]], output_dir: str) -> int:
+    """1 ファイル 1 動画のリストとして書き出し、書き出した件数を返す"""
+    os.makedirs(output_dir, exist_ok=True)
+    written = 0
+    for record in records:
+        path = os.path.join(output_dir, metadata_filename(record))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([record], f, ensure_ascii=False, indent=4)
+        written += 1
+    return written
+
+
+def main():
+    """メイン実行関数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic metadata files from the real corpus"
+    )
+    parser.add_argument("count", type=int, help="Number of videos to generate")
+    parser.add_argument("output_dir", help="Directory to write the JSON files to")
+    parser.add_argument(
+        "--metadata-dir",
+        default="metadata",
+        help="Metadata directory to learn from (default: metadata)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--start",
+        help="Publish time of the first video, ISO 8601 (default: first in corpus)",
+    )
+    parser.add_argument(
+        "--end",
+        help="Publish time of the last video, ISO 8601; gaps are scaled to fit "
+        "(default: keep the corpus cadence)",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        profile = CorpusProfile.from_metadata_dir(args.metadata_dir)
+        generator = SyntheticMetadataGenerator(profile, seed=args.seed)
+        records = generator.generate(
+            args.count,
+            start=parse_published_at(args.start) if args.start else None,
+            end=parse_published_at(args.end) if args.end else None,
+        )
+        written = write_metadata_files(records, args.output_dir)
+        elapsed = time.perf_counter() - started
+        print(f"Generated {written} files in {args.output_dir} ({elapsed:.1f} s)")
+    except Exception as e:
+        print(f"Fatal error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 """JSONファイルからDynamoDBへレコードをインポートするスクリプト"""
 
 import glob
+import gzip
+import hashlib
 import json
 import os
-from datetime import datetime
-from typing import Any, Dict, List
+from collections import Counter
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Set
 
 import boto3  # type: ignore
 from botocore.exceptions import ClientError  # type: ignore
@@ -17,6 +20,28 @@ except ImportError:
     )
     exit(1)
 
+# 事前計算済みタグツリーのアイテムキー（API側の DynamoDBService と共通）
+TAG_TREE_KEY = "META#TAG_TREE"
+TAG_TREE_FORMAT_VERSION = 1
+
+# カタログ全体の件数などを保持するアイテムキー（API側の DynamoDBService と共通）
+CATALOG_KEY = "META#CATALOG"
+
+# ランダム抽出用の連番（GSI ByOrdinal）の払い出しカウンターのアイテムキー
+ORDINAL_COUNTER_KEY = "META#ORDINAL"
+
+# タグパスインデックス（GSI ByTag / ByTagDate）のファンアウトアイテムのPKプレフィックス
+TAG_PATH_PREFIX = "TAGPATH#"
+
+# タグパスごとの動画件数を保持するアイテムのSK（PKはタグパスインデックスと共通）
+TAG_COUNT_KEY = "META#COUNT"
+
+# 動画IDだけでキーを組み立てられる参照アイテムのPKプレフィックス（BatchGetItem用）
+VIDEO_LOOKUP_PREFIX = "VIDEO#"
+
+# 動画アイテムだけが載る GSI（保存済みの動画の列挙に使う）
+VIDEO_ID_INDEX = "ByVideoId"
+
 
 class CloudFormationHelper:
     """CloudFormationスタックからリソース情報を取得するヘルパークラス"""
@@ -70,6 +95,16 @@ class JsonToDynamoDBImporter:
         self.table_name = table_name
         self.dynamodb = boto3.resource("dynamodb", region_name=region)
         self.table = self.dynamodb.Table(table_name)
+        self.imported_tags: List[List[str]] = []
+        self.imported_years: Set[int] = set()
+        self.video_fingerprints: List[str] = []
+        # 連番カウンターの現在値（払い出し済みの連番の上限）
+        self.ordinal_limit = 0
+        # 前回までに保存された動画（動画ID → tags・year）と、今回のファイルに含まれる動画ID
+        self.stored_videos: Dict[str, Dict[str, Any]] = {}
+        self.seen_video_ids: Set[str] = set()
+        # 再インポートで動画が外れたタグパス（件数アイテムの後始末に使う）
+        self.dropped_paths: Set[str] = set()
 
     def scan_json_files(self, metadata_dir: str = "metadata") -> List[str]:
         """metadata/配下のJSONファイルを検索"""
@@ -120,12 +155,323 @@ class JsonToDynamoDBImporter:
             "updated_at": now,
         }
 
-        # GSI用のTag属性も追加（タグベース検索用）
-        if record["tags"]:
-            record["Tag"] = record["tags"][0]
-
         return record
 
+    def extract_tag_paths(self, tags: List[str]) -> List[str]:
+        """タグ列に含まれる連続部分列をすべて "/" 区切りのタグパスとして抽出"""
+        paths = {
+            "/".join(tags[start:end])
+            for start in range(len(tags))
+            for end in range(start + 1, len(tags) + 1)
+        }
+        return sorted(paths)
+
+    def extract_video_attributes(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """動画レコードからAPIの Video モデルに必要な属性だけを抜き出す"""
+        return {
+            "video_id": record["video_id"],
+            "title": record["title"],
+            "tags": record["tags"],
+            "year": record["year"],
+            "thumbnail_url": record["thumbnail_url"],
+            "created_at": record["created_at"],
+        }
+
+    def transform_to_video_lookup_record(
+        self, record: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """動画レコードから動画IDをキーとする参照アイテムを生成
+
+        動画アイテムのPKは年で分かれているため、IDだけでは GetItem /
+        BatchGetItem のキーを組み立てられない。PK・SKともに動画IDから決まる
+        アイテムを別に書き込み、動画情報は video 属性にまとめて持たせる。
+        """
+        key = f"{VIDEO_LOOKUP_PREFIX}{record['video_id']}"
+        return {
+            "PK": key,
+            "SK": key,
+            "video": self.extract_video_attributes(record),
+        }
+
+    def transform_to_tag_index_records(
+        self, record: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """動画レコードからタグパスごとのインデックスアイテムを生成
+
+        GSI ByTag は Tag 属性をパーティションキーとするため、タグパス1つにつき
+        1アイテムを書き込み、動画情報は video 属性にまとめて持たせる。
+        created_at はタグ内を公開日時順に読む GSI ByTagDate のソートキーとして
+        トップレベルにも持たせる。year や video_id をトップレベルに持たせない
+        ことで、年別・ID別の GSI にはインデックスアイテムが載らない。
+        """
+        video = self.extract_video_attributes(record)
+
+        return [
+            {
+                "PK": f"{TAG_PATH_PREFIX}{path}",
+                "SK": record["SK"],
+                "Tag": path,
+                "created_at": record["created_at"],
+                "video": video,
+            }
+            for path in self.extract_tag_paths(record["tags"])
+        ]
+
+    def transform_to_tag_count_records(
+        self, tag_lists: List[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """タグパスごとの動画件数アイテムを生成
+
+        /api/videos/by-tag の total をタグパス内の全件を読まずに返すため、
+        インポート時に数えておく。Tag 属性を持たせないので GSI ByTag /
+        ByTagDate には載らない。
+        """
+        counts = Counter(
+            path for tags in tag_lists for path in self.extract_tag_paths(tags)
+        )
+
+        return [
+            {
+                "PK": f"{TAG_PATH_PREFIX}{path}",
+                "SK": TAG_COUNT_KEY,
+                "video_count": count,
+            }
+            for path, count in sorted(counts.items())
+        ]
+
+    def build_tag_tree(self, tag_lists: List[List[str]]) -> List[Dict[str, Any]]:
+        """タグ一覧からAPIの TagNode 形式の階層ツリーを構築"""
+        tree: Dict[str, Any] = {}
+
+        for tags in tag_lists:
+            current = tree
+            for tag in tags:
+                node = current.setdefault(tag, {"children": {}, "count": 0})
+                node["count"] += 1
+                current = node["children"]
+
+        return self._tree_to_nodes(tree)
+
+    def _tree_to_nodes(self, tree: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """ツリー辞書を名前順の TagNode 形式リストに変換"""
+        return [
+            {
+                "name": name,
+                "children": (
+                    self._tree_to_nodes(tree[name]["children"])
+                    if tree[name]["children"]
+                    else None
+                ),
+                "count": tree[name]["count"],
+            }
+            for name in sorted(tree)
+        ]
+
+    def transform_to_tag_tree_record(
+        self, tag_lists: List[List[str]]
+    ) -> Dict[str, Any]:
+        """タグツリーを /api/tags のレスポンスそのままの圧縮JSONアイテムに変換"""
+        body = json.dumps(
+            {"tree": self.build_tag_tree(tag_lists)},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        return {
+            "PK": TAG_TREE_KEY,
+            "SK": TAG_TREE_KEY,
+            "tree": gzip.compress(body),
+            "content_encoding": "gzip",
+            "format_version": TAG_TREE_FORMAT_VERSION,
+            "video_count": len(tag_lists),
+            "updated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        }
+
+    def write_tag_tree(self, tag_lists: List[List[str]]):
+        """事前計算済みタグツリーを書き込み"""
+        self.table.put_item(Item=self.transform_to_tag_tree_record(tag_lists))
+
+    def fingerprint_video(self, record: Dict[str, Any]) -> str:
+        """APIが返す動画属性のハッシュを計算"""
+        body = json.dumps(
+            self.extract_video_attributes(record), ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def calculate_catalog_version(self, fingerprints: List[str]) -> str:
+        """動画ごとのハッシュからカタログ全体のバージョンを計算
+
+        ファイルの読み込み順や updated_at に依存しないため、内容が同じなら
+        再インポートしてもバージョン（APIの ETag）は変わらない。
+        """
+        digest = hashlib.sha256("\n".join(sorted(fingerprints)).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def write_catalog_summary(
+        self,
+        video_count: int,
+        years: Set[int],
+        catalog_version: str,
+        ordinal_limit: int,
+    ):
+        """カタログの動画件数・動画が存在する年の一覧・バージョン・連番の上限を書き込み
+
+        削除された動画の連番は欠番になるため、ランダム抽出は動画件数ではなく
+        ordinal_limit（払い出し済みの連番の上限）の範囲から連番を選ぶ。
+        """
+        self.table.put_item(
+            Item={
+                "PK": CATALOG_KEY,
+                "SK": CATALOG_KEY,
+                "video_count": video_count,
+                "ordinal_limit": ordinal_limit,
+                "years": sorted(years, reverse=True),
+                "catalog_version": catalog_version,
+                "updated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+            }
+        )
+
+    def load_stored_videos(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みの動画のタグと年を動画IDごとに読み込み
+
+        GSI ByVideoId には動画アイテムだけが載るため、タグパスのインデックス
+        アイテムや参照アイテムを読まずに全動画を列挙できる。
+        """
+        stored: Dict[str, Dict[str, Any]] = {}
+        kwargs: Dict[str, Any] = {
+            "IndexName": VIDEO_ID_INDEX,
+            "ProjectionExpression": "video_id, tags, #year, ordinal",
+            "ExpressionAttributeNames": {"#year": "year"},
+        }
+        while True:
+            response = self.table.scan(**kwargs)
+            for item in response.get("Items", []):
+                stored[str(item["video_id"])] = item
+            if "LastEvaluatedKey" not in response:
+                return stored
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def init_ordinal_counter(self) -> int:
+        """連番カウンターを読み込み、無ければ保存済みの連番の最大値 + 1 で作成
+
+        連番カウンターより前のインポートが振った連番と重ならないようにする。
+        """
+        floor = 1 + max(
+            (int(v["ordinal"]) for v in self.stored_videos.values() if "ordinal" in v),
+            default=-1,
+        )
+        return self.update_ordinal_counter(
+            "SET next_ordinal = if_not_exists(next_ordinal, :floor)", {":floor": floor}
+        )
+
+    def reserve_ordinals(self, count: int) -> int:
+        """連番カウンターを count 進めて、確保した連番の先頭を返す"""
+        return (
+            self.update_ordinal_counter("ADD next_ordinal :count", {":count": count})
+            - count
+        )
+
+    def update_ordinal_counter(
+        self, update_expression: str, values: Dict[str, Any]
+    ) -> int:
+        """連番カウンターを更新し、更新後の値を ordinal_limit に記録して返す"""
+        response = self.table.update_item(
+            Key={"PK": ORDINAL_COUNTER_KEY, "SK": ORDINAL_COUNTER_KEY},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=values,
+            ReturnValues="UPDATED_NEW",
+        )
+        attributes: Dict[str, Any] = response["Attributes"]
+        self.ordinal_limit = int(attributes["next_ordinal"])
+        return self.ordinal_limit
+
+    def assign_ordinals(self, records: List[Dict[str, Any]]):
+        """ランダム抽出用の連番（GSI ByOrdinal）を振る
+
+        保存済みの動画は前回の連番をそのまま使い、新しい動画にだけ
+        カウンターから払い出すため、再インポートで連番は変わらない。
+        """
+        new_records = []
+        for record in records:
+            stored = self.stored_videos.get(record["video_id"])
+            if stored is not None and "ordinal" in stored:
+                record["ordinal"] = int(stored["ordinal"])
+            else:
+                new_records.append(record)
+
+        if new_records:
+            first = self.reserve_ordinals(len(new_records))
+            for offset, record in enumerate(new_records):
+                record["ordinal"] = first + offset
+
+    def stale_keys(self, record: Dict[str, Any]) -> List[Dict[str, str]]:
+        """再インポートで不要になったアイテムのキーを列挙
+
+        タグが編集されて外れたタグパスのインデックスアイテムと、公開日時の
+        変更で年が変わった場合の古い動画アイテムを返す。外れたタグパスは
+        件数アイテムの後始末のため dropped_paths にも記録する。
+        """
+        stored = self.stored_videos.get(record["video_id"])
+        if stored is None:
+            return []
+
+        dropped = set(self.extract_tag_paths(list(stored.get("tags", [])))) - set(
+            self.extract_tag_paths(record["tags"])
+        )
+        self.dropped_paths.update(dropped)
+        keys = [
+            {"PK": f"{TAG_PATH_PREFIX}{path}", "SK": record["SK"]}
+            for path in sorted(dropped)
+        ]
+        if int(stored["year"]) != record["year"]:
+            keys.append({"PK": f"YEAR#{int(stored['year'])}", "SK": record["SK"]})
+        return keys
+
+    def removed_video_keys(self, stored: Dict[str, Any]) -> List[Dict[str, str]]:
+        """メタデータから消えた動画のアイテム（動画・参照・タグパス）のキーを列挙"""
+        sort_key = f"VIDEO#{stored['video_id']}"
+        lookup_key = f"{VIDEO_LOOKUP_PREFIX}{stored['video_id']}"
+        paths = self.extract_tag_paths(list(stored.get("tags", [])))
+        self.dropped_paths.update(paths)
+        return [
+            {"PK": f"YEAR#{int(stored['year'])}", "SK": sort_key},
+            {"PK": lookup_key, "SK": lookup_key},
+            *({"PK": f"{TAG_PATH_PREFIX}{path}", "SK": sort_key} for path in paths),
+        ]
+
+    def remove_deleted_videos(self) -> int:
+        """今回のファイルに含まれない保存済みの動画を削除し、削除した件数を返す"""
+        removed = [
+            stored
+            for video_id, stored in sorted(self.stored_videos.items())
+            if video_id not in self.seen_video_ids
+        ]
+        self.batch_delete_keys(
+            [key for stored in removed for key in self.removed_video_keys(stored)]
+        )
+        return len(removed)
+
+    def remove_stale_tag_counts(self, tag_lists: List[List[str]]):
+        """動画が1件もなくなったタグパスの件数アイテムを削除"""
+        live_paths = {
+            path for tags in tag_lists for path in self.extract_tag_paths(tags)
+        }
+        self.batch_delete_keys(
+            [
+                {"PK": f"{TAG_PATH_PREFIX}{path}", "SK": TAG_COUNT_KEY}
+                for path in sorted(self.dropped_paths - live_paths)
+            ]
+        )
+
+    def batch_delete_keys(self, keys: List[Dict[str, str]]):
+        """DynamoDBからキーを指定してバッチ削除"""
+        if not keys:
+            return
+
+        with self.table.batch_writer() as writer:
+            for key in keys:
+                writer.delete_item(Key=key)
+
     def batch_write_records(self, records: List[Dict[str, Any]]):
         """DynamoDBにバッチ書き込み（25件ずつ）"""
         batch_size = 25
@@ -151,6 +497,12 @@ class JsonToDynamoDBImporter:
                     "error": "Empty file",
                 }
 
+            self.seen_video_ids.update(
+                item["video_id"]
+                for item in json_data
+                if isinstance(item, dict) and "video_id" in item
+            )
+
             records = []
             for item in json_data:
                 try:
@@ -161,7 +513,25 @@ class JsonToDynamoDBImporter:
                     continue
 
             if records:
-                self.batch_write_records(records)
+                self.assign_ordinals(records)
+                index_records = [
+                    index_record
+                    for record in records
+                    for index_record in self.transform_to_tag_index_records(record)
+                ]
+                lookup_records = [
+                    self.transform_to_video_lookup_record(record) for record in records
+                ]
+                self.batch_write_records(records + index_records + lookup_records)
+                # 新しいアイテムを書き込んでから、外れたタグパスなどを削除する
+                self.batch_delete_keys(
+                    [key for record in records for key in self.stale_keys(record)]
+                )
+                self.imported_tags.extend(record["tags"] for record in records)
+                self.imported_years.update(record["year"] for record in records)
+                self.video_fingerprints.extend(
+                    self.fingerprint_video(record) for record in records
+                )
 
             return {
                 "file": file_path,
@@ -192,6 +562,13 @@ class JsonToDynamoDBImporter:
 
         results = []
         total_imported = 0
+        self.imported_tags = []
+        self.imported_years = set()
+        self.video_fingerprints = []
+        self.stored_videos = self.load_stored_videos()
+        self.init_ordinal_counter()
+        self.seen_video_ids = set()
+        self.dropped_paths = set()
 
         print(f"Found {len(json_files)} JSON files")
 
@@ -202,9 +579,31 @@ class JsonToDynamoDBImporter:
             if result["success"]:
                 total_imported += result["imported_count"]
 
+        # 全件インポート後にタグツリーを一度だけ計算して保存
+        if self.imported_tags:
+            self.write_tag_tree(self.imported_tags)
+            self.batch_write_records(
+                self.transform_to_tag_count_records(self.imported_tags)
+            )
+            self.write_catalog_summary(
+                len(self.video_fingerprints),
+                self.imported_years,
+                self.calculate_catalog_version(self.video_fingerprints),
+                self.ordinal_limit,
+            )
+
+        # 読めなかったファイルの動画を消さないよう、全ファイル成功時だけ削除する
+        total_removed = 0
+        if all(result["success"] for result in results):
+            total_removed = self.remove_deleted_videos()
+            self.remove_stale_tag_counts(self.imported_tags)
+        else:
+            print("Warning: Skipping removal of deleted videos (some files failed)")
+
         return {
             "total_files": len(json_files),
             "total_imported": total_imported,
+            "total_removed": total_removed,
             "results": results,
         }
 
@@ -251,6 +650,7 @@ def main():
         print("\nIMPORT COMPLETED")
         print(f"Total files processed: {results['total_files']}")
         print(f"Total records imported: {results['total_imported']}")
+        print(f"Total records removed: {results.get('total_removed', 0)}")
 
         if results.get("error"):
             print(f"Error: {results['error']}")
@@ -0,0 +1,212 @@
+"""Tests for the synthetic metadata generator"""
+
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from src.generate_synthetic_metadata import (
+    CorpusProfile,
+    SyntheticMetadataGenerator,
+    format_duration,
+    main,
+    metadata_filename,
+    parse_duration,
+    write_metadata_files,
+)
+
+CORPUS = [
+    {
+        "video_id": "aaaaaaaaaaa",
+        "title": "【ゲーム実況】ホラーゲーム Cry of Fear #1【白雪 巴/にじさんじ】",
+        "tags": ["ゲーム実況", "ホラー", "Cry of Fear"],
+        "published_at": "2023-06-15T10:30:00Z",
+        "duration": "PT2H3M",
+    },
+    {
+        "video_id": "bbbbbbbbbbb",
+        "title": "【雑談】みんなと話そう！",
+        "tags": ["雑談"],
+        "published_at": "2023-06-16T18:00:00Z",
+        "duration": "PT1H",
+    },
+    {
+        "video_id": "ccccccccccc",
+        "title": "ショート #shorts",
+        "tags": ["ゲーム実況", "ホラー"],
+        "published_at": "2023-06-18T09:00:00Z",
+        "duration": "PT45S",
+    },
+]
+
+
+class TestDuration:
+    """Duration conversion tests"""
+
+    @pytest.mark.parametrize(
+        "duration,seconds",
+        [("PT56M33S", 3393), ("PT1H20S", 3620), ("PT2H", 7200), ("P1DT1S", 86401)],
+    )
+    def test_parse_duration(self, duration, seconds):
+        """Test ISO 8601 durations are parsed to seconds"""
+        assert parse_duration(duration) == seconds
+
+    def test_parse_invalid_duration(self):
+        """Test malformed durations are rejected"""
+        with pytest.raises(ValueError, match="Invalid duration format"):
+            parse_duration("1:23")
+
+    def test_format_duration_round_trip(self):
+        """Test durations are written like the corpus's"""
+        assert format_duration(3620) == "PT1H20S"
+        assert format_duration(0) == "PT0S"
+        for duration in ("PT56M33S", "PT1H2M11S", "PT45S"):
+            assert format_duration(parse_duration(duration)) == duration
+
+
+class TestCorpusProfile:
+    """CorpusProfile tests"""
+
+    def test_learns_distributions(self):
+        """Test the empirical distributions are collected"""
+        profile = CorpusProfile(CORPUS)
+
+        assert sorted(profile.first_tags) == ["ゲーム実況", "ゲーム実況", "雑談"]
+        assert sorted(profile.depths["ゲーム実況"]) == [2, 3]
+        assert profile.next_tags["ホラー"] == ["Cry of Fear"]
+        assert sorted(profile.durations["ゲーム実況"]) == [45, 7380]
+        assert sorted(profile.gaps) == [113400.0, 140400.0]
+        assert "【白雪 巴/にじさんじ】" in profile.title_tokens
+        # Deepest tag found in each title (-1 when none is)
+        assert profile.title_tag_positions == [2, 0, -1]
+
+    def test_empty_corpus(self):
+        """Test an empty corpus is rejected"""
+        with pytest.raises(ValueError, match="empty corpus"):
+            CorpusProfile([])
+
+
+class TestSyntheticMetadataGenerator:
+    """SyntheticMetadataGenerator tests"""
+
+    @pytest.fixture
+    def profile(self):
+        """Profile learned from CORPUS"""
+        return CorpusProfile(CORPUS)
+
+    def test_records_follow_corpus(self, profile):
+        """Test generated records use the corpus schema and vocabulary"""
+        records = list(SyntheticMetadataGenerator(profile, seed=1).generate(200))
+
+        assert len({record["video_id"] for record in records}) == 200
+        for record in records:
+            assert set(record) == {
+                "video_id",
+                "title",
+                "tags",
+                "published_at",
+                "duration",
+            }
+            assert len(record["video_id"]) == 11
+            assert record["tags"][0] in ("ゲーム実況", "雑談")
+            # Tag paths are chains seen in the corpus
+            assert "/".join(record["tags"]) in (
+                "ゲーム実況/ホラー",
+                "ゲーム実況/ホラー/Cry of Fear",
+                "雑談",
+            )
+            assert len(record["title"]) <= 47
+            parse_duration(record["duration"])
+
+        published = [record["published_at"] for record in records]
+        assert published == sorted(published)
+        assert published[0] == "2023-06-15T10:30:00Z"
+
+    def test_seed_reproduces_output(self, profile):
+        """Test the same seed generates the same records"""
+        first = list(SyntheticMetadataGenerator(profile, seed=7).generate(50))
+        second = list(SyntheticMetadataGenerator(profile, seed=7).generate(50))
+        other = list(SyntheticMetadataGenerator(profile, seed=8).generate(50))
+
+        assert first == second
+        assert first != other
+
+    def test_end_scales_cadence(self, profile):
+        """Test gaps are scaled to end at the given publish time"""
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        end = datetime(2024, 1, 31, tzinfo=UTC)
+        records = list(
+            SyntheticMetadataGenerator(profile).generate(100, start=start, end=end)
+        )
+
+        assert records[0]["published_at"] == "2024-01-01T00:00:00Z"
+        assert "2024-01-30T23:59:00Z" <= records[-1]["published_at"]
+        assert records[-1]["published_at"] <= "2024-01-31T00:00:00Z"
+
+    def test_end_before_start(self, profile):
+        """Test an end earlier than the start is rejected"""
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        generator = SyntheticMetadataGenerator(profile)
+
+        with pytest.raises(ValueError, match="end must not be earlier"):
+            list(generator.generate(2, start=start, end=start.replace(year=2023)))
+
+
+class TestWriteMetadataFiles:
+    """Output file tests"""
+
+    def test_metadata_filename(self):
+        """Test files are named like the corpus's"""
+        record = {"video_id": "qp-w9AZJuLs", "published_at": "2019-11-30T13:33:26Z"}
+
+        assert metadata_filename(record) == "20191130-133326#qp-w9AZJuLs.json"
+
+    def test_main_writes_files(self, tmp_path):
+        """Test the command writes one single-video list per file"""
+        metadata_dir = tmp_path / "metadata"
+        metadata_dir.mkdir()
+        for record in CORPUS:
+            path = metadata_dir / metadata_filename(record)
+            path.write_text(json.dumps([record], ensure_ascii=False))
+        output_dir = tmp_path / "synthetic"
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(
+                "sys.argv",
+                [
+                    "generate_synthetic_metadata.py",
+                    "20",
+                    str(output_dir),
+                    "--metadata-dir",
+                    str(metadata_dir),
+                ],
+            )
+            assert main() == 0
+
+        paths = sorted(output_dir.glob("*.json"))
+        assert len(paths) == 20
+        for path in paths:
+            records = json.loads(path.read_text(encoding="utf-8"))
+            assert len(records) == 1
+            assert path.name == metadata_filename(records[0])
+
+    def test_main_without_corpus(self, tmp_path):
+        """Test the command fails when there is nothing to learn from"""
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(
+                "sys.argv",
+                [
+                    "generate_synthetic_metadata.py",
+                    "1",
+                    str(tmp_path / "out"),
+                    "--metadata-dir",
+                    str(tmp_path),
+                ],
+            )
+            assert main() == 1
+
+    def test_write_returns_count(self, tmp_path):
+        """Test the number of files written is returned"""
+        records = iter(CORPUS)
+
+        assert write_metadata_files(records, str(tmp_path / "out")) == 3
@@ -1,11 +1,17 @@
 """Tests for JsonToDynamoDBImporter class"""
 
+import gzip
 import json
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from src.import_json_to_dynamodb import JsonToDynamoDBImporter
+from src.import_json_to_dynamodb import (
+    CATALOG_KEY,
+    TAG_COUNT_KEY,
+    TAG_TREE_KEY,
+    JsonToDynamoDBImporter,
+)
 
 
 class TestJsonToDynamoDBImporter:
@@ -16,9 +22,29 @@ class TestJsonToDynamoDBImporter:
         """Mock DynamoDB table"""
         with patch("boto3.resource") as mock_resource:
             mock_table = Mock()
+            # No videos stored by an earlier import
+            mock_table.scan.return_value = {"Items": []}
+            mock_table.update_item.side_effect = self._ordinal_counter()
             mock_resource.return_value.Table.return_value = mock_table
             yield mock_table
 
+    @staticmethod
+    def _ordinal_counter():
+        """Fake update_item holding the ordinal counter item"""
+        counter = {}
+
+        def update_item(**kwargs):
+            values = kwargs["ExpressionAttributeValues"]
+            if ":count" in values:
+                counter["next_ordinal"] = (
+                    counter.get("next_ordinal", 0) + values[":count"]
+                )
+            else:
+                counter.setdefault("next_ordinal", values[":floor"])
+            return {"Attributes": dict(counter)}
+
+        return update_item
+
     @pytest.fixture
     def importer(self, mock_dynamodb_table):
         """Create JsonToDynamoDBImporter instance"""
@@ -123,7 +149,8 @@ class TestJsonToDynamoDBImporter:
         )
         assert record["created_at"] == "2023-06-15T10:30:00Z"
         assert record["updated_at"] == "2024-01-01T00:00:00Z"
-        assert record["Tag"] == "tag1"  # First tag for GSI
+        # Tag lookups go through separate index items, not the video item
+        assert "Tag" not in record
 
     def test_transform_to_dynamodb_record_no_tags(self, importer):
         """Test transformation without tags"""
@@ -137,6 +164,172 @@ class TestJsonToDynamoDBImporter:
         assert record["tags"] == []
         assert "Tag" not in record
 
+    def test_extract_tag_paths(self, importer):
+        """Test every contiguous tag sequence becomes a tag path"""
+        paths = importer.extract_tag_paths(["ゲーム実況", "ホラー", "Cry of Fear"])
+
+        assert paths == sorted(
+            [
+                "ゲーム実況",
+                "ゲーム実況/ホラー",
+                "ゲーム実況/ホラー/Cry of Fear",
+                "ホラー",
+                "ホラー/Cry of Fear",
+                "Cry of Fear",
+            ]
+        )
+        assert importer.extract_tag_paths(["a", "b", "a"]) == [
+            "a",
+            "a/b",
+            "a/b/a",
+            "b",
+            "b/a",
+        ]
+        assert importer.extract_tag_paths([]) == []
+
+    def test_transform_to_tag_index_records(self, importer):
+        """Test tag path index items carry the video under a nested map"""
+        record = importer.transform_to_dynamodb_record(
+            {
+                "video_id": "test123",
+                "title": "Test Video Title",
+                "published_at": "2023-06-15T10:30:00Z",
+                "tags": ["雑談", "料理"],
+            }
+        )
+
+        index_records = importer.transform_to_tag_index_records(record)
+
+        assert [r["Tag"] for r in index_records] == ["料理", "雑談", "雑談/料理"]
+        for index_record in index_records:
+            assert index_record["PK"] == f"TAGPATH#{index_record['Tag']}"
+            assert index_record["SK"] == "VIDEO#test123"
+            # Sort key of the ByTagDate index
+            assert index_record["created_at"] == "2023-06-15T10:30:00Z"
+            # Keep index items out of the year and video ID indexes
+            assert "year" not in index_record
+            assert "video_id" not in index_record
+            assert index_record["video"] == {
+                "video_id": "test123",
+                "title": "Test Video Title",
+                "tags": ["雑談", "料理"],
+                "year": 2023,
+                "thumbnail_url": record["thumbnail_url"],
+                "created_at": "2023-06-15T10:30:00Z",
+            }
+
+    def test_transform_to_tag_count_records(self, importer):
+        """Test a video count item is generated per tag path"""
+        count_records = importer.transform_to_tag_count_records(
+            [["雑談", "料理"], ["雑談"], ["ゲーム"]]
+        )
+
+        assert {r["PK"]: r["video_count"] for r in count_records} == {
+            "TAGPATH#ゲーム": 1,
+            "TAGPATH#料理": 1,
+            "TAGPATH#雑談": 2,
+            "TAGPATH#雑談/料理": 1,
+        }
+        for count_record in count_records:
+            assert count_record["SK"] == TAG_COUNT_KEY
+            # Keep count items out of the tag indexes
+            assert "Tag" not in count_record
+
+    def test_transform_to_video_lookup_record(self, importer):
+        """Test video lookup items are keyed by the video ID alone"""
+        record = importer.transform_to_dynamodb_record(
+            {
+                "video_id": "test123",
+                "title": "Test Video Title",
+                "published_at": "2023-06-15T10:30:00Z",
+                "tags": ["雑談"],
+            }
+        )
+
+        lookup_record = importer.transform_to_video_lookup_record(record)
+
+        assert lookup_record == {
+            "PK": "VIDEO#test123",
+            "SK": "VIDEO#test123",
+            "video": {
+                "video_id": "test123",
+                "title": "Test Video Title",
+                "tags": ["雑談"],
+                "year": 2023,
+                "thumbnail_url": record["thumbnail_url"],
+                "created_at": "2023-06-15T10:30:00Z",
+            },
+        }
+
+    def test_calculate_catalog_version(self, importer):
+        """Test the catalog version depends on content, not import order"""
+        records = [
+            importer.transform_to_dynamodb_record(
+                {
+                    "video_id": f"video{i}",
+                    "title": f"Video {i}",
+                    "published_at": "2023-06-15T10:30:00Z",
+                }
+            )
+            for i in range(3)
+        ]
+        fingerprints = [importer.fingerprint_video(r) for r in records]
+
+        version = importer.calculate_catalog_version(fingerprints)
+        assert version == importer.calculate_catalog_version(fingerprints[::-1])
+
+        records[0]["title"] = "Renamed"
+        fingerprints[0] = importer.fingerprint_video(records[0])
+        assert version != importer.calculate_catalog_version(fingerprints)
+
+    def test_build_tag_tree(self, importer):
+        """Test building the TagNode-shaped tag tree"""
+        tree = importer.build_tag_tree(
+            [
+                ["ゲーム実況", "ホラー", "Cry of Fear"],
+                ["ゲーム実況", "ホラー", "Amnesia"],
+                ["ゲーム実況", "アクション"],
+                ["雑談"],
+            ]
+        )
+
+        assert [node["name"] for node in tree] == ["ゲーム実況", "雑談"]
+        game = tree[0]
+        assert game["count"] == 3
+        assert [child["name"] for child in game["children"]] == [
+            "アクション",
+            "ホラー",
+        ]
+        horror = game["children"][1]
+        assert horror["count"] == 2
+        assert [child["name"] for child in horror["children"]] == [
+            "Amnesia",
+            "Cry of Fear",
+        ]
+        assert horror["children"][0]["children"] is None
+        assert tree[1] == {"name": "雑談", "children": None, "count": 1}
+
+    def test_transform_to_tag_tree_record(self, importer):
+        """Test the materialized tag tree item is compressed response JSON"""
+        record = importer.transform_to_tag_tree_record([["雑談", "料理"], ["雑談"]])
+
+        assert record["PK"] == TAG_TREE_KEY
+        assert record["SK"] == TAG_TREE_KEY
+        assert record["content_encoding"] == "gzip"
+        assert record["format_version"] == 1
+        assert record["video_count"] == 2
+        assert record["updated_at"].endswith("Z")
+        body = json.loads(gzip.decompress(record["tree"]).decode("utf-8"))
+        assert body == {
+            "tree": [
+                {
+                    "name": "雑談",
+                    "children": [{"name": "料理", "children": None, "count": 1}],
+                    "count": 2,
+                }
+            ]
+        }
+
     def test_batch_write_records(self, importer, mock_dynamodb_table):
         """Test batch writing records to DynamoDB"""
         # Create mock batch writer as a context manager
@@ -186,7 +379,8 @@ class TestJsonToDynamoDBImporter:
         assert result["success"] is True
         assert result["imported_count"] == 2
         assert result["error"] is None
-        assert mock_batch_writer.put_item.call_count == 2
+        # One video item, one tag path index item and one lookup item per video
+        assert mock_batch_writer.put_item.call_count == 6
 
     def test_import_file_empty(self, importer, tmp_path):
         """Test importing empty file"""
@@ -234,7 +428,8 @@ class TestJsonToDynamoDBImporter:
 
         assert result["success"] is True
         assert result["imported_count"] == 2  # Only valid records
-        assert mock_batch_writer.put_item.call_count == 2
+        # One video item and one lookup item per valid record
+        assert mock_batch_writer.put_item.call_count == 4
 
     def test_import_file_error(self, importer):
         """Test file import error handling"""
@@ -255,7 +450,7 @@ class TestJsonToDynamoDBImporter:
                 {
                     "video_id": f"video{i}",
                     "title": f"Video {i}",
-                    "published_at": "2023-01-01T00:00:00Z",
+                    "published_at": f"202{i}-01-01T00:00:00Z",
                 }
             ]
             (metadata_dir / f"file{i}.json").write_text(json.dumps(test_data))
@@ -277,6 +472,208 @@ class TestJsonToDynamoDBImporter:
         assert len(result["results"]) == 3
         assert all(r["success"] for r in result["results"])
 
+        # The tag tree and catalog summary are written once after all files
+        assert mock_dynamodb_table.put_item.call_count == 2
+        written = {
+            call[1]["Item"]["PK"]: call[1]["Item"]
+            for call in mock_dynamodb_table.put_item.call_args_list
+        }
+        assert written[TAG_TREE_KEY]["video_count"] == 3
+        assert written[CATALOG_KEY]["video_count"] == 3
+        assert written[CATALOG_KEY]["ordinal_limit"] == 3
+        assert written[CATALOG_KEY]["years"] == [2022, 2021, 2020]
+        assert len(written[CATALOG_KEY]["catalog_version"]) == 16
+
+        # Every new video gets a distinct ordinal from the counter
+        ordinals = sorted(
+            call[1]["Item"]["ordinal"]
+            for call in mock_batch_writer.put_item.call_args_list
+            if "ordinal" in call[1]["Item"]
+        )
+        assert ordinals == [0, 1, 2]
+
+    def test_reimport_keeps_ordinals(self, importer, tmp_path, mock_dynamodb_table):
+        """Test stored videos keep their ordinal and new ones extend the counter"""
+        metadata_dir = tmp_path / "metadata"
+        metadata_dir.mkdir()
+        (metadata_dir / "file.json").write_text(
+            json.dumps(
+                [
+                    {
+                        "video_id": video_id,
+                        "title": video_id,
+                        "published_at": "2023-01-01T00:00:00Z",
+                    }
+                    for video_id in ("new", "kept")
+                ]
+            )
+        )
+        # Stored by an import from before the counter, after a deletion
+        mock_dynamodb_table.scan.return_value = {
+            "Items": [
+                {"video_id": "kept", "tags": [], "year": 2023, "ordinal": 4},
+                {"video_id": "gone", "tags": [], "year": 2023, "ordinal": 7},
+            ]
+        }
+        mock_batch_writer = MagicMock()
+        mock_context_manager = MagicMock()
+        mock_context_manager.__enter__.return_value = mock_batch_writer
+        mock_dynamodb_table.batch_writer.return_value = mock_context_manager
+
+        with patch.object(importer, "scan_json_files") as mock_scan:
+            mock_scan.return_value = [str(metadata_dir / "file.json")]
+            importer.import_all_files(str(metadata_dir))
+
+        ordinals = {
+            call[1]["Item"]["video_id"]: call[1]["Item"]["ordinal"]
+            for call in mock_batch_writer.put_item.call_args_list
+            if "ordinal" in call[1]["Item"]
+        }
+        assert ordinals == {"kept": 4, "new": 8}
+        summary = mock_dynamodb_table.put_item.call_args_list[-1][1]["Item"]
+        assert summary["video_count"] == 2
+        assert summary["ordinal_limit"] == 9
+        assert summary["updated_at"].endswith("Z")
+
+    def test_load_stored_videos(self, importer, mock_dynamodb_table):
+        """Test stored videos are listed page by page from the ByVideoId index"""
+        mock_dynamodb_table.scan.side_effect = [
+            {
+                "Items": [{"video_id": "a", "tags": ["x"], "year": 2023}],
+                "LastEvaluatedKey": {"video_id": "a"},
+            },
+            {"Items": [{"video_id": "b", "tags": [], "year": 2024}]},
+        ]
+
+        stored = importer.load_stored_videos()
+
+        assert sorted(stored) == ["a", "b"]
+        first, second = mock_dynamodb_table.scan.call_args_list
+        assert first[1]["IndexName"] == "ByVideoId"
+        assert second[1]["ExclusiveStartKey"] == {"video_id": "a"}
+
+    def test_reimport_with_changed_tags(self, importer, tmp_path, mock_dynamodb_table):
+        """Test re-importing a video deletes the tag paths and counts it left"""
+        metadata_dir = tmp_path / "metadata"
+        metadata_dir.mkdir()
+        (metadata_dir / "file.json").write_text(
+            json.dumps(
+                [
+                    {
+                        "video_id": "video1",
+                        "title": "Video 1",
+                        "published_at": "2023-01-01T00:00:00Z",
+                        "tags": ["ゲーム", "RPG"],
+                    }
+                ]
+            )
+        )
+        # Stored with other tags, and under another year before its date changed
+        mock_dynamodb_table.scan.return_value = {
+            "Items": [
+                {"video_id": "video1", "tags": ["ゲーム", "ホラー"], "year": 2022}
+            ]
+        }
+        mock_batch_writer = MagicMock()
+        mock_context_manager = MagicMock()
+        mock_context_manager.__enter__.return_value = mock_batch_writer
+        mock_dynamodb_table.batch_writer.return_value = mock_context_manager
+
+        with patch.object(importer, "scan_json_files") as mock_scan:
+            mock_scan.return_value = [str(metadata_dir / "file.json")]
+            result = importer.import_all_files(str(metadata_dir))
+
+        deleted = [
+            call[1]["Key"] for call in mock_batch_writer.delete_item.call_args_list
+        ]
+        assert deleted == [
+            {"PK": "TAGPATH#ゲーム/ホラー", "SK": "VIDEO#video1"},
+            {"PK": "TAGPATH#ホラー", "SK": "VIDEO#video1"},
+            {"PK": "YEAR#2022", "SK": "VIDEO#video1"},
+            {"PK": "TAGPATH#ゲーム/ホラー", "SK": TAG_COUNT_KEY},
+            {"PK": "TAGPATH#ホラー", "SK": TAG_COUNT_KEY},
+        ]
+        written = [
+            call[1]["Item"] for call in mock_batch_writer.put_item.call_args_list
+        ]
+        counts = {
+            item["PK"]: item["video_count"]
+            for item in written
+            if item["SK"] == TAG_COUNT_KEY
+        }
+        assert counts == {
+            "TAGPATH#RPG": 1,
+            "TAGPATH#ゲーム": 1,
+            "TAGPATH#ゲーム/RPG": 1,
+        }
+        assert result["total_removed"] == 0
+
+    def test_import_removes_deleted_videos(
+        self, importer, tmp_path, mock_dynamodb_table
+    ):
+        """Test videos no longer in the metadata are deleted with their items"""
+        metadata_dir = tmp_path / "metadata"
+        metadata_dir.mkdir()
+        (metadata_dir / "file.json").write_text(
+            json.dumps(
+                [
+                    {
+                        "video_id": "kept",
+                        "title": "Kept",
+                        "published_at": "2023-01-01T00:00:00Z",
+                        "tags": ["雑談"],
+                    }
+                ]
+            )
+        )
+        mock_dynamodb_table.scan.return_value = {
+            "Items": [
+                {"video_id": "kept", "tags": ["雑談"], "year": 2023},
+                {"video_id": "gone", "tags": ["雑談", "料理"], "year": 2021},
+            ]
+        }
+        mock_batch_writer = MagicMock()
+        mock_context_manager = MagicMock()
+        mock_context_manager.__enter__.return_value = mock_batch_writer
+        mock_dynamodb_table.batch_writer.return_value = mock_context_manager
+
+        with patch.object(importer, "scan_json_files") as mock_scan:
+            mock_scan.return_value = [str(metadata_dir / "file.json")]
+            result = importer.import_all_files(str(metadata_dir))
+
+        deleted = [
+            call[1]["Key"] for call in mock_batch_writer.delete_item.call_args_list
+        ]
+        assert deleted == [
+            {"PK": "YEAR#2021", "SK": "VIDEO#gone"},
+            {"PK": "VIDEO#gone", "SK": "VIDEO#gone"},
+            {"PK": "TAGPATH#料理", "SK": "VIDEO#gone"},
+            {"PK": "TAGPATH#雑談", "SK": "VIDEO#gone"},
+            {"PK": "TAGPATH#雑談/料理", "SK": "VIDEO#gone"},
+            # 雑談 still has a video, so its count is rewritten instead
+            {"PK": "TAGPATH#料理", "SK": TAG_COUNT_KEY},
+            {"PK": "TAGPATH#雑談/料理", "SK": TAG_COUNT_KEY},
+        ]
+        assert result["total_removed"] == 1
+
+    def test_import_keeps_videos_when_a_file_fails(
+        self, importer, tmp_path, mock_dynamodb_table
+    ):
+        """Test nothing is removed when a file could not be read"""
+        metadata_dir = tmp_path / "metadata"
+        metadata_dir.mkdir()
+        (metadata_dir / "invalid.json").write_text("invalid json")
+        mock_dynamodb_table.scan.return_value = {
+            "Items": [{"video_id": "unread", "tags": ["雑談"], "year": 2023}]
+        }
+
+        with patch.object(importer, "scan_json_files") as mock_scan:
+            mock_scan.return_value = [str(metadata_dir / "invalid.json")]
+            result = importer.import_all_files(str(metadata_dir))
+
+        assert result["total_removed"] == 0
+        mock_dynamodb_table.batch_writer.assert_not_called()
+
     def test_import_all_files_no_files(self, importer):
         """Test importing from directory with no JSON files"""
         with patch.object(importer, "scan_json_files") as mock_scan:
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState } from 'react'
+import { useState, useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 import { MainLayout } from '@/components/layout/MainLayout'
 import { TagTree } from '@/components/tag/TagTree'
@@ -17,12 +17,36 @@ export default function TagsPage() {
   const router = useRouter()
   const { isLoading: configLoading, error: configError } = useConfig()
   const [selectedTagPath, setSelectedTagPath] = useState<string>('')
+  const [allVideos, setAllVideos] = useState<Video[]>([])
+  const [lastKey, setLastKey] = useState<string | undefined>()
 
   const { data: tagData, error: tagError, isLoading: tagLoading } = useTagTree()
-  const { data: videoData, error: videoError, isLoading: videoLoading } = useVideosByTag(selectedTagPath)
+  const { data: videoData, error: videoError, isLoading: videoLoading } = useVideosByTag(selectedTagPath, 50, lastKey)
+
+  // Append each page to the videos already shown
+  useEffect(() => {
+    if (!videoData || videoData.items.length === 0) return
+    setAllVideos(prev => {
+      const shown = new Set(prev.map(video => video.video_id))
+      const newVideos = videoData.items.filter(video => !shown.has(video.video_id))
+      return newVideos.length > 0 ? [...prev, ...newVideos] : prev
+    })
+  }, [videoData])
+
+  const selectTagPath = (tagPath: string) => {
+    setSelectedTagPath(tagPath)
+    setAllVideos([])
+    setLastKey(undefined)
+  }
 
   const handleTagSelect = (tagPath: string) => {
-    setSelectedTagPath(tagPath)
+    selectTagPath(tagPath)
+  }
+
+  const handleLoadMore = () => {
+    if (videoData?.last_key) {
+      setLastKey(videoData.last_key)
+    }
   }
 
   const handleVideoClick = (video: Video) => {
@@ -37,7 +61,7 @@ export default function TagsPage() {
   const handleBreadcrumbClick = (index: number) => {
     const breadcrumbs = getBreadcrumbs()
     const newPath = breadcrumbs.slice(0, index + 1).join('/')
-    setSelectedTagPath(newPath)
+    selectTagPath(newPath)
   }
 
   // Show loading while config is loading
@@ -136,13 +160,15 @@ export default function TagsPage() {
               />
             )}
 
-            {videoLoading && <Loading label="動画を読み込み中..." />}
+            {videoLoading && allVideos.length === 0 && <Loading label="動画を読み込み中..." />}
 
-            {videoData && (
+            {selectedTagPath && allVideos.length > 0 && (
               <VideoGrid
-                videos={videoData.items}
+                videos={allVideos}
                 loading={videoLoading}
                 onVideoClick={handleVideoClick}
+                hasMore={!!videoData?.last_key}
+                onLoadMore={handleLoadMore}
               />
             )}
 
@@ -160,7 +186,7 @@ export default function TagsPage() {
               </Card>
             )}
 
-            {selectedTagPath && videoData && videoData.items.length === 0 && !videoLoading && (
+            {selectedTagPath && videoData && allVideos.length === 0 && !videoLoading && (
               <Card>
                 <CardBody className="text-center p-12">
                   <TagIcon className="w-16 h-16 text-gray-400 mx-auto mb-4" />
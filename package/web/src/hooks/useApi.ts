@@ -50,12 +50,16 @@ export function useTagTree() {
 /**
  * Hook to fetch videos by tag path
  */
-export function useVideosByTag(tagPath: string) {
+export function useVideosByTag(tagPath: string, limit: number = 50, lastKey?: string) {
   const { config, isLoading: configLoading } = useConfig()
 
+  const key = lastKey
+    ? `videos-by-tag-${tagPath}-${limit}-${lastKey}`
+    : `videos-by-tag-${tagPath}-${limit}`
+
   return useSWR<VideosByTagResponse>(
-    config && !configLoading && tagPath ? `videos-by-tag-${tagPath}` : null,
-    () => config ? ApiClient.getVideosByTag(config.NEXT_PUBLIC_API_URL, tagPath) : Promise.reject('Config not loaded'),
+    config && !configLoading && tagPath ? key : null,
+    () => config ? ApiClient.getVideosByTag(config.NEXT_PUBLIC_API_URL, tagPath, limit, lastKey) : Promise.reject('Config not loaded'),
     swrConfig
   )
 }
@@ -7,6 +7,7 @@ import type {
   VideosResponse,
   TagsResponse,
   VideosByTagResponse,
+  VideosBatchResponse,
   RandomVideosResponse,
   MemoryThumbnailsResponse,
   HealthResponse,
@@ -70,13 +71,14 @@ async function apiFetch<T>(url: string, options?: RequestInit): Promise<T> {
  */
 export class ApiClient {
   /**
-   * Get videos by year with pagination
+   * Get videos by year with pagination, optionally limited to a publish time range
    */
   static async getVideosByYear(
     baseUrl: string,
     year: number,
     limit: number = 50,
-    lastKey?: string
+    lastKey?: string,
+    range?: { from?: string; to?: string }
   ): Promise<VideosResponse> {
     const params = new URLSearchParams({
       year: year.toString(),
@@ -87,9 +89,36 @@ export class ApiClient {
       params.append('last_key', lastKey)
     }
 
+    if (range?.from) {
+      params.append('from', range.from)
+    }
+
+    if (range?.to) {
+      params.append('to', range.to)
+    }
+
     return apiFetch<VideosResponse>(`${baseUrl}/api/videos?${params}`)
   }
 
+  /**
+   * Get the newest videos across all years (lastKey is the cursor from the previous page)
+   */
+  static async getLatestVideos(
+    baseUrl: string,
+    limit: number = 50,
+    lastKey?: string
+  ): Promise<VideosResponse> {
+    const params = new URLSearchParams({
+      limit: limit.toString(),
+    })
+
+    if (lastKey) {
+      params.append('last_key', lastKey)
+    }
+
+    return apiFetch<VideosResponse>(`${baseUrl}/api/videos/latest?${params}`)
+  }
+
   /**
    * Get hierarchical tag tree
    */
@@ -100,11 +129,21 @@ export class ApiClient {
   /**
    * Get videos by tag path
    */
-  static async getVideosByTag(baseUrl: string, tagPath: string): Promise<VideosByTagResponse> {
+  static async getVideosByTag(
+    baseUrl: string,
+    tagPath: string,
+    limit: number = 50,
+    lastKey?: string
+  ): Promise<VideosByTagResponse> {
     const params = new URLSearchParams({
       path: tagPath,
+      limit: limit.toString(),
     })
 
+    if (lastKey) {
+      params.append('last_key', lastKey)
+    }
+
     return apiFetch<VideosByTagResponse>(`${baseUrl}/api/videos/by-tag?${params}`)
   }
 
@@ -137,6 +176,17 @@ export class ApiClient {
     return apiFetch<Video>(`${baseUrl}/api/videos/${encodeURIComponent(videoId)}`)
   }
 
+  /**
+   * Get multiple videos by ID in a single request (results keep the given order)
+   */
+  static async getVideosByIds(baseUrl: string, videoIds: string[]): Promise<VideosBatchResponse> {
+    const params = new URLSearchParams({
+      ids: videoIds.join(','),
+    })
+
+    return apiFetch<VideosBatchResponse>(`${baseUrl}/api/videos/batch?${params}`)
+  }
+
   /**
    * Health check endpoint
    */
@@ -26,6 +26,12 @@ export interface TagsResponse {
 
 export interface VideosByTagResponse {
   items: Video[]
+  last_key?: string
+  total?: number | null
+}
+
+export interface VideosBatchResponse {
+  items: Video[]
 }
 
 export interface RandomVideosResponse {